@@ -0,0 +1,143 @@
+"""
+Path: bench_compare.py
+
+Baselines de rendimiento de tests/test_benchmarks.py y detección de regresiones.
+
+    python bench_compare.py save                 # corre los benchmarks y guarda la baseline
+    python bench_compare.py compare              # corre y compara contra la baseline
+    python bench_compare.py compare --tolerance 0.1 -- -k presenter
+    python bench_compare.py compare --current resultado.json   # compara un JSON ya generado
+
+La comparación usa la mediana de cada benchmark y termina con código 1 si alguno es más
+lento que la baseline en más de ``--tolerance`` (20% por defecto). Las baselines dependen
+de la máquina: conviene regenerarlas en la misma en la que se compara.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE = _ROOT / "benchmarks" / "baseline.json"
+_STATS = ("min", "median", "mean", "stddev", "rounds")
+
+
+def run_benchmarks(pytest_args=()) -> dict:
+    "Corre tests/test_benchmarks.py y devuelve el JSON de pytest-benchmark."
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "benchmarks.json"
+        command = [
+            sys.executable,
+            "-m",
+            "pytest",
+            "tests/test_benchmarks.py",
+            "--benchmark-only",
+            f"--benchmark-json={output}",
+            "-q",
+            *pytest_args,
+        ]
+        subprocess.run(command, cwd=_ROOT, check=True)
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def summarize(raw: dict) -> dict:
+    "Reduce el JSON de pytest-benchmark a las estadísticas que se comparan."
+    machine = raw.get("machine_info", {})
+    return {
+        "machine": {
+            "cpu": machine.get("cpu", {}).get("brand_raw") or platform.processor(),
+            "python": machine.get("python_version", platform.python_version()),
+        },
+        "benchmarks": {
+            bench["fullname"]: {stat: bench["stats"][stat] for stat in _STATS}
+            for bench in raw.get("benchmarks", [])
+        },
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2, stat: str = "median"):
+    """Filas (nombre, baseline, actual, cociente, estado) y si hubo regresiones.
+
+    El estado es ``regression`` si el cociente supera ``1 + tolerance``, ``faster`` si
+    baja de ``1 - tolerance``, ``ok`` en otro caso, y ``new``/``missing`` si el benchmark
+    está en una sola de las corridas."""
+    rows, regressed = [], False
+    base_benchmarks = baseline["benchmarks"]
+    current_benchmarks = current["benchmarks"]
+    for name in sorted(set(base_benchmarks) | set(current_benchmarks)):
+        before = base_benchmarks.get(name, {}).get(stat)
+        after = current_benchmarks.get(name, {}).get(stat)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + tolerance:
+            status, regressed = "regression", True
+        elif ratio < 1 - tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows, regressed
+
+
+def format_rows(rows, stat: str) -> str:
+    def fmt(value):
+        return "-" if value is None else f"{value * 1e6:,.1f}"
+
+    width = max([len(row[0]) for row in rows] + [9])
+    lines = [f"{'benchmark':<{width}} {stat + ' µs':>14} {'actual µs':>14} {'x':>6}  estado"]
+    for name, before, after, ratio, status in rows:
+        ratio_text = "-" if ratio is None else f"{ratio:.2f}"
+        lines.append(
+            f"{name:<{width}} {fmt(before):>14} {fmt(after):>14} {ratio_text:>6}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Baselines de benchmarks y regresiones.")
+    parser.add_argument("command", choices=("save", "compare"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--current", type=Path, help="JSON de pytest-benchmark ya generado")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--stat", choices=("min", "median", "mean"), default="median")
+    parser.add_argument("pytest_args", nargs="*", help="Argumentos extra para pytest (tras --)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.current:
+        raw = json.loads(args.current.read_text(encoding="utf-8"))
+    else:
+        raw = run_benchmarks(args.pytest_args)
+    current = summarize(raw)
+
+    if args.command == "save":
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline guardada en {args.baseline} ({len(current['benchmarks'])} benchmarks)")
+        return 0
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except OSError as exc:
+        print(f"No se pudo leer la baseline: {exc}", file=sys.stderr)
+        return 2
+    if baseline.get("machine") != current["machine"]:
+        print("Aviso: la baseline se generó en otra máquina o versión de Python.", file=sys.stderr)
+    rows, regressed = compare(baseline, current, args.tolerance, args.stat)
+    print(format_rows(rows, args.stat))
+    if regressed:
+        print(f"\nRegresiones de más del {args.tolerance:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
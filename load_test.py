@@ -0,0 +1,85 @@
+"""
+Path: load_test.py
+
+Prueba de carga de los webhooks de Telegram y webchat.
+
+    python load_test.py load_tests/burst.json
+    python load_test.py load_tests/many_users.json --rate-scale 2 --output reporte.json
+    python load_test.py load_tests/burst.json --url http://localhost:8080
+
+Sin ``--url`` la aplicación corre en este mismo proceso contra los servicios simulados
+(FAKE_UPSTREAMS=all salvo que el escenario o el entorno digan otra cosa). Con ``--url`` se
+ataca una instancia ya desplegada y los eventos sobre servicios simulados se ignoran.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from src.infrastructure.load_testing.report import format_report
+from src.infrastructure.load_testing.scenario import ScenarioError, load_scenario
+
+# Valores por defecto para correr en proceso sin credenciales ni servicios reales
+_IN_PROCESS_ENV = {
+    "FAKE_UPSTREAMS": "all",
+    "TELEGRAM_API_KEY": "load-test-telegram-key",
+    "GOOGLE_GEMINI_API_KEY": "load-test-gemini-key",
+    "CONFIG_RELOAD_INTERVAL": "0",
+    "LOG_LEVEL": "ERROR",
+}
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Prueba de carga de los webhooks.")
+    parser.add_argument("scenario", help="Archivo JSON del escenario")
+    parser.add_argument("--url", help="Instancia a probar por HTTP (por defecto, en proceso)")
+    parser.add_argument(
+        "--rate-scale", type=float, default=1.0, help="Multiplica las tasas del escenario"
+    )
+    parser.add_argument("--output", help="Guarda el reporte completo en JSON")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="No medir memoria (tracemalloc es costoso)"
+    )
+    return parser.parse_args(argv)
+
+
+async def _run(args, scenario) -> dict:
+    # Imports diferidos: la configuración se lee después de aplicar el entorno del escenario
+    from src.infrastructure.load_testing.runner import run_in_process, run_over_http
+
+    if args.url:
+        return await run_over_http(args.url, scenario)
+
+    from src.infrastructure.fastapi.fastapi_webhook import create_app
+    from src.shared.config import get_settings
+
+    app = create_app(get_settings().require_api_keys())
+    return await run_in_process(app, scenario, track_memory=not args.no_memory)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    try:
+        scenario = load_scenario(args.scenario)
+    except ScenarioError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    if args.rate_scale != 1.0:
+        scenario = scenario.scaled(args.rate_scale)
+    if not args.url:
+        for key, value in _IN_PROCESS_ENV.items():
+            os.environ.setdefault(key, value)
+        os.environ.update(scenario.env)
+
+    report = asyncio.run(_run(args, scenario))
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Path: queue_worker.py
+
+Worker de la cola durable de updates (UPDATE_QUEUE_PATH).
+
+    python queue_worker.py
+    python queue_worker.py --concurrency 8 --worker-id worker-2
+
+Usa la misma configuración que el servidor. Se pueden correr varios procesos contra el mismo
+archivo: cada update lo toma uno solo y los de una conversación se procesan en orden. Con
+SIGINT/SIGTERM deja de reclamar y termina los updates que tiene en curso.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Procesa la cola durable de updates.")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Conversaciones atendidas a la vez"
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Identificador del worker en las leases (por defecto, host-pid)",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=0.5, help="Espera entre consultas con la cola vacía"
+    )
+    return parser.parse_args(argv)
+
+
+async def _run(args) -> int:
+    from src.infrastructure.fastapi.fastapi_webhook import (
+        DependencyContainer,
+        process_telegram_update,
+    )
+    from src.infrastructure.queue.update_worker import UpdateWorker
+    from src.shared.config import get_settings
+
+    container = DependencyContainer(get_settings().require_api_keys())
+    await container.startup()
+    try:
+        if container.update_queue is None:
+            print("UPDATE_QUEUE_PATH no está configurado", file=sys.stderr)
+            return 2
+
+        async def handle(update):
+            await process_telegram_update(container, update.payload)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        worker = UpdateWorker(
+            container.update_queue,
+            handle,
+            args.worker_id,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            retention=container.config.get("UPDATE_QUEUE_RETENTION", 3600.0),
+        )
+        await worker.run(stop)
+        return 0
+    finally:
+        await container.shutdown()
+
+
+def main(argv=None) -> int:
+    return asyncio.run(_run(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
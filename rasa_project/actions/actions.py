@@ -6,7 +6,8 @@ from typing import Any, Text, Dict, List
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 
-from src.shared.config import DEFAULT_SYSTEM_INSTRUCTIONS_PATH
+from src.shared.bounded_executor import BoundedExecutor, ExecutorQueueFullError
+from src.shared.config import DEFAULT_SYSTEM_INSTRUCTIONS_PATH, get_settings
 from src.shared.logger_rasa_v0 import get_logger
 
 from src.infrastructure.repositories.json_instructions_repository import (
@@ -18,6 +19,23 @@ from src.use_cases.load_system_instructions import LoadSystemInstructionsUseCase
 
 logger = get_logger("action-gemini-fallback")
 
+_HANDOFF_TEXT = "Me quedé sin datos. Te derivo con un humano por WhatsApp."
+
+_gemini_executor: BoundedExecutor | None = None
+
+
+def get_gemini_executor() -> BoundedExecutor:
+    "Pool dedicado y acotado para las llamadas bloqueantes a Gemini del action server."
+    global _gemini_executor
+    if _gemini_executor is None:
+        config = get_settings()
+        _gemini_executor = BoundedExecutor(
+            "actions-gemini",
+            max_workers=config.get("GEMINI_EXECUTOR_WORKERS", 8),
+            max_queue=config.get("GEMINI_EXECUTOR_QUEUE_SIZE", 32),
+        )
+    return _gemini_executor
+
 
 def build_history_from_tracker(tracker: Tracker, max_turns: int = 10) -> str:
     "Construir el historial de conversación desde el tracker"
@@ -72,13 +90,18 @@ class ActionGeminiFallback(Action):
             gemini_service = GeminiService()
             gemini = GeminiGateway(gemini_service)
 
-            respuesta = gemini.get_response(prompt_with_history, self._system_instructions)
+            respuesta = await get_gemini_executor().run(
+                gemini.get_response, prompt_with_history, self._system_instructions
+            )
             logger.debug("Respuesta Gemini recibida=%s", bool(respuesta))
 
             if not respuesta:
                 raise ValueError("Gemini devolvió respuesta vacía")
             dispatcher.utter_message(text=respuesta)
+        except ExecutorQueueFullError as e:
+            logger.warning("Fallback Gemini rechazado por saturación: %s", e)
+            dispatcher.utter_message(text=_HANDOFF_TEXT)
         except (FileNotFoundError, KeyError, ValueError, RuntimeError) as e:
             logger.exception("Error en fallback Gemini: %s", e)
-            dispatcher.utter_message(text="Me quedé sin datos. Te derivo con un humano por WhatsApp.")
+            dispatcher.utter_message(text=_HANDOFF_TEXT)
         return []
@@ -14,3 +14,31 @@ class GeminiResponder:
         :param system_instructions: str | None, instrucciones de sistema para el modelo.
         """
         raise NotImplementedError("Debe implementar get_response(prompt, system_instructions=None)")
+
+
+class AsyncGeminiResponder:
+    "Abstracción para servicios que generan respuestas sin bloquear el event loop."
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        """
+        Genera una respuesta de forma asíncrona a partir del prompt dado.
+
+        :param prompt: str, el mensaje del usuario.
+        :param system_instructions: str | None, instrucciones de sistema para el modelo.
+        """
+        raise NotImplementedError(
+            "Debe implementar get_response_async(prompt, system_instructions=None)"
+        )
+
+    async def stream_response_async(self, prompt, system_instructions=None):
+        """
+        Genera la respuesta en fragmentos a medida que el modelo la produce.
+
+        Por defecto entrega la respuesta completa como un único fragmento; los servicios
+        con generación incremental deben sobrescribirlo.
+        """
+        yield await self.get_response_async(prompt, system_instructions)
+
+
+class GeminiUnavailableError(RuntimeError):
+    "El responder no pudo atender la solicitud a tiempo (cuota agotada, saturación)."
@@ -0,0 +1,106 @@
+"""
+Path: src/infrastructure/fakes/fake_gemini.py
+"""
+
+import asyncio
+import random
+import time
+
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
+from src.infrastructure.google_generative_ai.model_router import estimate_tokens
+
+_FILLER = (
+    "Las bolsas de papel Madypack se fabrican en distintos tamaños y gramajes. "
+    "Podés pedir impresión personalizada con tu logo a partir de la cantidad mínima. "
+    "Para envíos y precios actualizados escribinos por WhatsApp. "
+)
+
+
+class FakeRateLimitError(Exception):
+    "Imita el 429 (ResourceExhausted) del SDK de Gemini."
+
+    code = 429
+
+
+class FakeGeminiResponder(GeminiResponder, AsyncGeminiResponder):
+    """Sustituto determinista de GeminiService para pruebas locales y de carga.
+
+    ``latency`` es el tiempo hasta el primer token; ``tokens_per_second`` (0 = instantáneo)
+    regula cuánto tarda en generarse el resto. ``error_rate`` devuelve el mismo texto de
+    error que GeminiService y ``rate_limit_rate`` lanza un 429. Con la misma ``seed``, la
+    secuencia de errores se repite.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.3,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        reply_tokens: int = 120,
+        reply=None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.reply_tokens = reply_tokens
+        self.reply = reply
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def get_response(self, prompt, system_instructions=None):
+        "Respuesta simulada (bloquea el thread como el SDK síncrono)."
+        failure = self._next_failure()
+        text = failure or self._reply_text(prompt)
+        time.sleep(self._duration(text))
+        return text
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        "Respuesta simulada sin bloquear el event loop."
+        failure = self._next_failure()
+        text = failure or self._reply_text(prompt)
+        await asyncio.sleep(self._duration(text))
+        return text
+
+    async def stream_response_async(self, prompt, system_instructions=None):
+        "Entrega la respuesta simulada en fragmentos al ritmo de ``tokens_per_second``."
+        failure = self._next_failure()
+        await asyncio.sleep(self.latency)
+        if failure:
+            yield failure
+            return
+        words = self._reply_text(prompt).split(" ")
+        for start in range(0, len(words), 8):
+            chunk = " ".join(words[start : start + 8])
+            if start + 8 < len(words):
+                chunk += " "
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield chunk
+
+    def warm_up(self) -> None:
+        "Compatible con GeminiService.warm_up; no hay nada que preparar."
+
+    def _next_failure(self) -> str | None:
+        self.calls += 1
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            raise FakeRateLimitError("429 Resource has been exhausted (simulado)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "Error al generar respuesta con Gemini: error simulado"
+        return None
+
+    def _reply_text(self, prompt) -> str:
+        if callable(self.reply):
+            return self.reply(prompt)
+        if self.reply is not None:
+            return self.reply
+        filler = _FILLER * (self.reply_tokens * 4 // len(_FILLER) + 1)
+        return filler[: self.reply_tokens * 4].rsplit(" ", 1)[0] + "."
+
+    def _duration(self, text: str) -> float:
+        if self.tokens_per_second <= 0:
+            return self.latency
+        return self.latency + estimate_tokens(text) / self.tokens_per_second
@@ -0,0 +1,75 @@
+"""
+Path: src/infrastructure/fakes/fake_rasa.py
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from src.entities.gemini_responder import AsyncGeminiResponder
+from src.infrastructure.repositories.rasa_domain_repository import RasaDomainRepository
+
+
+class _OutageAwareTransport(httpx.ASGITransport):
+    "Transporte ASGI que simula una caída de red mientras ``fake.outage`` es True."
+
+    def __init__(self, fake: "FakeRasa"):
+        super().__init__(app=fake.app)
+        self._fake = fake
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._fake.outage:
+            raise httpx.ConnectError("Rasa simulado fuera de servicio", request=request)
+        return await super().handle_async_request(request)
+
+
+class FakeRasa:
+    """Webhook REST de Rasa simulado a partir de domain.yml, nlu.yml y rules.yml.
+
+    Las respuestas fijas salen del dominio; los intents que terminan en
+    ``action_gemini_fallback`` se responden con ``fallback_responder`` (como haría el
+    action server) o con una lista vacía si no hay uno.
+    """
+
+    def __init__(
+        self,
+        repository: RasaDomainRepository | None = None,
+        latency: float = 0.0,
+        fallback_responder: AsyncGeminiResponder | None = None,
+    ):
+        self.repository = repository or RasaDomainRepository()
+        self.latency = latency
+        self.fallback_responder = fallback_responder
+        self.outage = False
+        self.requests = 0
+        self.app = self._build_app()
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        "Transporte para ``httpx.AsyncClient`` que resuelve las llamadas en memoria."
+        return _OutageAwareTransport(self)
+
+    async def reply(self, sender: str, message: str) -> list[dict]:
+        "Mensajes que devolvería Rasa para el texto recibido."
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        _, texts, custom_actions = self.repository.reply_for(message)
+        if "action_gemini_fallback" in custom_actions and self.fallback_responder is not None:
+            texts.append(await self.fallback_responder.get_response_async(message))
+        return [{"recipient_id": sender, "text": text} for text in texts]
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/")
+        async def index():
+            return PlainTextResponse("Hello from Rasa: fake")
+
+        @app.post("/webhooks/rest/webhook")
+        async def webhook(request: Request):
+            data = await request.json()
+            return await self.reply(str(data.get("sender", "user")), str(data.get("message", "")))
+
+        return app
@@ -0,0 +1,129 @@
+"""
+Path: src/infrastructure/fakes/fake_telegram.py
+"""
+
+import asyncio
+import math
+import time
+from itertools import count
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeTelegramApi:
+    """Bot API de Telegram simulada: sendMessage, editMessageText, sendChatAction, getMe
+    y getUpdates.
+
+    Registra todo lo enviado en ``calls`` y, con ``rate_limit`` (mensajes por segundo por
+    chat), responde 429 con ``retry_after`` como la API real.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit: float = 0.0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.calls: list[dict] = []
+        self.rate_limited = 0
+        self._message_ids = count(1)
+        self._update_ids = count(1)
+        self._updates: list[dict] = []
+        self._next_allowed: dict = {}
+        self.app = self._build_app()
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        "Transporte para ``httpx.AsyncClient`` que resuelve las llamadas en memoria."
+        return httpx.ASGITransport(app=self.app)
+
+    def messages(self, chat_id=None) -> list[dict]:
+        "Llamadas sendMessage/editMessageText registradas, opcionalmente de un chat."
+        return [
+            call
+            for call in self.calls
+            if call["method"] in ("sendMessage", "editMessageText")
+            and (chat_id is None or str(call.get("chat_id")) == str(chat_id))
+        ]
+
+    def push_update(self, chat_id, text: str, entities=None) -> dict:
+        "Encola un update de texto para getUpdates y lo devuelve (sirve también para webhooks)."
+        update = self.text_update(chat_id, text, entities, update_id=next(self._update_ids))
+        self._updates.append(update)
+        return update
+
+    @staticmethod
+    def text_update(chat_id, text: str, entities=None, update_id: int = 1) -> dict:
+        "Update de Telegram con un mensaje de texto, en el formato que recibe el webhook."
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        }
+        if entities:
+            message["entities"] = entities
+        return {"update_id": update_id, "message": message}
+
+    async def handle(self, method: str, payload: dict):
+        "Resuelve una llamada a la API; devuelve (status, cuerpo)."
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        chat_id = payload.get("chat_id")
+        if method in ("sendMessage", "editMessageText") and self._throttled(chat_id):
+            self.rate_limited += 1
+            retry_after = max(1, math.ceil(self._next_allowed[chat_id] - time.monotonic()))
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            }
+        self.calls.append({"method": method, **payload})
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "username": "fake_bot"}}
+        if method == "getUpdates":
+            offset = int(payload.get("offset") or 0)
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            return 200, {"ok": True, "result": list(self._updates)}
+        if method == "sendMessage":
+            result = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": payload.get("text", ""),
+            }
+            if payload.get("entities"):
+                result["entities"] = payload["entities"]
+            return 200, {"ok": True, "result": result}
+        if method == "editMessageText":
+            result = {
+                "message_id": payload.get("message_id"),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": payload.get("text", ""),
+            }
+            return 200, {"ok": True, "result": result}
+        return 200, {"ok": True, "result": True}
+
+    def _throttled(self, chat_id) -> bool:
+        if self.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        if self._next_allowed.get(chat_id, 0.0) > now:
+            return True
+        self._next_allowed[chat_id] = now + 1.0 / self.rate_limit
+        return False
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.api_route("/bot{token}/{method}", methods=["GET", "POST"])
+        async def bot_api(token: str, method: str, request: Request):
+            payload = dict(request.query_params)
+            if request.method == "POST":
+                body = await request.body()
+                if body:
+                    payload.update(await request.json())
+            status, content = await self.handle(method, payload)
+            return JSONResponse(content, status_code=status)
+
+        return app
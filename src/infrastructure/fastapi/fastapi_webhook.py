@@ -2,30 +2,57 @@
 
 import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 
 import httpx
-from fastapi import FastAPI, Request
+from fastapi import APIRouter, BackgroundTasks, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from src.entities.gemini_responder import GeminiUnavailableError
 from src.entities.message import Message
+from src.infrastructure.fastapi.metered_transport import MeteredTransport
+from src.infrastructure.fastapi.request_metrics import RequestMetricsMiddleware
 from src.infrastructure.google_generative_ai.gemini_service import GeminiService
+from src.infrastructure.google_generative_ai.model_router import GeminiModelRouter, ModelRoute
+from src.infrastructure.google_generative_ai.request_scheduler import GeminiRequestScheduler
+from src.infrastructure.queue.sqlite_update_queue import SqliteUpdateQueue
+from src.infrastructure.rate_limit.sqlite_rate_limiter import SqliteRateLimiter
 from src.infrastructure.repositories.json_instructions_repository import (
     JsonInstructionsRepository,
 )
+from src.infrastructure.repositories.rasa_domain_repository import RasaDomainRepository
+from src.infrastructure.telegram.telegram_sender import TelegramSender
 from src.interface_adapter.controller.telegram_controller import (
     TelegramMessageController,
 )
 from src.interface_adapter.controller.webchat_controller import WebchatMessageController
 from src.interface_adapter.gateways.agent_gateway import AgentGateway
 from src.interface_adapter.presenters.telegram_presenter import TelegramMessagePresenter
-from src.shared.config import get_config
+from src.interface_adapter.presenters.telegram_stream_presenter import TelegramStreamPresenter
+from src.shared.adaptive_limiter import AdaptiveConcurrencyLimiter
+from src.shared.bounded_executor import BoundedExecutor
+from src.shared.config import SettingsWatcher, get_settings, subscribe_settings
+from src.shared.identity_rate_limiter import IdentityRateLimiter
 from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import get_metrics
+from src.shared.overload import OVERLOAD_MESSAGE, REJECT, OverloadController
+from src.shared.warmup import WarmUp
+from src.use_cases.coalesce_messages_use_case import CoalesceMessagesUseCase
 from src.use_cases.generate_agent_response_use_case import GenerateAgentResponseUseCase
 
 logger = logging.getLogger("fastapi-webhook")
 
+_TELEGRAM_UNAVAILABLE_TEXT = (
+    "Lo sentimos, el servidor no está disponible en este momento. "
+    "Por favor, comuníquese con el área de mantenimiento."
+)
+_TELEGRAM_ERROR_TEXT = "Lo sentimos, hubo un error procesando su mensaje."
+_RATE_LIMITED_TEXT = (
+    "Estás enviando muchos mensajes seguidos. Esperá un momento y volvé a escribirnos."
+)
+
 
 class DependencyContainer:
     """Instancia y mantiene las dependencias compartidas de la aplicación."""
@@ -36,22 +63,42 @@ class DependencyContainer:
         self.http_client: httpx.AsyncClient | None = None
         self.telegram_client: httpx.AsyncClient | None = None
         self.instructions_repository: JsonInstructionsRepository | None = None
-        self.gemini_service: GeminiService | None = None
+        self.gemini_service: GeminiService | GeminiModelRouter | None = None
+        self.gemini_executor: BoundedExecutor | None = None
         self.agent_gateway: AgentGateway | None = None
         self.telegram_presenter: TelegramMessagePresenter | None = None
         self.generate_agent_bot_use_case: GenerateAgentResponseUseCase | None = None
+        self.coalesce_use_case: CoalesceMessagesUseCase | None = None
         self.telegram_controller: TelegramMessageController | None = None
         self.webchat_controller: WebchatMessageController | None = None
+        self.telegram_sender: TelegramSender | None = None
         self.telegram_api_url: str | None = None
         self.telegram_message_delay: float = 0.5
+        self.telegram_streaming: bool = False
+        self.telegram_inline_reply: bool = False
+        self.telegram_inline_reply_budget: float = 5.0
+        self.update_queue: SqliteUpdateQueue | None = None
+        self.overload: OverloadController | None = None
+        self.rate_limiter: IdentityRateLimiter | SqliteRateLimiter | None = None
+        self.ip_rate_limiter: IdentityRateLimiter | SqliteRateLimiter | None = None
+        self.settings_watcher: SettingsWatcher | None = None
+        self.warmup: WarmUp | None = None
+        self.fakes: dict = {}
+        self._unsubscribe_settings = None
 
     async def startup(self) -> None:
-        self.config = self._initial_config or get_config()
+        self.config = self._initial_config or get_settings().require_api_keys()
         telegram_token = self.config.get("TELEGRAM_API_KEY")
+        telegram_api_base_url = (
+            f"https://api.telegram.org/bot{telegram_token}" if telegram_token else None
+        )
         self.telegram_api_url = (
-            f"https://api.telegram.org/bot{telegram_token}/sendMessage" if telegram_token else None
+            f"{telegram_api_base_url}/sendMessage" if telegram_api_base_url else None
         )
         self.telegram_message_delay = self.config.get("TELEGRAM_MESSAGE_DELAY", 0.5)
+        self.telegram_streaming = self.config.get("TELEGRAM_STREAMING", False)
+        self.telegram_inline_reply = self.config.get("TELEGRAM_INLINE_REPLY", False)
+        self.telegram_inline_reply_budget = self.config.get("TELEGRAM_INLINE_REPLY_BUDGET", 5.0)
 
         instructions_path = str(
             self.config.get(
@@ -60,30 +107,312 @@ class DependencyContainer:
             )
         )
         self.instructions_repository = JsonInstructionsRepository(instructions_path)
-        self.gemini_service = GeminiService()
+        self.fakes = self._build_fakes()
+        if self.config.get("OVERLOAD_CONTROL", False):
+            self.overload = self._build_overload()
+        self.gemini_service = self._build_gemini_service()
+
+        self.gemini_executor = BoundedExecutor(
+            "gemini-blocking",
+            max_workers=self.config.get("GEMINI_EXECUTOR_WORKERS", 8),
+            max_queue=self.config.get("GEMINI_EXECUTOR_QUEUE_SIZE", 32),
+        )
 
-        self.http_client = httpx.AsyncClient()
-        self.telegram_client = httpx.AsyncClient()
+        self.http_client = self._build_http_client("rasa")
+        self.telegram_client = self._build_http_client("telegram")
         self.agent_gateway = AgentGateway(
             http_client=self.http_client,
             instructions_repository=self.instructions_repository,
             gemini_service=self.gemini_service,
             agent_bot_url=self.config.get("RASA_REST_URL"),
             remote_available=not self.config.get("DISABLE_RASA", False),
+            blocking_executor=self.gemini_executor,
+            supersede_policy=self.config.get("SUPERSEDE_POLICY", "off"),
+            rasa_limiter=self._build_limiter(
+                "rasa", "RASA_MAX_CONCURRENCY", 32, (httpx.TimeoutException,)
+            ),
+            gemini_limiter=self._build_limiter(
+                "gemini",
+                "GEMINI_MAX_CONCURRENCY",
+                16,
+                (asyncio.TimeoutError, GeminiUnavailableError),
+            ),
+            overload=self.overload,
+        )
+        if telegram_api_base_url:
+            self.telegram_sender = TelegramSender(
+                self.telegram_client,
+                telegram_api_base_url,
+                message_delay=self.telegram_message_delay,
+                edit_interval=self.config.get("TELEGRAM_STREAM_EDIT_INTERVAL", 1.0),
+                typing_interval=self.config.get("TELEGRAM_TYPING_INTERVAL", 4.0),
+            )
+        self.telegram_presenter = TelegramMessagePresenter(
+            self.config.get("TELEGRAM_FORMAT", "markdown_v2"),
+            cache_size=self.config.get("PRESENTATION_CACHE_SIZE", 256),
         )
-        self.telegram_presenter = TelegramMessagePresenter()
         self.generate_agent_bot_use_case = GenerateAgentResponseUseCase(self.agent_gateway)
+        # En Telegram los mensajes seguidos de un usuario se contestan como un solo turno
+        self.coalesce_use_case = CoalesceMessagesUseCase(
+            self.generate_agent_bot_use_case,
+            window=self._coalesce_window(self.config),
+            max_window=self.config.get("COALESCE_MAX_WINDOW", 3.0),
+        )
         self.telegram_controller = TelegramMessageController(
-            self.generate_agent_bot_use_case, self.telegram_presenter
+            self.coalesce_use_case, self.telegram_presenter
         )
         self.webchat_controller = WebchatMessageController(
             self.generate_agent_bot_use_case, self.telegram_presenter
         )
 
+        per_minute = self.config.get("RATE_LIMIT_PER_MINUTE", 0)
+        if per_minute:
+            self.rate_limiter = self._build_rate_limiter(
+                "identity", self.config.get("RATE_LIMIT_BURST", 10), per_minute / 60.0
+            )
+        ip_per_minute = self.config.get("RATE_LIMIT_IP_PER_MINUTE", 0)
+        if ip_per_minute:
+            # Detrás de un proxy la IP del cliente sale de X-Forwarded-For, que uvicorn
+            # (--proxy-headers) solo acepta de las direcciones en FORWARDED_ALLOW_IPS
+            if not os.getenv("FORWARDED_ALLOW_IPS"):
+                logger.warning(
+                    "RATE_LIMIT_IP_PER_MINUTE sin FORWARDED_ALLOW_IPS: detrás de un proxy "
+                    "todos los clientes comparten el cupo de la IP del proxy"
+                )
+            self.ip_rate_limiter = self._build_rate_limiter(
+                "ip", ip_per_minute, ip_per_minute / 60.0
+            )
+
+        queue_path = self.config.get("UPDATE_QUEUE_PATH")
+        if queue_path:
+            self.update_queue = SqliteUpdateQueue(
+                queue_path,
+                lease_seconds=self.config.get("UPDATE_QUEUE_LEASE", 60.0),
+                max_attempts=self.config.get("UPDATE_QUEUE_MAX_ATTEMPTS", 5),
+            )
+
+        if self._initial_config is None:
+            # Ajustes que se aplican en caliente al recargar la configuración
+            self._unsubscribe_settings = subscribe_settings(self.apply_settings)
+            self.settings_watcher = SettingsWatcher(
+                interval=self.config.get("CONFIG_RELOAD_INTERVAL", 5.0)
+            )
+            self.settings_watcher.start()
+
+        if self.overload is not None:
+            self.overload.start()
+
+        self.warmup = WarmUp(
+            self._warmup_steps(), timeout=self.config.get("STARTUP_WARMUP_TIMEOUT", 10.0)
+        )
+        self.warmup.start()
+
+    def _warmup_steps(self) -> dict:
+        "Pasos independientes que el warm-up ejecuta en paralelo."
+        steps = {"instructions": self.agent_gateway.warm_up_fallback}
+        if self.telegram_presenter.cache.maxsize:
+            steps["presentation_cache"] = lambda: asyncio.to_thread(self._prime_presentation)
+        warm_up_model = getattr(self.gemini_service, "warm_up", None)
+        if warm_up_model is not None:
+            steps["gemini_model"] = lambda: asyncio.to_thread(warm_up_model)
+        if self.telegram_sender is not None:
+            steps["telegram_connection"] = self.telegram_sender.warm_up
+        if self.agent_gateway.remote_available:
+            steps["rasa_connection"] = self.agent_gateway.warm_up_remote
+        return steps
+
+    def _prime_presentation(self) -> None:
+        "Presenta de antemano las respuestas fijas de domain.yml y del AgentGateway."
+        texts = [
+            text for variants in RasaDomainRepository().responses().values() for text in variants
+        ]
+        texts.extend(self.agent_gateway.canned_responses())
+        texts.extend(
+            (_TELEGRAM_UNAVAILABLE_TEXT, _TELEGRAM_ERROR_TEXT, OVERLOAD_MESSAGE, _RATE_LIMITED_TEXT)
+        )
+        added = self.telegram_presenter.prime(texts)
+        logger.info("Cache de presentación: %d respuestas precargadas", added)
+
+    def apply_settings(self, settings) -> None:
+        "Aplica una configuración recargada a las dependencias que la admiten sin reiniciar."
+        self.config = settings
+        self.telegram_message_delay = settings.get("TELEGRAM_MESSAGE_DELAY", 0.5)
+        self.telegram_streaming = settings.get("TELEGRAM_STREAMING", False)
+        self.telegram_inline_reply = settings.get("TELEGRAM_INLINE_REPLY", False)
+        self.telegram_inline_reply_budget = settings.get("TELEGRAM_INLINE_REPLY_BUDGET", 5.0)
+        if self.telegram_sender is not None:
+            self.telegram_sender.message_delay = self.telegram_message_delay
+            self.telegram_sender.edit_interval = settings.get("TELEGRAM_STREAM_EDIT_INTERVAL", 1.0)
+            self.telegram_sender.typing_interval = settings.get("TELEGRAM_TYPING_INTERVAL", 4.0)
+        if self.agent_gateway is not None:
+            self.agent_gateway.remote_available = not settings.get("DISABLE_RASA", False)
+            self.agent_gateway.supersede_policy = settings.get("SUPERSEDE_POLICY", "off")
+        if self.coalesce_use_case is not None:
+            self.coalesce_use_case.window = self._coalesce_window(settings)
+            self.coalesce_use_case.max_window = settings.get("COALESCE_MAX_WINDOW", 3.0)
+        if self.telegram_presenter is not None:
+            self.telegram_presenter.mode = settings.get("TELEGRAM_FORMAT", "markdown_v2")
+        logger.info(
+            "Configuración aplicada | DISABLE_RASA=%s | TELEGRAM_MESSAGE_DELAY=%s",
+            settings.get("DISABLE_RASA", False),
+            self.telegram_message_delay,
+        )
+
+    def _build_fakes(self) -> dict:
+        "Servicios simulados pedidos en FAKE_UPSTREAMS (pruebas locales y de carga)."
+        upstreams = self.config.get("FAKE_UPSTREAMS") or ()
+        if not upstreams:
+            return {}
+        # Import diferido: en producción estos módulos no se cargan
+        from src.infrastructure.fakes.fake_gemini import FakeGeminiResponder
+        from src.infrastructure.fakes.fake_rasa import FakeRasa
+        from src.infrastructure.fakes.fake_telegram import FakeTelegramApi
+
+        def fake_gemini():
+            return FakeGeminiResponder(
+                latency=self.config.get("FAKE_GEMINI_LATENCY", 0.3),
+                tokens_per_second=self.config.get("FAKE_GEMINI_TOKENS_PER_SECOND", 0.0),
+                error_rate=self.config.get("FAKE_GEMINI_ERROR_RATE", 0.0),
+                seed=self.config.get("FAKE_SEED", 0),
+            )
+
+        fakes = {}
+        if "gemini" in upstreams:
+            fakes["gemini"] = fake_gemini()
+        if "rasa" in upstreams:
+            # El action server de Rasa consulta a Gemini por su cuenta
+            fakes["rasa"] = FakeRasa(
+                latency=self.config.get("FAKE_RASA_LATENCY", 0.0), fallback_responder=fake_gemini()
+            )
+        if "telegram" in upstreams:
+            fakes["telegram"] = FakeTelegramApi(
+                latency=self.config.get("FAKE_TELEGRAM_LATENCY", 0.0),
+                rate_limit=self.config.get("FAKE_TELEGRAM_RATE_LIMIT", 0.0),
+            )
+        logger.warning("Usando servicios simulados: %s", ", ".join(sorted(fakes)))
+        return fakes
+
+    def _build_http_client(self, upstream: str) -> httpx.AsyncClient:
+        "Cliente HTTP hacia un servicio externo (o su simulación), con latencia medida."
+        fake = self.fakes.get(upstream)
+        transport = fake.transport() if fake is not None else None
+        return httpx.AsyncClient(transport=MeteredTransport(upstream, transport))
+
+    @staticmethod
+    def _coalesce_window(config) -> float:
+        "Ventana de agrupado de Telegram; 0 con la cola durable, que no se combina con ella."
+        window = config.get("COALESCE_WINDOW", 0.0)
+        if window and config.get("UPDATE_QUEUE_PATH"):
+            # El worker procesa los updates de una conversación de a uno: la ventana solo
+            # demoraría cada respuesta sin llegar a juntar mensajes
+            logger.warning("COALESCE_WINDOW se ignora con UPDATE_QUEUE_PATH configurado")
+            return 0.0
+        return window
+
+    def _build_rate_limiter(self, name: str, capacity: float, refill_rate: float):
+        "Buckets por identidad en memoria, o en SQLite si se comparten entre workers."
+        store_path = self.config.get("RATE_LIMIT_STORE_PATH")
+        if store_path:
+            return SqliteRateLimiter(store_path, name, capacity, refill_rate)
+        return IdentityRateLimiter(
+            name,
+            capacity,
+            refill_rate,
+            max_identities=self.config.get("RATE_LIMIT_MAX_IDENTITIES", 10_000),
+        )
+
+    def _build_overload(self) -> OverloadController:
+        "Control de sobrecarga alimentado por el lag del loop, la latencia y las colas."
+        overload = OverloadController(
+            cooldown=self.config.get("OVERLOAD_COOLDOWN", 10.0),
+            hold=self.config.get("OVERLOAD_HOLD", 3.0),
+            max_loop_lag=self.config.get("OVERLOAD_LOOP_LAG", 0.5),
+            max_latency=self.config.get("OVERLOAD_LATENCY", 15.0),
+        )
+        overload.add_signal(
+            "queue_depth", self._pending_upstream_calls, self.config.get("OVERLOAD_QUEUE_DEPTH", 32)
+        )
+        return overload
+
+    def _pending_upstream_calls(self) -> int:
+        "Llamadas a Rasa y Gemini que esperan turno en los pools, limitadores y scheduler."
+        queues = [
+            self.gemini_executor,
+            getattr(self.agent_gateway, "_rasa_limiter", None),
+            getattr(self.agent_gateway, "_gemini_limiter", None),
+            self.gemini_service,
+        ]
+        return sum(getattr(queue, "queued", 0) for queue in queues if queue is not None)
+
+    def _build_limiter(self, name: str, max_key: str, max_default: int, drop_exceptions):
+        "Limitador de concurrencia adaptativo hacia un servicio (None si está desactivado)."
+        if not self.config.get("ADAPTIVE_CONCURRENCY", False):
+            return None
+        return AdaptiveConcurrencyLimiter(
+            name,
+            max_limit=self.config.get(max_key, max_default),
+            max_queue=self.config.get("ADAPTIVE_CONCURRENCY_QUEUE", 64),
+            drop_exceptions=drop_exceptions,
+        )
+
+    def _build_gemini_service(self):
+        "Modelo (o router) de Gemini, detrás del scheduler de cuota si hay cupos configurados."
+        service = self._build_gemini_models()
+        rpm = self.config.get("GEMINI_RPM", 0)
+        tpm = self.config.get("GEMINI_TPM", 0)
+        if not rpm and not tpm:
+            return service
+        return GeminiRequestScheduler.from_limits(
+            service,
+            requests_per_minute=rpm,
+            tokens_per_minute=tpm,
+            max_wait=self.config.get("GEMINI_QUEUE_MAX_WAIT", 20.0),
+        )
+
+    def _build_gemini_models(self) -> GeminiService | GeminiModelRouter:
+        "Un único modelo, o un router si GEMINI_MODELS declara varios."
+        if "gemini" in self.fakes:
+            return self.fakes["gemini"]
+        model_routes = self.config.get("GEMINI_MODELS") or []
+        if not model_routes:
+            return GeminiService()
+        routes = [
+            ModelRoute(
+                name=route["name"],
+                responder=GeminiService(model_name=route["name"]),
+                max_prompt_tokens=route["max_prompt_tokens"],
+                channels=tuple(route.get("channels", ())),
+            )
+            for route in model_routes
+        ]
+        return GeminiModelRouter(
+            routes,
+            latency_slo=self.config.get("GEMINI_LATENCY_SLO", 8.0),
+            overload=self.overload,
+        )
+
     async def shutdown(self) -> None:
+        if self.warmup is not None:
+            await self.warmup.cancel()
+        if self.overload is not None:
+            await self.overload.stop()
+        if self.settings_watcher is not None:
+            await self.settings_watcher.stop()
+        if self._unsubscribe_settings is not None:
+            self._unsubscribe_settings()
         for client in (self.http_client, self.telegram_client):
             if client is not None:
                 await client.aclose()
+        if self.gemini_executor is not None:
+            self.gemini_executor.shutdown()
+        if self.update_queue is not None:
+            self.update_queue.close()
+        for limiter in (self.rate_limiter, self.ip_rate_limiter):
+            if limiter is not None:
+                limiter.close()
+
+
+router = APIRouter()
 
 
 def create_app(config: dict | None = None) -> FastAPI:
@@ -110,10 +439,26 @@ def create_app(config: dict | None = None) -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(RequestMetricsMiddleware)
+    app.include_router(router)
     return app
 
 
-app = create_app()
+async def _allow(limiter, identity: str) -> bool:
+    "Consume cupo de ``identity``; sin limitador se admite siempre."
+    if limiter is None:
+        return True
+    if limiter.blocking:
+        return await asyncio.to_thread(limiter.allow, identity)
+    return limiter.allow(identity)
+
+
+def _overloaded(container: DependencyContainer) -> bool:
+    "Último escalón del control de sobrecarga: se rechaza sin consultar a Rasa ni a Gemini."
+    if container.overload is None or container.overload.level < REJECT:
+        return False
+    get_metrics().increment("overload.rejected")
+    return True
 
 
 def _get_container(request: Request) -> DependencyContainer:
@@ -123,21 +468,45 @@ def _get_container(request: Request) -> DependencyContainer:
     return container
 
 
-@app.post("/telegram/webhook")
-async def telegram_webhook(request: Request):
+@router.post("/telegram/webhook")
+async def telegram_webhook(request: Request, background_tasks: BackgroundTasks):
     "Webhook para manejar mensajes entrantes de Telegram"
     container = _get_container(request)
+    logger.info("[Telegram] Webhook POST recibido")
+    update = await request.json()
+    chat_id = ((update.get("message") or {}).get("chat") or {}).get("id")
+    if chat_id is not None and not await _allow(container.rate_limiter, f"telegram:{chat_id}"):
+        logger.warning("[Telegram] Chat %s superó su cupo de mensajes", chat_id)
+        return _telegram_rate_limited(container, chat_id)
+    if container.update_queue is not None:
+        # Con cola durable solo se guarda el update; lo procesa un worker aparte
+        await asyncio.to_thread(container.update_queue.append, "telegram", chat_id or "", update)
+        return PlainTextResponse("OK", status_code=200)
+    return await process_telegram_update(container, update, background_tasks)
+
+
+def _telegram_rate_limited(container, chat_id):
+    "Aviso de cupo superado en el cuerpo del webhook: no cuesta una llamada a la Bot API."
+    sender = container.telegram_sender
+    if sender is not None and container.telegram_presenter is not None:
+        parts = container.telegram_presenter.present(Message(to=chat_id, body=_RATE_LIMITED_TEXT))
+        payload = sender.inline_message(chat_id, parts[0])
+        if payload is not None:
+            return JSONResponse(payload)
+    # El chat tiene envíos pendientes: el mensaje se descarta sin aviso
+    return PlainTextResponse("OK", status_code=200)
+
+
+async def process_telegram_update(container, update: dict, background_tasks=None):
+    """Genera y envía la respuesta a un update de Telegram (webhook o worker de la cola).
+
+    La respuesta inline solo se usa con ``background_tasks``, es decir, desde el webhook.
+    """
     telegram_controller = container.telegram_controller
     telegram_presenter = container.telegram_presenter
-    if (
-        telegram_controller is None
-        or telegram_presenter is None
-        or container.telegram_client is None
-        or not container.telegram_api_url
-    ):
+    telegram_sender = container.telegram_sender
+    if telegram_controller is None or telegram_presenter is None or telegram_sender is None:
         raise RuntimeError("Telegram dependencies not initialized")
-    logger.info("[Telegram] Webhook POST recibido")
-    update = await request.json()
     message = update.get("message")
     if not message:
         logger.info("[Telegram] No es un mensaje válido. Ignorando.")
@@ -147,47 +516,121 @@ async def telegram_webhook(request: Request):
 
     # --- Manejo de mensajes de texto ---
     if "text" in message:
+        if _overloaded(container):
+            await telegram_sender.send_parts(
+                chat_id, telegram_presenter.present(Message(to=chat_id, body=OVERLOAD_MESSAGE))
+            )
+            return PlainTextResponse("OK", status_code=200)
         text = message["text"]
         entities = message.get("entities", None)
-        try:
-            chat_id, response_text = await telegram_controller.handle(chat_id, text, entities)
-        except (httpx.RequestError, httpx.HTTPStatusError) as e:
-            logger.error("[Telegram] Error de conexión: %s", e, exc_info=True)
-            response_text = (
-                "Lo sentimos, el servidor no está disponible en este momento. "
-                "Por favor, comuníquese con el área de mantenimiento."
+        if container.telegram_streaming:
+            await _stream_telegram_reply(
+                telegram_controller, telegram_presenter, telegram_sender, chat_id, text, entities
             )
-        except ValueError as e:
-            logger.error("[Telegram] Error de datos: %s", e, exc_info=True)
-            response_text = "Lo sentimos, hubo un error procesando su mensaje."
-        except (TypeError, AttributeError, KeyError) as e:
-            logger.error("[Telegram] Error inesperado: %s", e, exc_info=True)
-            response_text = (
-                "Lo sentimos, el servidor no está disponible en este momento. "
-                "Por favor, comuníquese con el área de mantenimiento."
+            return PlainTextResponse("OK", status_code=200)
+        reply = asyncio.ensure_future(
+            _telegram_reply(telegram_controller, telegram_presenter, chat_id, text, entities)
+        )
+        if container.telegram_inline_reply and background_tasks is not None:
+            return await _inline_telegram_reply(
+                reply,
+                telegram_sender,
+                chat_id,
+                background_tasks,
+                container.telegram_inline_reply_budget,
             )
-        logger.info("[Telegram] Respuesta generada: %s", response_text)
-        response_message = Message(to=chat_id, body=response_text)
-        formatted_responses = telegram_presenter.present(response_message)
-        if not isinstance(formatted_responses, list):
-            formatted_responses = [formatted_responses]
-        for resp in formatted_responses:
-            payload = {"chat_id": chat_id, **resp}
-            await container.telegram_client.post(container.telegram_api_url, json=payload)
-            await asyncio.sleep(container.telegram_message_delay)
+        async with telegram_sender.typing(chat_id):
+            chat_id, formatted_responses = await reply
+            await telegram_sender.send_parts(chat_id, formatted_responses)
         return PlainTextResponse("OK", status_code=200)
 
     logger.info("[Telegram] No es un mensaje de texto. Ignorando.")
     return PlainTextResponse("OK", status_code=200)
 
 
-@app.get("/")
+async def _telegram_reply(telegram_controller, telegram_presenter, chat_id, text, entities):
+    """Genera la respuesta y la devuelve presentada: (chat_id, partes para sendMessage).
+
+    No hay partes si el mensaje se agrupó con otros que se contestan juntos."""
+    try:
+        chat_id, response_text = await telegram_controller.handle(chat_id, text, entities)
+        if response_text is None:
+            return chat_id, []
+    except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        logger.error("[Telegram] Error de conexión: %s", e, exc_info=True)
+        response_text = _TELEGRAM_UNAVAILABLE_TEXT
+    except ValueError as e:
+        logger.error("[Telegram] Error de datos: %s", e, exc_info=True)
+        response_text = _TELEGRAM_ERROR_TEXT
+    except (TypeError, AttributeError, KeyError) as e:
+        logger.error("[Telegram] Error inesperado: %s", e, exc_info=True)
+        response_text = _TELEGRAM_UNAVAILABLE_TEXT
+    logger.info("[Telegram] Respuesta generada: %s", response_text)
+    formatted_responses = telegram_presenter.present(Message(to=chat_id, body=response_text))
+    if not isinstance(formatted_responses, list):
+        formatted_responses = [formatted_responses]
+    return chat_id, formatted_responses
+
+
+async def _inline_telegram_reply(reply, telegram_sender, chat_id, background_tasks, budget):
+    """Devuelve la primera parte de la respuesta en el cuerpo del webhook.
+
+    Telegram ejecuta el método del cuerpo sin que hagamos otra llamada HTTPS. Las partes
+    restantes, o toda la respuesta si no estuvo lista dentro de ``budget`` segundos, salen
+    por la Bot API después de responder al webhook. El indicador «escribiendo…» recién
+    se muestra al pasar el presupuesto: antes costaría la llamada que se quiere ahorrar.
+    """
+    done, _ = await asyncio.wait({reply}, timeout=budget)
+    if not done:
+        logger.info("[Telegram] Respuesta fuera del presupuesto inline; se envía aparte")
+        background_tasks.add_task(_send_when_ready, reply, telegram_sender, chat_id)
+        return PlainTextResponse("OK", status_code=200)
+    chat_id, parts = reply.result()
+    payload = telegram_sender.inline_message(chat_id, parts[0]) if parts else None
+    if payload is None:
+        background_tasks.add_task(telegram_sender.send_parts, chat_id, parts)
+        return PlainTextResponse("OK", status_code=200)
+    if len(parts) > 1:
+        background_tasks.add_task(telegram_sender.send_parts, chat_id, parts[1:])
+    return JSONResponse(payload, status_code=200)
+
+
+async def _send_when_ready(reply, telegram_sender, chat_id) -> None:
+    async with telegram_sender.typing(chat_id):
+        chat_id, parts = await reply
+        await telegram_sender.send_parts(chat_id, parts)
+
+
+async def _stream_telegram_reply(
+    telegram_controller, telegram_presenter, telegram_sender, chat_id, text, entities
+) -> None:
+    "Entrega la respuesta de forma progresiva (primera oración primero)."
+    stream_presenter = TelegramStreamPresenter(telegram_presenter)
+    chunks = telegram_controller.handle_stream(chat_id, text, entities)
+    try:
+        async with telegram_sender.typing(chat_id):
+            await telegram_sender.stream(chat_id, chunks, stream_presenter)
+        if stream_presenter.text.strip():
+            return
+        fallback_text = "No tengo una respuesta en este momento."
+    except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        logger.error("[Telegram] Error de conexión (streaming): %s", e, exc_info=True)
+        fallback_text = _TELEGRAM_UNAVAILABLE_TEXT
+    except (ValueError, TypeError, AttributeError, KeyError) as e:
+        logger.error("[Telegram] Error en streaming: %s", e, exc_info=True)
+        fallback_text = _TELEGRAM_ERROR_TEXT
+    if not stream_presenter.text.strip():
+        fallback_message = Message(to=chat_id, body=fallback_text)
+        await telegram_sender.send_parts(chat_id, telegram_presenter.present(fallback_message))
+
+
+@router.get("/")
 async def index():
     "Página de inicio simple para verificar que el servidor está funcionando."
     return {"message": "Bienvenido al webhook de FastAPI"}
 
 
-@app.post("/webchat/webhook")
+@router.post("/webchat/webhook")
 async def webchat_webhook(request: Request):
     """
     Endpoint para recibir mensajes del chat web y responder con el mensaje del agente.
@@ -195,7 +638,8 @@ async def webchat_webhook(request: Request):
     Responde: { "role": "assistant", "text": "respuesta del agente" }
     """
     logger.debug("[Webchat] Nueva request recibida en /webchat/webhook")
-    logger.debug("[Webchat] Headers: %s", dict(request.headers))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Webchat] Headers: %s", dict(request.headers))
     container = _get_container(request)
     webchat_controller = container.webchat_controller
     if webchat_controller is None:
@@ -219,6 +663,17 @@ async def webchat_webhook(request: Request):
         )
         return {"role": "assistant", "text": "Faltan datos en la solicitud."}
 
+    # Primero el cupo por IP, más amplio: un pedido rechazado ahí no gasta el del usuario
+    if (
+        request.client is not None
+        and not await _allow(container.ip_rate_limiter, f"ip:{request.client.host}")
+    ) or not await _allow(container.rate_limiter, f"webchat:{user_id}"):
+        logger.warning("[Webchat] %s superó su cupo de mensajes", user_id)
+        return {"role": "assistant", "text": _RATE_LIMITED_TEXT}
+
+    if _overloaded(container):
+        return {"role": "assistant", "text": OVERLOAD_MESSAGE}
+
     try:
         user_id, response_text = await webchat_controller.handle(user_id, user_text)
         logger.debug("[Webchat] Respuesta generada: %s", response_text)
@@ -240,7 +695,27 @@ async def webchat_webhook(request: Request):
 
     return {"role": "assistant", "text": response_text}
 
-@app.get("/test")
+
+@router.get("/metrics")
+async def metrics():
+    "Expone las métricas internas del proceso (colas, esperas, rechazos)."
+    return get_metrics().snapshot()
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    "Readiness: 200 solo cuando terminó el warm-up de arranque."
+    container = getattr(request.app.state, "container", None)
+    warmup = getattr(container, "warmup", None)
+    if warmup is None:
+        return JSONResponse({"ready": False, "steps": {}}, status_code=503)
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+
+@router.get("/test")
 async def test():
     "Página de inicio simple para verificar que el servidor está funcionando."
     return {"message": "El servidor está funcionando correctamente."}
+
+
+app = create_app()
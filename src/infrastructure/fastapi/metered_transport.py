@@ -0,0 +1,45 @@
+"""
+Path: src/infrastructure/fastapi/metered_transport.py
+"""
+
+import time
+
+import httpx
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Transporte httpx que mide la latencia y los errores de un servicio externo.
+
+    Envuelve al transporte real (o al de un servicio simulado) y registra
+    ``upstream.<nombre>.latency_seconds`` y ``upstream.<nombre>.errors``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        transport: httpx.AsyncBaseTransport | None = None,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.name = name
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._metrics = metrics or get_metrics()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self._metrics.increment(f"upstream.{self.name}.errors")
+            raise
+        finally:
+            self._metrics.observe(
+                f"upstream.{self.name}.latency_seconds", time.monotonic() - started
+            )
+        if response.status_code >= 500 or response.status_code == 429:
+            self._metrics.increment(f"upstream.{self.name}.errors")
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
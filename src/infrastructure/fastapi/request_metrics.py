@@ -0,0 +1,45 @@
+"""
+Path: src/infrastructure/fastapi/request_metrics.py
+"""
+
+import time
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+
+def endpoint_metric_name(path: str) -> str:
+    "Nombre de métrica para una ruta: ``/webchat/webhook`` -> ``webchat_webhook``."
+    return path.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+
+
+class RequestMetricsMiddleware:
+    """Middleware ASGI que registra latencia y códigos de estado por endpoint.
+
+    Usa la ruta declarada (no la URL recibida) para que las métricas no crezcan con cada
+    path desconocido; lo que no coincide con ninguna ruta se agrupa en ``unmatched``.
+    """
+
+    def __init__(self, app, metrics: MetricsRegistry | None = None):
+        self.app = app
+        self._metrics = metrics or get_metrics()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.monotonic()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            name = endpoint_metric_name(route.path) if route is not None else "unmatched"
+            self._metrics.observe(f"http.{name}.latency_seconds", time.monotonic() - started)
+            self._metrics.increment(f"http.{name}.status_{status}")
@@ -2,29 +2,45 @@
 Path: src/infrastructure/google_generativeai/gemini_service.py
 """
 
+import importlib
 import json
 
-import google.generativeai as genai
-
-from src.entities.gemini_responder import GeminiResponder
-from src.shared.config import get_config
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
+from src.shared.config import get_settings
 from src.shared.logger_rasa_v0 import get_logger
 
 logger = get_logger("gemini-service")
 
+DEFAULT_GEMINI_MODEL = "models/gemini-2.5-flash"
+
+
+def _genai():
+    "Importa google.generativeai en el primer uso: es el import más costoso del arranque."
+    return importlib.import_module("google.generativeai")
+
+
+def __getattr__(name):
+    # Mantiene ``gemini_service.genai`` disponible sin importarlo al cargar el módulo
+    if name == "genai":
+        return _genai()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-class GeminiService(GeminiResponder):
+
+class GeminiService(GeminiResponder, AsyncGeminiResponder):
     "Servicio para interactuar con el modelo Gemini de Google."
 
-    def __init__(self, api_key=None, instructions_json_path=None):
+    def __init__(self, api_key=None, instructions_json_path=None, model_name=None):
         try:
-            config = get_config()
+            config = get_settings()
             self.api_key = api_key or config.get("GOOGLE_GEMINI_API_KEY")
+            self.model_name = model_name or config.get("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
             logger.debug("API Key utilizada: %s", self.api_key)
             if not self.api_key:
                 logger.error("Falta GOOGLE_GEMINI_API_KEY en variables de entorno.")
                 raise ValueError("Falta GOOGLE_GEMINI_API_KEY en variables de entorno.")
-            genai.configure(api_key=self.api_key)
+            # El SDK se importa y configura en el primer uso (o en el warm-up)
+            self._sdk_configured = False
+            self._model = None
             logger.info("GeminiService inicializado correctamente.")
             self.system_instructions = None
             if instructions_json_path:
@@ -73,22 +89,67 @@ class GeminiService(GeminiResponder):
     def get_response(self, prompt, system_instructions=None):
         "Genera una respuesta usando el modelo Gemini, opcionalmente con instrucciones de sistema."
         try:
-            model_name = "models/gemini-2.5-flash"
-            logger.debug("Usando modelo Gemini: %s", model_name)
-            model = genai.GenerativeModel(model_name)
-            instructions = system_instructions or self.system_instructions
-            logger.debug("Instrucciones de sistema utilizadas: %s", instructions)
-            logger.debug("Prompt recibido: %s", prompt)
-            if instructions:
-                prompt_final = f"{instructions}\n\n{prompt}"
-                logger.debug("Prompt final enviado al modelo: %s", prompt_final)
-                response = model.generate_content(prompt_final)
-            else:
-                logger.debug("No se proporcionaron instrucciones de sistema.")
-                response = model.generate_content(prompt)
-            logger.info("Respuesta generada correctamente.")
-            logger.debug("Respuesta cruda del modelo: %s", response)
-            return response.text if hasattr(response, "text") else str(response)
+            model = self._build_model()
+            prompt_final = self._compose_prompt(prompt, system_instructions)
+            response = model.generate_content(prompt_final)
+            return self._extract_text(response)
+        except ValueError as e:
+            logger.error("Error al generar respuesta: %s", e)
+            return f"Error al generar respuesta con Gemini: {e}"
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        "Genera una respuesta con el cliente asíncrono del SDK, sin ocupar threads."
+        try:
+            model = self._build_model()
+            prompt_final = self._compose_prompt(prompt, system_instructions)
+            response = await model.generate_content_async(prompt_final)
+            return self._extract_text(response)
         except ValueError as e:
             logger.error("Error al generar respuesta: %s", e)
             return f"Error al generar respuesta con Gemini: {e}"
+
+    async def stream_response_async(self, prompt, system_instructions=None):
+        "Entrega la respuesta de Gemini en fragmentos usando la generación en streaming."
+        try:
+            model = self._build_model()
+            prompt_final = self._compose_prompt(prompt, system_instructions)
+            response = await model.generate_content_async(prompt_final, stream=True)
+            async for chunk in response:
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
+            logger.info("Respuesta en streaming completada.")
+        except ValueError as e:
+            logger.error("Error al generar respuesta en streaming: %s", e)
+            yield f"Error al generar respuesta con Gemini: {e}"
+
+    def warm_up(self) -> None:
+        "Importa y configura el SDK y construye el modelo antes del primer pedido (bloqueante)."
+        self._build_model()
+
+    def _build_model(self):
+        if self._model is None:
+            genai = _genai()
+            if not self._sdk_configured:
+                genai.configure(api_key=self.api_key)
+                self._sdk_configured = True
+            self._model = genai.GenerativeModel(self.model_name)
+        logger.debug("Usando modelo Gemini: %s", self.model_name)
+        return self._model
+
+    def _compose_prompt(self, prompt, system_instructions=None):
+        instructions = system_instructions or self.system_instructions
+        logger.debug("Instrucciones de sistema utilizadas: %s", instructions)
+        logger.debug("Prompt recibido: %s", prompt)
+        if instructions:
+            prompt_final = f"{instructions}\n\n{prompt}"
+            logger.debug("Prompt final enviado al modelo: %s", prompt_final)
+            return prompt_final
+        logger.debug("No se proporcionaron instrucciones de sistema.")
+        return prompt
+
+    @staticmethod
+    def _extract_text(response):
+        logger.info("Respuesta generada correctamente.")
+        logger.debug("Respuesta cruda del modelo: %s", response)
+        return response.text if hasattr(response, "text") else str(response)
@@ -0,0 +1,198 @@
+"""
+Path: src/infrastructure/google_generative_ai/model_router.py
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+from src.shared.overload import CHEAPER_MODEL, OverloadController
+from src.shared.request_context import get_request_context
+
+logger = get_logger("gemini-model-router")
+
+
+def estimate_tokens(text) -> int:
+    "Estimación barata de tokens (~4 caracteres por token)."
+    return (len(text or "") + 3) // 4
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    "Modelo candidato y las condiciones en que conviene usarlo."
+
+    name: str
+    responder: object
+    max_prompt_tokens: int = 1_000_000
+    channels: tuple[str, ...] = ()
+
+    def accepts(self, tokens: int, channel: str | None) -> bool:
+        "Indica si la ruta admite un prompt de ese tamaño para ese canal."
+        if self.channels and channel not in self.channels:
+            return False
+        return tokens <= self.max_prompt_tokens
+
+
+class GeminiModelRouter(GeminiResponder, AsyncGeminiResponder):
+    """Elige el modelo Gemini para cada prompt.
+
+    Las rutas se declaran de la más barata/rápida a la más capaz. Se usa la primera que
+    admite el tamaño estimado del prompt y el canal, y cuyo p95 de latencia reciente está
+    dentro del SLO; si ninguna lo cumple, la de menor p95. Cada decisión y su resultado
+    (latencia, error) se registran para ajustar la configuración.
+
+    Las muestras de latencia vencen a los ``sample_ttl`` segundos: una ruta que quedó
+    fuera del SLO por un pico (y por eso deja de recibir tráfico) vuelve a elegirse cuando
+    sus muestras viejas vencen.
+
+    Con ``overload`` en el escalón CHEAPER_MODEL o más alto se usa siempre la primera ruta
+    que admite el prompt, sin mirar el SLO.
+    """
+
+    def __init__(
+        self,
+        routes: list[ModelRoute],
+        latency_slo: float = 8.0,
+        window_size: int = 50,
+        min_samples: int = 5,
+        metrics: MetricsRegistry | None = None,
+        decision_log_size: int = 200,
+        overload: OverloadController | None = None,
+        sample_ttl: float = 300.0,
+        clock=time.monotonic,
+    ):
+        if not routes:
+            raise ValueError("GeminiModelRouter requiere al menos una ruta")
+        self.routes = list(routes)
+        self.latency_slo = latency_slo
+        self.min_samples = min_samples
+        self._metrics = metrics or get_metrics()
+        self._latencies = {route.name: deque(maxlen=window_size) for route in self.routes}
+        self._decisions: deque = deque(maxlen=decision_log_size)
+        self._overload = overload
+        self.sample_ttl = sample_ttl
+        self._clock = clock
+
+    @property
+    def decisions(self) -> list[dict]:
+        "Decisiones recientes (modelo, canal, tokens, motivo, latencia y resultado)."
+        return list(self._decisions)
+
+    def p95(self, model_name: str) -> float | None:
+        "p95 de latencia observado recientemente para el modelo, si hay muestras suficientes."
+        samples = self._latencies.get(model_name)
+        if samples is None:
+            return None
+        expired = self._clock() - self.sample_ttl
+        while samples and samples[0][0] < expired:
+            samples.popleft()
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(latency for _at, latency in samples)
+        return ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+
+    def record_latency(self, model_name: str, seconds: float) -> None:
+        "Registra una latencia observada para el modelo."
+        self._latencies[model_name].append((self._clock(), seconds))
+
+    def select(self, prompt, channel: str | None = None) -> tuple[ModelRoute, str]:
+        "Devuelve la ruta elegida y el motivo de la elección."
+        tokens = estimate_tokens(prompt)
+        candidates = [route for route in self.routes if route.accepts(tokens, channel)]
+        if not candidates:
+            largest = max(self.routes, key=lambda route: route.max_prompt_tokens)
+            return largest, "sin ruta para el tamaño; se usa el modelo de mayor capacidad"
+        if self._overload is not None and self._overload.level >= CHEAPER_MODEL:
+            return candidates[0], "sobrecarga: se usa la ruta más barata"
+
+        for route in candidates:
+            p95 = self.p95(route.name)
+            if p95 is None or p95 <= self.latency_slo:
+                return route, "primera ruta dentro del SLO"
+
+        fastest = min(candidates, key=lambda route: self.p95(route.name))
+        return fastest, "ninguna ruta cumple el SLO; se usa la de menor p95"
+
+    def warm_up(self) -> None:
+        "Prepara el modelo de cada ruta (bloqueante)."
+        for route in self.routes:
+            warm_up = getattr(route.responder, "warm_up", None)
+            if warm_up is not None:
+                warm_up()
+
+    def get_response(self, prompt, system_instructions=None):
+        "Genera la respuesta con el modelo elegido (camino síncrono)."
+        route, decision = self._decide(prompt)
+        started = time.monotonic()
+        try:
+            reply = route.responder.get_response(prompt, system_instructions)
+        except Exception:
+            self._record_outcome(route, decision, started, ok=False)
+            raise
+        self._record_outcome(route, decision, started, ok=_is_ok(reply))
+        return reply
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        "Genera la respuesta con el modelo elegido sin bloquear el event loop."
+        route, decision = self._decide(prompt)
+        started = time.monotonic()
+        try:
+            if isinstance(route.responder, AsyncGeminiResponder):
+                reply = await route.responder.get_response_async(prompt, system_instructions)
+            else:
+                reply = await asyncio.to_thread(
+                    route.responder.get_response, prompt, system_instructions
+                )
+        except Exception:
+            self._record_outcome(route, decision, started, ok=False)
+            raise
+        self._record_outcome(route, decision, started, ok=_is_ok(reply))
+        return reply
+
+    async def stream_response_async(self, prompt, system_instructions=None):
+        "Entrega en fragmentos la respuesta del modelo elegido."
+        route, decision = self._decide(prompt)
+        if not isinstance(route.responder, AsyncGeminiResponder):
+            yield await self.get_response_async(prompt, system_instructions)
+            return
+        started = time.monotonic()
+        ok = False
+        try:
+            async for chunk in route.responder.stream_response_async(prompt, system_instructions):
+                yield chunk
+            ok = True
+        finally:
+            self._record_outcome(route, decision, started, ok=ok)
+
+    def _decide(self, prompt) -> tuple[ModelRoute, dict]:
+        channel = get_request_context().channel
+        route, reason = self.select(prompt, channel)
+        decision = {
+            "model": route.name,
+            "channel": channel,
+            "prompt_tokens": estimate_tokens(prompt),
+            "reason": reason,
+        }
+        self._metrics.increment(f"gemini.router.{route.name}.selected")
+        logger.debug("Ruteo Gemini | modelo=%s | motivo=%s", route.name, reason)
+        return route, decision
+
+    def _record_outcome(self, route: ModelRoute, decision: dict, started: float, ok: bool):
+        latency = time.monotonic() - started
+        self.record_latency(route.name, latency)
+        self._metrics.observe(f"gemini.model.{route.name}.latency_seconds", latency)
+        if not ok:
+            self._metrics.increment(f"gemini.router.{route.name}.errors")
+        self._decisions.append({**decision, "latency": latency, "ok": ok})
+
+
+def _is_ok(reply) -> bool:
+    return (
+        isinstance(reply, str)
+        and bool(reply.strip())
+        and not reply.startswith("Error al generar respuesta con Gemini")
+    )
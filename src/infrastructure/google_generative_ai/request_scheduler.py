@@ -0,0 +1,255 @@
+"""
+Path: src/infrastructure/google_generative_ai/request_scheduler.py
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiUnavailableError
+from src.infrastructure.google_generative_ai.model_router import estimate_tokens
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+from src.shared.request_context import get_request_context
+from src.shared.token_bucket import TokenBucket
+
+logger = get_logger("gemini-request-scheduler")
+
+# Menor valor = mayor prioridad. Sin canal (tareas de fondo) va al final.
+PRIORITY_BY_CHANNEL = {"webchat": 0, "telegram": 1}
+BACKGROUND_PRIORITY = 2
+_RATE_LIMIT_STATUS = 429
+
+
+class GeminiQuotaExceededError(GeminiUnavailableError):
+    "La solicitud no obtuvo cupo de Gemini antes de su deadline."
+
+
+@dataclass(order=True)
+class _Ticket:
+    priority: int
+    deadline: float
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class GeminiRequestScheduler(AsyncGeminiResponder):
+    """Cola con prioridades delante de Gemini que respeta los cupos RPM/TPM.
+
+    Cada solicitud espera turno hasta que ambos buckets (solicitudes y tokens por minuto)
+    tienen cupo; se atiende primero webchat, luego Telegram y al final tareas sin canal.
+    Si el cupo no alcanza antes del deadline (``max_wait``) la solicitud se descarta con
+    ``GeminiQuotaExceededError`` en vez de esperar indefinidamente. Un 429 del proveedor
+    vacía los buckets y la solicitud se reintenta cuando vuelve a haber cupo.
+    """
+
+    def __init__(
+        self,
+        responder,
+        request_bucket: TokenBucket | None = None,
+        token_bucket: TokenBucket | None = None,
+        max_wait: float = 20.0,
+        max_retries: int = 1,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.responder = responder
+        self.request_bucket = request_bucket
+        self.token_bucket = token_bucket
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._metrics = metrics or get_metrics()
+        self._queue: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def from_limits(
+        cls, responder, requests_per_minute: int = 0, tokens_per_minute: int = 0, **kwargs
+    ) -> "GeminiRequestScheduler":
+        "Construye el scheduler a partir de los cupos por minuto (0 = sin límite)."
+        return cls(
+            responder,
+            request_bucket=(
+                TokenBucket.per_minute(requests_per_minute) if requests_per_minute > 0 else None
+            ),
+            token_bucket=(
+                TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute > 0 else None
+            ),
+            **kwargs,
+        )
+
+    @property
+    def queued(self) -> int:
+        "Solicitudes esperando cupo."
+        return sum(1 for ticket in self._queue if not ticket.future.done())
+
+    def warm_up(self) -> None:
+        "Prepara el responder envuelto (bloqueante); no consume cupo."
+        warm_up = getattr(self.responder, "warm_up", None)
+        if warm_up is not None:
+            warm_up()
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        "Espera cupo según la prioridad del canal y genera la respuesta."
+        priority = self._priority()
+        deadline = time.monotonic() + self.max_wait
+        tokens = self._estimate(prompt, system_instructions)
+        attempt = 0
+        while True:
+            await self._acquire(priority, deadline, tokens)
+            try:
+                reply = await self._call(prompt, system_instructions)
+            except Exception as exc:
+                if not _is_rate_limited(exc):
+                    raise
+                self._on_rate_limited(exc)
+                if attempt >= self.max_retries or not self._limited:
+                    raise GeminiQuotaExceededError("Gemini rechazó la solicitud por cuota") from exc
+                attempt += 1
+                continue
+            self._charge_output(reply)
+            return reply
+
+    async def stream_response_async(self, prompt, system_instructions=None):
+        "Espera cupo y entrega la respuesta en fragmentos."
+        deadline = time.monotonic() + self.max_wait
+        await self._acquire(self._priority(), deadline, self._estimate(prompt, system_instructions))
+        if not isinstance(self.responder, AsyncGeminiResponder):
+            reply = await asyncio.to_thread(
+                self.responder.get_response, prompt, system_instructions
+            )
+            self._charge_output(reply)
+            yield reply
+            return
+
+        generated = []
+        try:
+            async for chunk in self.responder.stream_response_async(prompt, system_instructions):
+                generated.append(chunk)
+                yield chunk
+        except Exception as exc:
+            if not _is_rate_limited(exc):
+                raise
+            self._on_rate_limited(exc)
+            raise GeminiQuotaExceededError("Gemini rechazó la solicitud por cuota") from exc
+        finally:
+            self._charge_output("".join(generated))
+
+    @property
+    def _limited(self) -> bool:
+        return self.request_bucket is not None or self.token_bucket is not None
+
+    async def _call(self, prompt, system_instructions):
+        if isinstance(self.responder, AsyncGeminiResponder):
+            return await self.responder.get_response_async(prompt, system_instructions)
+        return await asyncio.to_thread(self.responder.get_response, prompt, system_instructions)
+
+    async def _acquire(self, priority: int, deadline: float, tokens: int) -> None:
+        if not self._limited:
+            return
+        ticket = _Ticket(
+            priority, deadline, next(self._seq), tokens, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._queue, ticket)
+        enqueued = time.monotonic()
+        self._dispatch()
+        try:
+            await ticket.future
+        finally:
+            self._metrics.observe("gemini.scheduler.wait_seconds", time.monotonic() - enqueued)
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._drop_expired(now)
+        while self._queue:
+            ticket = self._queue[0]
+            if ticket.future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._wait_for(ticket.tokens)
+            if now + wait > ticket.deadline:
+                # Aunque sea la próxima en salir, no llegaría a tiempo
+                heapq.heappop(self._queue)
+                self._drop(ticket)
+                continue
+            if wait > 0:
+                earliest_deadline = min(t.deadline for t in self._queue if not t.future.done())
+                self._schedule(min(wait, earliest_deadline - now))
+                break
+            heapq.heappop(self._queue)
+            self._consume(ticket.tokens)
+            self._metrics.increment("gemini.scheduler.granted")
+            ticket.future.set_result(None)
+        self._metrics.set_gauge("gemini.scheduler.queued", self.queued)
+
+    def _drop_expired(self, now: float) -> None:
+        expired = [t for t in self._queue if t.deadline <= now and not t.future.done()]
+        if not expired:
+            return
+        for ticket in expired:
+            self._drop(ticket)
+        self._queue = [t for t in self._queue if not t.future.done()]
+        heapq.heapify(self._queue)
+
+    def _drop(self, ticket: _Ticket) -> None:
+        self._metrics.increment("gemini.scheduler.dropped")
+        logger.warning("Solicitud Gemini descartada: sin cupo dentro de %.1fs", self.max_wait)
+        ticket.future.set_exception(
+            GeminiQuotaExceededError(f"Sin cupo de Gemini dentro de {self.max_wait:.1f}s")
+        )
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(max(delay, 0.0), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _wait_for(self, tokens: int) -> float:
+        waits = [0.0]
+        if self.request_bucket is not None:
+            waits.append(self.request_bucket.time_until(1))
+        if self.token_bucket is not None:
+            waits.append(self.token_bucket.time_until(tokens))
+        return max(waits)
+
+    def _consume(self, tokens: int) -> None:
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(tokens)
+
+    def _charge_output(self, reply) -> None:
+        # Los tokens generados también cuentan para el TPM; se descuentan al terminar
+        if self.token_bucket is not None and isinstance(reply, str):
+            self.token_bucket.consume(estimate_tokens(reply))
+
+    def _on_rate_limited(self, exc: Exception) -> None:
+        self._metrics.increment("gemini.scheduler.rate_limited")
+        logger.warning("Gemini devolvió límite de cuota (429): %s", exc)
+        for bucket in (self.request_bucket, self.token_bucket):
+            if bucket is not None:
+                bucket.drain()
+
+    @staticmethod
+    def _priority() -> int:
+        return PRIORITY_BY_CHANNEL.get(get_request_context().channel, BACKGROUND_PRIORITY)
+
+    @staticmethod
+    def _estimate(prompt, system_instructions) -> int:
+        instructions = system_instructions if isinstance(system_instructions, str) else ""
+        return estimate_tokens(prompt) + estimate_tokens(instructions)
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    # google.api_core.exceptions.ResourceExhausted expone code == 429
+    code = getattr(exc, "code", None)
+    try:
+        return int(code) == _RATE_LIMIT_STATUS
+    except (TypeError, ValueError):
+        return type(exc).__name__ in ("ResourceExhausted", "TooManyRequests")
@@ -0,0 +1,49 @@
+"""
+Path: src/infrastructure/load_testing/report.py
+"""
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def _mb(value) -> str:
+    return "-" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+
+def format_report(report: dict) -> str:
+    "Reporte de una corrida de carga como tabla de texto."
+    lines = [
+        f"Escenario: {report['scenario']} ({report.get('mode', '-')})",
+        f"Duración: {report['elapsed']:.1f}s | pedidos programados: {report['target_requests']}",
+        "",
+        f"{'endpoint':<20} {'enviados':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'errores':>8} {'degrad.':>8} {'descart.':>8}",
+    ]
+    for name, stats in report["endpoints"].items():
+        lines.append(
+            f"{name:<20} {stats['sent']:>8} {stats['throughput']:>7.1f} {_ms(stats['p50']):>8} "
+            f"{_ms(stats['p95']):>8} {_ms(stats['p99']):>8} {_ms(stats['max']):>8} "
+            f"{stats['error_rate']:>7.1%} {stats['degraded']:>8} {stats['dropped']:>8}"
+        )
+
+    stages = report.get("stages") or {}
+    if stages.get("latency"):
+        lines += ["", f"{'etapa':<44} {'n':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for name, stats in sorted(stages["latency"].items()):
+            lines.append(
+                f"{name:<44} {stats['count']:>7} {_ms(stats['p50']):>8} "
+                f"{_ms(stats['p95']):>8} {_ms(stats['p99']):>8}"
+            )
+    if stages.get("errors"):
+        lines += ["", "Errores por etapa:"]
+        lines += [f"  {name}: {count}" for name, count in sorted(stages["errors"].items())]
+
+    memory = report.get("memory")
+    if memory:
+        lines += [
+            "",
+            f"Memoria: crecimiento {_mb(memory['growth_bytes'])} | pico "
+            f"{_mb(memory['peak_bytes'])} | RSS máx. {memory['max_rss_kb'] / 1024:.1f} MB",
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,265 @@
+"""
+Path: src/infrastructure/load_testing/runner.py
+"""
+
+import asyncio
+import gc
+import resource
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+import httpx
+
+from src.infrastructure.load_testing.scenario import LoadRequest, Scenario
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("load-test")
+
+# Respuestas del webchat que indican que el pedido se atendió con un fallback de error
+_DEGRADED_MARKERS = ("Lo sentimos", "Error al generar respuesta", "[Error procesando")
+_STAGE_PREFIXES = ("http.", "upstream.", "agent.", "gemini.", "executor.")
+
+
+class LoadRunner:
+    """Envía los pedidos de un escenario a la tasa objetivo y mide cada respuesta.
+
+    La carga es de lazo abierto: los pedidos salen en su instante programado aunque los
+    anteriores no hayan terminado, como llegan los webhooks reales. Si hay más de
+    ``max_in_flight`` pedidos pendientes, los nuevos se descartan y se cuentan como
+    ``dropped`` (señal de que la instancia ya no da abasto).
+    """
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        client: httpx.AsyncClient,
+        event_handlers: dict | None = None,
+        server_metrics: MetricsRegistry | None = None,
+    ):
+        self.scenario = scenario
+        self.client = client
+        self.event_handlers = event_handlers or {}
+        self.server_metrics = server_metrics
+        self.latencies = MetricsRegistry(window_size=1_000_000)
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def run(self) -> dict:
+        "Ejecuta el escenario completo y devuelve el reporte."
+        started = time.perf_counter()
+        events = asyncio.ensure_future(self._run_events(started))
+        requests = self.scenario.requests()
+        try:
+            for at in self.scenario.arrivals():
+                delay = started + at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                request = next(requests)
+                if len(self._in_flight) >= self.scenario.max_in_flight:
+                    self.latencies.increment(f"{_endpoint_name(request)}.dropped")
+                    continue
+                task = asyncio.ensure_future(self._send(request))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+            if self._in_flight:
+                await asyncio.wait(set(self._in_flight))
+        finally:
+            events.cancel()
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> dict:
+        "Throughput, percentiles y errores por endpoint, y tiempos por etapa del servidor."
+        snapshot = self.latencies.snapshot()
+        counters = snapshot["counters"]
+        endpoints = {}
+        names = {key.split(".", 1)[0] for key in counters}
+        for name in sorted(names):
+            latency = snapshot["observations"].get(f"{name}.latency_seconds", {})
+            sent = counters.get(f"{name}.sent", 0)
+            errors = counters.get(f"{name}.errors", 0)
+            completed = sent - errors
+            endpoints[name] = {
+                "sent": int(sent),
+                "completed": int(completed),
+                "errors": int(errors),
+                "degraded": int(counters.get(f"{name}.degraded", 0)),
+                "dropped": int(counters.get(f"{name}.dropped", 0)),
+                "error_rate": errors / sent if sent else 0.0,
+                "throughput": completed / elapsed if elapsed else 0.0,
+                "p50": latency.get("p50"),
+                "p95": latency.get("p95"),
+                "p99": latency.get("p99"),
+                "max": latency.get("max"),
+            }
+        return {
+            "scenario": self.scenario.name,
+            "elapsed": elapsed,
+            "target_requests": sum(1 for _ in self.scenario.arrivals()),
+            "endpoints": endpoints,
+            "stages": self._stage_report(),
+        }
+
+    async def _send(self, request: LoadRequest) -> None:
+        name = _endpoint_name(request)
+        self.latencies.increment(f"{name}.sent")
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(
+                request.endpoint, json=request.payload, timeout=self.scenario.timeout
+            )
+        except httpx.HTTPError as exc:
+            self.latencies.increment(f"{name}.errors")
+            logger.debug("Pedido a %s falló: %s", request.endpoint, exc)
+            return
+        self.latencies.observe(f"{name}.latency_seconds", time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.latencies.increment(f"{name}.errors")
+        elif request.channel == "webchat" and _is_degraded(response):
+            self.latencies.increment(f"{name}.degraded")
+
+    async def _run_events(self, started: float) -> None:
+        for event in self.scenario.events:
+            delay = started + event.at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            handler = self.event_handlers.get(event.action)
+            if handler is None:
+                logger.warning("Evento '%s' ignorado: no se puede aplicar aquí", event.action)
+                continue
+            logger.info("Evento '%s' a los %.1fs", event.action, event.at)
+            handler()
+
+    def _stage_report(self) -> dict:
+        if self.server_metrics is None:
+            return {}
+        return stage_report(self.server_metrics.snapshot())
+
+
+def _endpoint_name(request: LoadRequest) -> str:
+    return request.endpoint.strip("/").replace("/", "_")
+
+
+def _is_degraded(response: httpx.Response) -> bool:
+    try:
+        text = str(response.json().get("text", ""))
+    except (ValueError, AttributeError):
+        return True
+    return text.startswith(_DEGRADED_MARKERS)
+
+
+class MemoryTracker:
+    """Mide el crecimiento de memoria durante la carga (tracemalloc y RSS máximo).
+
+    tracemalloc encarece cada asignación, así que las latencias medidas con el tracker
+    activo son algo peores que las reales.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.samples: list[tuple[float, int]] = []
+        self._baseline = 0
+        self._task: asyncio.Task | None = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        gc.collect()
+        tracemalloc.start()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter()
+        self._task = asyncio.ensure_future(self._sample())
+
+    async def stop(self) -> dict:
+        if self._task is not None:
+            self._task.cancel()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "growth_bytes": current - self._baseline,
+            "peak_bytes": peak - self._baseline,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "samples": [(round(at, 2), size - self._baseline) for at, size in self.samples],
+        }
+
+    async def _sample(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.samples.append(
+                (time.perf_counter() - self._started, tracemalloc.get_traced_memory()[0])
+            )
+
+
+@asynccontextmanager
+async def in_process_client(app, timeout: float = 60.0):
+    """Arranca la aplicación (lifespan y warm-up) y devuelve un cliente que la llama en
+    memoria, junto con los manejadores de eventos sobre sus servicios simulados."""
+    async with app.router.lifespan_context(app):
+        container = app.state.container
+        if container.warmup is not None:
+            await container.warmup.wait()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://load-test", timeout=timeout
+        ) as client:
+            yield client, _fake_event_handlers(container.fakes)
+
+
+def _fake_event_handlers(fakes: dict) -> dict:
+    rasa = fakes.get("rasa")
+    if rasa is None:
+        return {}
+
+    def outage():
+        rasa.outage = True
+
+    def recovery():
+        rasa.outage = False
+
+    return {"rasa_outage": outage, "rasa_recovery": recovery}
+
+
+async def run_in_process(app, scenario: Scenario, track_memory: bool = True) -> dict:
+    "Ejecuta el escenario contra ``app`` en el mismo proceso."
+    metrics = get_metrics()
+    async with in_process_client(app, scenario.timeout) as (client, handlers):
+        metrics.reset()
+        tracker = MemoryTracker() if track_memory else None
+        if tracker is not None:
+            tracker.start()
+        runner = LoadRunner(scenario, client, handlers, server_metrics=metrics)
+        report = await runner.run()
+        report["mode"] = "in-process"
+        report["memory"] = await tracker.stop() if tracker is not None else None
+    return report
+
+
+async def run_over_http(base_url: str, scenario: Scenario) -> dict:
+    """Ejecuta el escenario contra una instancia desplegada. Las etapas salen de su endpoint
+    /metrics (acumuladas desde que arrancó) y los eventos sobre servicios simulados se
+    ignoran."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=scenario.timeout) as client:
+        report = await LoadRunner(scenario, client).run()
+        try:
+            response = await client.get("/metrics")
+            report["stages"] = stage_report(response.json())
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("No se pudieron leer las métricas de %s: %s", base_url, exc)
+    report["mode"] = base_url
+    report["memory"] = None
+    return report
+
+
+def stage_report(snapshot: dict) -> dict:
+    "Latencias por etapa (HTTP, servicios externos, Gemini) y errores de un snapshot."
+    stages = {
+        name: {key: values.get(key) for key in ("count", "p50", "p95", "p99", "max")}
+        for name, values in snapshot.get("observations", {}).items()
+        if name.startswith(_STAGE_PREFIXES)
+    }
+    errors = {
+        name: int(value)
+        for name, value in snapshot.get("counters", {}).items()
+        if name.endswith(".errors") or ".status_5" in name
+    }
+    return {"latency": stages, "errors": errors}
@@ -0,0 +1,231 @@
+"""
+Path: src/infrastructure/load_testing/scenario.py
+"""
+
+import json
+import random
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+CHANNEL_ENDPOINTS = {
+    "telegram": "/telegram/webhook",
+    "webchat": "/webchat/webhook",
+}
+EVENT_ACTIONS = ("rasa_outage", "rasa_recovery")
+DEFAULT_MESSAGES = (
+    "hola",
+    "¿Qué medidas de bolsas tienen?",
+    "¿Hacen bolsas con logo impreso?",
+    "¿Cuál es la cantidad mínima para imprimir?",
+    "¿Hacen envíos al interior?",
+    "gracias, hasta luego",
+)
+
+
+class ScenarioError(ValueError):
+    "Archivo de escenario inválido."
+
+
+@dataclass(frozen=True)
+class Phase:
+    "Tramo del escenario: ``rate`` pedidos por segundo durante ``duration`` segundos."
+
+    duration: float
+    rate: float
+
+
+@dataclass(frozen=True)
+class ScenarioEvent:
+    "Acción sobre los servicios simulados a los ``at`` segundos de iniciada la carga."
+
+    at: float
+    action: str
+
+
+@dataclass(frozen=True)
+class LoadRequest:
+    "Pedido a enviar: canal, usuario sintético y cuerpo JSON del webhook."
+
+    channel: str
+    user: str
+    payload: dict
+
+    @property
+    def endpoint(self) -> str:
+        return CHANNEL_ENDPOINTS[self.channel]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Perfil de carga: tramos de tasa objetivo, mezcla de canales, usuarios y mensajes.
+
+    Con ``recorded`` los pedidos salen, en orden y de forma cíclica, de un archivo JSONL de
+    updates de Telegram o payloads de webchat grabados; si no, se generan a partir de
+    ``messages`` repartidos entre ``users`` usuarios.
+    """
+
+    name: str
+    phases: tuple[Phase, ...]
+    description: str = ""
+    arrival: str = "constant"
+    users: int = 10
+    channels: tuple[tuple[str, float], ...] = (("telegram", 0.5), ("webchat", 0.5))
+    messages: tuple[str, ...] = DEFAULT_MESSAGES
+    recorded: tuple[LoadRequest, ...] = ()
+    events: tuple[ScenarioEvent, ...] = ()
+    env: dict = field(default_factory=dict)
+    seed: int = 0
+    max_in_flight: int = 1000
+    timeout: float = 60.0
+
+    @property
+    def duration(self) -> float:
+        return sum(phase.duration for phase in self.phases)
+
+    def scaled(self, rate_factor: float) -> "Scenario":
+        "Copia del escenario con todas las tasas multiplicadas por ``rate_factor``."
+        phases = tuple(Phase(phase.duration, phase.rate * rate_factor) for phase in self.phases)
+        return replace(self, phases=phases)
+
+    def arrivals(self):
+        "Instantes (segundos desde el inicio) en que se envía cada pedido."
+        rng = random.Random(self.seed)
+        start = 0.0
+        for phase in self.phases:
+            end = start + phase.duration
+            if self.arrival == "poisson" and phase.rate > 0:
+                at = start + rng.expovariate(phase.rate)
+                while at < end:
+                    yield at
+                    at += rng.expovariate(phase.rate)
+            else:
+                for index in range(round(phase.duration * phase.rate)):
+                    yield start + index / phase.rate
+            start = end
+
+    def requests(self):
+        "Secuencia infinita de pedidos (grabados o sintéticos)."
+        if self.recorded:
+            while True:
+                yield from self.recorded
+        rng = random.Random(self.seed)
+        channels = [name for name, _ in self.channels]
+        weights = [weight for _, weight in self.channels]
+        turns = [0] * self.users
+        sequence = 0
+        while True:
+            user = sequence % self.users
+            sequence += 1
+            text = self.messages[(turns[user] + user) % len(self.messages)]
+            turns[user] += 1
+            channel = rng.choices(channels, weights)[0]
+            yield synthetic_request(channel, user, text, update_id=sequence)
+
+
+def synthetic_request(channel: str, user: int, text: str, update_id: int = 1) -> LoadRequest:
+    "Pedido sintético de un usuario en el formato que recibe cada webhook."
+    if channel == "telegram":
+        chat_id = 100_000 + user
+        payload = {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Carga"},
+                "text": text,
+            },
+        }
+        return LoadRequest("telegram", str(chat_id), payload)
+    user_id = f"load-{user}"
+    return LoadRequest("webchat", user_id, {"user_id": user_id, "text": text})
+
+
+def load_scenario(path) -> Scenario:
+    "Lee un escenario JSON; las rutas de ``recorded`` son relativas al archivo."
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ScenarioError(f"No se pudo leer el escenario {path}: {exc}") from exc
+    return parse_scenario(data, base_path=path.parent)
+
+
+def parse_scenario(data: dict, base_path=None) -> Scenario:
+    "Valida un escenario ya decodificado."
+    try:
+        phases = tuple(
+            Phase(float(phase["duration"]), float(phase["rate"])) for phase in data["phases"]
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ScenarioError("Cada fase necesita 'duration' y 'rate' numéricos.") from exc
+    if not phases or any(phase.duration <= 0 or phase.rate < 0 for phase in phases):
+        raise ScenarioError("Se necesita al menos una fase con duración positiva.")
+
+    arrival = data.get("arrival", "constant")
+    if arrival not in ("constant", "poisson"):
+        raise ScenarioError(f"arrival debe ser 'constant' o 'poisson', no {arrival!r}.")
+
+    channels = tuple(
+        (str(name), float(weight)) for name, weight in (data.get("channels") or {}).items()
+    )
+    unknown = [name for name, _ in channels if name not in CHANNEL_ENDPOINTS]
+    if unknown:
+        raise ScenarioError(f"Canales desconocidos: {', '.join(unknown)}.")
+
+    events = tuple(
+        ScenarioEvent(float(event["at"]), event["action"]) for event in data.get("events", [])
+    )
+    unsupported = [event.action for event in events if event.action not in EVENT_ACTIONS]
+    if unsupported:
+        raise ScenarioError(f"Eventos desconocidos: {', '.join(unsupported)}.")
+
+    recorded = ()
+    if data.get("recorded"):
+        recorded_path = Path(base_path or ".") / data["recorded"]
+        recorded = tuple(_load_recorded(recorded_path))
+        if not recorded:
+            raise ScenarioError(f"{recorded_path} no tiene pedidos grabados.")
+
+    scenario = Scenario(
+        name=str(data.get("name", "escenario")),
+        description=str(data.get("description", "")),
+        phases=phases,
+        arrival=arrival,
+        users=max(1, int(data.get("users", 10))),
+        messages=tuple(data.get("messages") or DEFAULT_MESSAGES),
+        recorded=recorded,
+        events=tuple(sorted(events, key=lambda event: event.at)),
+        env={str(key): str(value) for key, value in data.get("env", {}).items()},
+        seed=int(data.get("seed", 0)),
+        max_in_flight=max(1, int(data.get("max_in_flight", 1000))),
+        timeout=float(data.get("timeout", 60.0)),
+    )
+    if channels:
+        scenario = replace(scenario, channels=channels)
+    return scenario
+
+
+def _load_recorded(path: Path):
+    """Pedidos grabados, uno por línea: updates de Telegram (con ``update_id``), payloads de
+    webchat (con ``user_id``) o ``{"channel": ..., "payload": ...}``."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError as exc:
+        raise ScenarioError(f"No se pudo leer {path}: {exc}") from exc
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            raise ScenarioError(f"{path}:{number}: JSON inválido ({exc}).") from exc
+        channel, payload = item.get("channel"), item.get("payload", item)
+        if channel is None:
+            channel = "telegram" if "update_id" in payload else "webchat"
+        if channel not in CHANNEL_ENDPOINTS:
+            raise ScenarioError(f"{path}:{number}: canal desconocido {channel!r}.")
+        if channel == "telegram":
+            user = str(payload.get("message", {}).get("chat", {}).get("id", ""))
+        else:
+            user = str(payload.get("user_id", ""))
+        yield LoadRequest(channel, user, payload)
@@ -0,0 +1,199 @@
+"""
+Path: src/infrastructure/queue/sqlite_update_queue.py
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("sqlite-update-queue")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS updates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    conversation TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS updates_status ON updates (status, conversation, id);
+"""
+
+# El update más viejo de cada conversación libre: pendiente, o reclamado con la lease
+# vencida (el worker murió). Una conversación con una lease vigente no se toca, así sus
+# mensajes se procesan en orden.
+_CLAIMABLE = """
+SELECT MIN(id) FROM updates
+WHERE status IN ('pending', 'claimed')
+  AND conversation NOT IN (
+      SELECT conversation FROM updates WHERE status = 'claimed' AND lease_until >= :now
+  )
+GROUP BY conversation
+ORDER BY 1
+LIMIT :limit
+"""
+
+
+@dataclass(frozen=True)
+class QueuedUpdate:
+    "Update reclamado por un worker."
+
+    id: int
+    channel: str
+    conversation: str
+    payload: dict
+    attempts: int
+
+
+class SqliteUpdateQueue:
+    """Cola durable de updates entrantes en SQLite (modo WAL).
+
+    El webhook agrega y confirma; los workers (en otros procesos) reclaman updates con una
+    lease de ``lease_seconds``, los procesan y los marcan como hechos. Si un worker muere,
+    su lease vence y otro retoma el update; tras ``max_attempts`` intentos queda como
+    ``failed``. Los updates de una misma conversación se entregan de a uno y en orden.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 5,
+        metrics: MetricsRegistry | None = None,
+        clock=time.time,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Autocommit: las transacciones se abren explícitamente donde hacen falta
+        self._connection = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def append(self, channel: str, conversation, payload: dict) -> int:
+        "Agrega un update y devuelve su id; al volver ya está en disco."
+        now = self._clock()
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO updates (channel, conversation, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (channel, str(conversation), json.dumps(payload), now, now),
+            )
+        self._metrics.increment("queue.appended")
+        return cursor.lastrowid
+
+    def claim(self, worker: str, limit: int = 1) -> list[QueuedUpdate]:
+        "Reclama hasta ``limit`` updates de conversaciones distintas."
+        now = self._clock()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Leases vencidas sin intentos restantes: el update no se vuelve a tomar
+                connection.execute(
+                    "UPDATE updates SET status = 'failed', error = 'lease vencida', "
+                    "updated_at = ? WHERE status = 'claimed' AND lease_until < ? "
+                    "AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                ids = [
+                    row[0] for row in connection.execute(_CLAIMABLE, {"now": now, "limit": limit})
+                ]
+                claimed = []
+                for update_id in ids:
+                    connection.execute(
+                        "UPDATE updates SET status = 'claimed', worker = ?, lease_until = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (worker, now + self.lease_seconds, now, update_id),
+                    )
+                    row = connection.execute(
+                        "SELECT id, channel, conversation, payload, attempts FROM updates "
+                        "WHERE id = ?",
+                        (update_id,),
+                    ).fetchone()
+                    claimed.append(QueuedUpdate(row[0], row[1], row[2], json.loads(row[3]), row[4]))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        if claimed:
+            self._metrics.increment("queue.claimed", len(claimed))
+        return claimed
+
+    def renew(self, update_id: int, worker: str) -> bool:
+        "Extiende la lease de un update propio; False si ya la perdió."
+        now = self._clock()
+        return self._update_owned(
+            "UPDATE updates SET lease_until = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'claimed'",
+            (now + self.lease_seconds, now, update_id, worker),
+        )
+
+    def complete(self, update_id: int, worker: str) -> bool:
+        "Marca el update como hecho; False si la lease ya era de otro worker."
+        done = self._update_owned(
+            "UPDATE updates SET status = 'done', lease_until = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'claimed'",
+            (self._clock(), update_id, worker),
+        )
+        if done:
+            self._metrics.increment("queue.completed")
+        return done
+
+    def fail(self, update_id: int, worker: str, error: str) -> bool:
+        """Devuelve el update a la cola para otro intento, o lo marca ``failed`` si agotó
+        ``max_attempts``."""
+        failed = self._update_owned(
+            "UPDATE updates SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' "
+            "END, lease_until = NULL, error = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'claimed'",
+            (self.max_attempts, error[:1000], self._clock(), update_id, worker),
+        )
+        if failed:
+            self._metrics.increment("queue.errors")
+        return failed
+
+    def purge(self, older_than: float) -> int:
+        "Borra los updates hechos hace más de ``older_than`` segundos; devuelve cuántos."
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM updates WHERE status = 'done' AND updated_at < ?",
+                (self._clock() - older_than,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        "Cantidad de updates por estado."
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM updates GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0, **dict(rows)}
+        self._metrics.set_gauge("queue.pending", counts["pending"])
+        return counts
+
+    def _update_owned(self, sql: str, params: tuple) -> bool:
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+        return cursor.rowcount == 1
@@ -0,0 +1,107 @@
+"""
+Path: src/infrastructure/queue/update_worker.py
+"""
+
+import asyncio
+import time
+from contextlib import suppress
+
+from src.infrastructure.queue.sqlite_update_queue import QueuedUpdate, SqliteUpdateQueue
+from src.shared.logger_rasa_v0 import get_logger
+
+logger = get_logger("update-worker")
+
+
+class UpdateWorker:
+    """Procesa los updates de una ``SqliteUpdateQueue`` con ``handler``.
+
+    Atiende hasta ``concurrency`` conversaciones a la vez; mientras procesa un update renueva
+    su lease cada tercio de ``lease_seconds``. Si ``handler`` lanza una excepción el update
+    vuelve a la cola (o queda ``failed`` al agotar los intentos).
+
+    Cada ``purge_interval`` segundos borra los updates hechos hace más de ``retention``
+    segundos (0 los conserva), y con la cola vacía publica ``queue.pending``.
+    """
+
+    def __init__(
+        self,
+        queue: SqliteUpdateQueue,
+        handler,
+        worker_id: str,
+        concurrency: int = 4,
+        poll_interval: float = 0.5,
+        retention: float = 3600.0,
+        purge_interval: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._clock = clock
+        self._purged_at: float | None = None
+        self._active: set[asyncio.Task] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        "Reclama y procesa updates hasta que se activa ``stop``; espera a los que están en curso."
+        try:
+            while not stop.is_set():
+                await self._purge()
+                free = self.concurrency - len(self._active)
+                claimed = []
+                if free > 0:
+                    claimed = await asyncio.to_thread(self.queue.claim, self.worker_id, free)
+                for update in claimed:
+                    task = asyncio.create_task(self.process(update))
+                    self._active.add(task)
+                    task.add_done_callback(self._active.discard)
+                if not claimed:
+                    await asyncio.to_thread(self.queue.stats)
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+        finally:
+            if self._active:
+                await asyncio.gather(*self._active, return_exceptions=True)
+
+    async def process(self, update: QueuedUpdate) -> bool:
+        "Procesa un update reclamado; True si quedó marcado como hecho."
+        keeper = asyncio.create_task(self._keep_lease(update.id))
+        try:
+            await self.handler(update)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(
+                "Update %s (intento %d) falló: %s", update.id, update.attempts, e, exc_info=True
+            )
+            await asyncio.to_thread(self.queue.fail, update.id, self.worker_id, repr(e))
+            return False
+        finally:
+            keeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await keeper
+        done = await asyncio.to_thread(self.queue.complete, update.id, self.worker_id)
+        if not done:
+            logger.warning("Update %s: la lease venció antes de terminar", update.id)
+        return done
+
+    async def _purge(self) -> None:
+        "Borra los updates hechos viejos, como mucho una vez cada ``purge_interval``."
+        now = self._clock()
+        if self.retention <= 0 or (
+            self._purged_at is not None and now - self._purged_at < self.purge_interval
+        ):
+            return
+        self._purged_at = now
+        purged = await asyncio.to_thread(self.queue.purge, self.retention)
+        if purged:
+            logger.info("Cola de updates: %d updates hechos borrados", purged)
+
+    async def _keep_lease(self, update_id: int) -> None:
+        interval = self.queue.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.queue.renew, update_id, self.worker_id):
+                logger.warning("Update %s: se perdió la lease", update_id)
+                return
@@ -0,0 +1,102 @@
+"""
+Path: src/infrastructure/rate_limit/sqlite_rate_limiter.py
+"""
+
+import sqlite3
+import threading
+import time
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+from src.shared.token_bucket import TokenBucket
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    name TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (name, identity)
+);
+CREATE INDEX IF NOT EXISTS rate_limit_buckets_updated ON rate_limit_buckets (name, updated);
+"""
+
+# Cada cuántas consultas se borran los buckets que ya se repusieron por completo
+_PRUNE_EVERY = 1000
+
+
+class SqliteRateLimiter:
+    """Token buckets por identidad compartidos entre procesos en un archivo SQLite (WAL).
+
+    Misma interfaz que ``IdentityRateLimiter``, para correr varios workers con un cupo
+    común. ``allow`` es bloqueante: desde el event loop se llama con ``asyncio.to_thread``.
+    Los buckets que ya se repusieron por completo se borran: equivalen a no tener fila.
+    Cada limitador (``name``) tiene sus propias filas, con su capacidad y su ritmo.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        capacity: float,
+        refill_rate: float,
+        metrics: MetricsRegistry | None = None,
+        clock=time.time,
+    ):
+        self.path = path
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._connection = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def allow(self, identity: str) -> bool:
+        "Consume un token de ``identity``; False si la identidad superó su cupo."
+        now = self._clock()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets "
+                    "WHERE name = ? AND identity = ?",
+                    (self.name, identity),
+                ).fetchone()
+                bucket = (
+                    TokenBucket(self.capacity, self.refill_rate, clock=lambda: now)
+                    if row is None
+                    else TokenBucket.restore(
+                        self.capacity, self.refill_rate, row, clock=lambda: now
+                    )
+                )
+                allowed = bucket.try_consume()
+                connection.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (name, identity, tokens, updated) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.name, identity, *bucket.state),
+                )
+                self._calls += 1
+                if self._calls % _PRUNE_EVERY == 0:
+                    connection.execute(
+                        "DELETE FROM rate_limit_buckets WHERE name = ? AND updated < ?",
+                        (self.name, now - self.capacity / self.refill_rate),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        self._metrics.increment(f"rate_limit.{self.name}.{'allowed' if allowed else 'rejected'}")
+        return allowed
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
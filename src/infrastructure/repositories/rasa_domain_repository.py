@@ -0,0 +1,114 @@
+"""
+Path: src/infrastructure/repositories/rasa_domain_repository.py
+"""
+
+import re
+import unicodedata
+from pathlib import Path
+
+import yaml
+
+from src.shared.logger_rasa_v0 import get_logger
+
+logger = get_logger("rasa-domain-repository")
+
+DEFAULT_RASA_PROJECT_PATH = Path(__file__).resolve().parents[3] / "rasa_project"
+FALLBACK_INTENT = "nlu_fallback"
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    "Minúsculas, sin acentos ni puntuación, para comparar frases."
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_WORD.findall(plain.lower()))
+
+
+class RasaDomainRepository:
+    """Lee respuestas, ejemplos de NLU y reglas del proyecto Rasa.
+
+    Alcanza para reproducir localmente las respuestas fijas del bot (por ejemplo, en el
+    Rasa simulado para pruebas de carga) sin cargar un modelo entrenado.
+    """
+
+    def __init__(self, project_path=None):
+        self.project_path = Path(project_path or DEFAULT_RASA_PROJECT_PATH)
+        self._responses: dict[str, list[str]] | None = None
+        self._examples: dict[str, str] | None = None
+        self._rules: dict[str, list[str]] | None = None
+
+    def responses(self) -> dict[str, list[str]]:
+        "Textos de cada respuesta ``utter_*`` de domain.yml."
+        if self._responses is None:
+            domain = self._load("domain.yml")
+            self._responses = {
+                name: [variant["text"] for variant in variants or [] if variant.get("text")]
+                for name, variants in (domain.get("responses") or {}).items()
+            }
+        return self._responses
+
+    def rule_actions(self) -> dict[str, list[str]]:
+        "Acciones que las reglas ejecutan para cada intent."
+        if self._rules is None:
+            rules = self._load("data/rules.yml").get("rules") or []
+            self._rules = {}
+            for rule in rules:
+                intent, actions = None, []
+                for step in rule.get("steps") or []:
+                    if "intent" in step:
+                        intent = step["intent"]
+                    elif "action" in step:
+                        actions.append(step["action"])
+                if intent and intent not in self._rules:
+                    self._rules[intent] = actions
+        return self._rules
+
+    def classify(self, text: str) -> str:
+        """Intent del texto: coincidencia exacta con un ejemplo de NLU o, si no hay, el
+        ejemplo con mayor solapamiento de palabras (mínimo 50%)."""
+        examples = self._intent_examples()
+        normalized = normalize_text(text)
+        if normalized in examples:
+            return examples[normalized]
+        words = set(normalized.split())
+        best_intent, best_score = FALLBACK_INTENT, 0.5
+        for example, intent in examples.items():
+            example_words = set(example.split())
+            if not words or not example_words:
+                continue
+            score = len(words & example_words) / len(words | example_words)
+            if score > best_score:
+                best_intent, best_score = intent, score
+        return best_intent
+
+    def reply_for(self, text: str) -> tuple[str, list[str], list[str]]:
+        "Intent, textos de las respuestas fijas y acciones personalizadas para el mensaje."
+        intent = self.classify(text)
+        texts, custom_actions = [], []
+        responses = self.responses()
+        for action in self.rule_actions().get(intent, ["action_gemini_fallback"]):
+            if action in responses:
+                texts.extend(responses[action][:1])
+            else:
+                custom_actions.append(action)
+        return intent, texts, custom_actions
+
+    def _intent_examples(self) -> dict[str, str]:
+        if self._examples is None:
+            self._examples = {}
+            for item in self._load("data/nlu.yml").get("nlu") or []:
+                intent = item.get("intent")
+                for line in str(item.get("examples") or "").splitlines():
+                    example = normalize_text(line.strip().lstrip("-"))
+                    if intent and example:
+                        self._examples.setdefault(example, intent)
+        return self._examples
+
+    def _load(self, relative_path: str) -> dict:
+        path = self.project_path / relative_path
+        try:
+            with open(path, encoding="utf-8") as file:
+                return yaml.safe_load(file) or {}
+        except (OSError, yaml.YAMLError) as exc:
+            logger.error("No se pudo leer %s: %s", path, exc)
+            return {}
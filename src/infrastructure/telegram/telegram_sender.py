@@ -0,0 +1,204 @@
+"""
+Path: src/infrastructure/telegram/telegram_sender.py
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+
+import httpx
+
+from src.shared.logger_rasa_v0 import get_logger
+
+logger = get_logger("telegram-sender")
+
+
+class _StreamState:
+    "Estado de una entrega incremental: mensajes enviados y modo de entrega."
+
+    def __init__(self):
+        self.messages: list[list] = []  # [message_id, parte enviada]
+        self.append_mode = False
+        self.appended_upto = 0
+        self.last_sync: float | None = None
+
+    def due(self, interval: float) -> bool:
+        if self.last_sync is None:
+            return True
+        return time.monotonic() - self.last_sync >= interval
+
+
+class TelegramSender:
+    """Cliente de salida hacia la Bot API de Telegram.
+
+    Todas las llamadas a un mismo chat respetan un intervalo mínimo (``message_delay``),
+    reservando turnos en orden de llegada para no exceder los límites de Telegram. El
+    indicador «escribiendo…» (``typing``) no reserva turnos: solo sale si el chat está
+    libre, así nunca demora una respuesta.
+    """
+
+    _MAX_TRACKED_CHATS = 1024
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        api_base_url: str,
+        message_delay: float = 0.5,
+        edit_interval: float = 1.0,
+        typing_interval: float = 4.0,
+    ):
+        self.http_client = http_client
+        self.api_base_url = api_base_url.rstrip("/")
+        self.message_delay = message_delay
+        self.edit_interval = edit_interval
+        self.typing_interval = typing_interval
+        self._next_slot: dict = {}
+        self._chat_actions: dict = {}  # chat_id -> future del sendChatAction en vuelo
+
+    async def warm_up(self) -> None:
+        "Abre la conexión con la Bot API (getMe) para que el primer envío no pague el TLS."
+        await self.http_client.get(f"{self.api_base_url}/getMe", timeout=5.0)
+
+    async def send_message(self, chat_id, part: dict):
+        "Envía un mensaje (sendMessage) y devuelve su message_id, o None si no se conoce."
+        response = await self._call("sendMessage", chat_id, {"chat_id": chat_id, **part})
+        return _message_id(response)
+
+    def inline_message(self, chat_id, part: dict) -> dict | None:
+        """Cuerpo de respuesta del webhook que hace que Telegram envíe ``part`` (sendMessage).
+
+        Ocupa el turno del chat como un envío normal; devuelve None si el chat tiene envíos
+        pendientes, porque la respuesta inline se adelantaría a ellos.
+        """
+        now = time.monotonic()
+        if self._next_slot.get(chat_id, now) > now:
+            return None
+        self._next_slot[chat_id] = now + self.message_delay
+        return {"method": "sendMessage", "chat_id": chat_id, **part}
+
+    async def send_chat_action(self, chat_id, action: str = "typing") -> bool:
+        "Envía sendChatAction si el chat no tiene envíos pendientes; devuelve si lo envió."
+        now = time.monotonic()
+        if self._next_slot.get(chat_id, now) > now:
+            return False
+        in_flight = asyncio.get_running_loop().create_future()
+        self._chat_actions[chat_id] = in_flight
+        try:
+            url = f"{self.api_base_url}/sendChatAction"
+            await self.http_client.post(url, json={"chat_id": chat_id, "action": action})
+        finally:
+            in_flight.set_result(None)
+            if self._chat_actions.get(chat_id) is in_flight:
+                del self._chat_actions[chat_id]
+        return True
+
+    @asynccontextmanager
+    async def typing(self, chat_id):
+        """Muestra «escribiendo…» en el chat mientras dura el bloque.
+
+        Telegram lo borra a los 5 segundos o con el siguiente mensaje, así que se repite
+        cada ``typing_interval`` segundos (0 lo desactiva) hasta salir del bloque.
+        """
+        if self.typing_interval <= 0:
+            yield
+            return
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(self._keep_typing(chat_id, self.typing_interval, stop))
+        try:
+            yield
+        finally:
+            # Sin cancelar un sendChatAction a medio enviar: podría llegar después del
+            # mensaje y volver a mostrar el indicador
+            stop.set()
+            try:
+                await task
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+
+    async def _keep_typing(self, chat_id, interval: float, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await self.send_chat_action(chat_id)
+            except httpx.HTTPError as exc:
+                logger.debug("No se pudo enviar sendChatAction a %s: %s", chat_id, exc)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+
+    async def edit_message(self, chat_id, message_id, part: dict) -> None:
+        "Reemplaza el texto de un mensaje ya enviado (editMessageText)."
+        payload = {"chat_id": chat_id, "message_id": message_id, **part}
+        await self._call("editMessageText", chat_id, payload)
+
+    async def send_parts(self, chat_id, parts: list) -> None:
+        "Envía en orden las partes producidas por el presenter."
+        for part in parts:
+            await self.send_message(chat_id, part)
+
+    async def stream(self, chat_id, chunks, stream_presenter) -> None:
+        """Entrega una respuesta a medida que se genera.
+
+        El primer mensaje sale en cuanto hay una oración completa; el texto posterior llega
+        con ``editMessageText`` como máximo cada ``edit_interval`` segundos. Si no se puede
+        editar (no se conoce el message_id), el resto se envía como mensajes adicionales.
+        """
+        state = _StreamState()
+        async for chunk in chunks:
+            if stream_presenter.feed(chunk) and state.due(self.edit_interval):
+                await self._sync_stream(chat_id, stream_presenter, state)
+        stream_presenter.finish()
+        await self._sync_stream(chat_id, stream_presenter, state)
+
+    async def _sync_stream(self, chat_id, stream_presenter, state: _StreamState) -> None:
+        text = stream_presenter.text
+        if not text.strip():
+            return
+        state.last_sync = time.monotonic()
+        if state.append_mode:
+            new_text = text[state.appended_upto :]
+            if new_text.strip():
+                await self.send_parts(chat_id, stream_presenter.parts(new_text))
+            state.appended_upto = len(text)
+            return
+
+        for index, part in enumerate(stream_presenter.parts(text)):
+            if index < len(state.messages):
+                message_id, sent_part = state.messages[index]
+                if sent_part != part:
+                    await self.edit_message(chat_id, message_id, part)
+                    state.messages[index][1] = part
+                continue
+            message_id = await self.send_message(chat_id, part)
+            if message_id is None and not state.append_mode:
+                logger.warning(
+                    "Telegram no devolvió message_id; el resto se enviará como mensajes nuevos."
+                )
+                state.append_mode = True
+            state.messages.append([message_id, part])
+        if state.append_mode:
+            state.appended_upto = len(text)
+
+    async def _call(self, method: str, chat_id, payload: dict):
+        await self._throttle(chat_id)
+        in_flight = self._chat_actions.get(chat_id)
+        if in_flight is not None:
+            # El mensaje tiene que llegar después del «escribiendo…», que si no reaparece
+            await asyncio.shield(in_flight)
+        url = f"{self.api_base_url}/{method}"
+        return await self.http_client.post(url, json=payload)
+
+    async def _throttle(self, chat_id) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(chat_id, now))
+        self._next_slot[chat_id] = slot + self.message_delay
+        if len(self._next_slot) > self._MAX_TRACKED_CHATS:
+            self._next_slot = {key: value for key, value in self._next_slot.items() if value > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _message_id(response):
+    try:
+        return response.json()["result"]["message_id"]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
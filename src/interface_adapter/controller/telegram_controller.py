@@ -3,6 +3,7 @@ Path: src/interface_adapter/controller/telegram_controller.py
 """
 
 from src.entities.message import Message
+from src.shared.request_context import request_context
 
 
 class TelegramMessageController:
@@ -17,21 +18,16 @@ class TelegramMessageController:
     ):
         """Genera una respuesta para un mensaje entrante de Telegram.
 
-        Si es audio, recibe el texto transcripto. (async)
+        Si es audio, recibe el texto transcripto. La respuesta es None si el mensaje se
+        agrupó con otros y se contesta junto con el primero. (async)
         """
-        if isinstance(user_message_or_text, Message):
-            user_message = user_message_or_text
-        else:
-            formatted_text = (
-                self._apply_markdown_formatting(user_message_or_text, entities)
-                if entities
-                else user_message_or_text
+        user_message = self._build_user_message(chat_id, user_message_or_text, entities)
+        with request_context(channel="telegram", conversation_id=str(chat_id)):
+            response_message = await self.use_case.execute(
+                chat_id, user_message, prompt=transcribed_text
             )
-            user_message = Message(to=chat_id, body=formatted_text)
-
-        response_message = await self.use_case.execute(
-            chat_id, user_message, prompt=transcribed_text
-        )
+        if response_message is None:
+            return chat_id, None
         response_text = (
             response_message.body.strip()
             if response_message.body
@@ -39,37 +35,180 @@ class TelegramMessageController:
         )
         return chat_id, response_text
 
+    async def handle_stream(self, chat_id, user_message_or_text, entities=None):
+        """Igual que handle, pero entrega la respuesta en fragmentos. (async generator)"""
+        user_message = self._build_user_message(chat_id, user_message_or_text, entities)
+        with request_context(channel="telegram", conversation_id=str(chat_id)):
+            async for chunk in self.use_case.execute_stream(chat_id, user_message):
+                yield chunk
+
+    def _build_user_message(self, chat_id, user_message_or_text, entities=None):
+        if isinstance(user_message_or_text, Message):
+            return user_message_or_text
+        formatted_text = (
+            self._apply_markdown_formatting(user_message_or_text, entities)
+            if entities
+            else user_message_or_text
+        )
+        return Message(to=chat_id, body=formatted_text)
+
     def _apply_markdown_formatting(self, text, entities):
         """Convierte las entidades de Telegram a formato Markdown."""
-        if not entities:
-            return text
-
-        # Ordenar entidades por posición para procesarlas correctamente
-        sorted_entities = sorted(entities, key=lambda e: e["offset"])
-
-        # Texto resultante con marcadores markdown
-        result = ""
-        last_index = 0
-
-        for entity in sorted_entities:
-            offset = entity["offset"]
-            length = entity["length"]
-            type_ = entity["type"]
-
-            # Añadir texto previo a la entidad
-            result += text[last_index:offset]
-
-            # Añadir marcadores según tipo
-            if type_ == "bold":
-                result += f"**{text[offset:offset+length]}**"
-            elif type_ == "italic":
-                result += f"*{text[offset:offset+length]}*"
-            # Añadir más tipos según necesidad
-            else:
-                result += text[offset : offset + length]
-
-            last_index = offset + length
-
-        # Añadir texto restante
-        result += text[last_index:]
-        return result
+        return entities_to_markdown(text, entities)
+
+
+# Marcadores Markdown de las entidades que solo envuelven el texto
+_WRAPPERS = {
+    "bold": ("**", "**"),
+    "italic": ("*", "*"),
+    "underline": ("__", "__"),
+    "strikethrough": ("~~", "~~"),
+    "spoiler": ("||", "||"),
+}
+# Entidades que sí cambian el texto; el resto (mention, hashtag, url, email...) ya está
+# escrito en el mensaje y se deja tal cual
+_MARKUP_TYPES = frozenset(_WRAPPERS) | {
+    "code",
+    "pre",
+    "text_link",
+    "text_mention",
+    "blockquote",
+    "expandable_blockquote",
+}
+_CODE_TYPES = ("code", "pre")
+_QUOTE_TYPES = ("blockquote", "expandable_blockquote")
+
+
+def entities_to_markdown(text: str, entities) -> str:
+    """Aplica las entidades de un mensaje de Telegram como Markdown.
+
+    Los ``offset``/``length`` vienen en unidades UTF-16 y se traducen a índices en una
+    pasada. Las entidades anidadas se emiten anidadas; si dos se superponen sin anidarse,
+    la interior se cierra y se reabre al cerrar la exterior. El resultado se arma con
+    ``join``.
+    """
+    spans = _entity_spans(text, entities or ())
+    if not spans:
+        return text
+    # A igual rango, el código queda por dentro para que el resto del formato se vea
+    spans.sort(key=lambda span: (span[0], -span[1], span[2] in _CODE_TYPES))
+    boundaries = sorted({span[0] for span in spans} | {span[1] for span in spans})
+    out: list[str] = []
+    stack: list = []
+    quotes = 0
+    pos = next_span = 0
+    for boundary in boundaries:
+        if boundary > pos:
+            chunk = text[pos:boundary]
+            out.append(chunk.replace("\n", "\n> ") if quotes else chunk)
+            pos = boundary
+        # Cierres: lo que está por encima de la entidad que termina se cierra y se reabre
+        first = next((i for i, span in enumerate(stack) if span[1] == boundary), None)
+        if first is not None:
+            reopen = []
+            for depth in range(len(stack) - 1, first - 1, -1):
+                span = stack[depth]
+                out.append(_closer(span, _in_code(stack, depth)))
+                if span[1] != boundary:
+                    reopen.append(span)
+            del stack[first:]
+            for span in reversed(reopen):
+                out.append(_opener(span, _in_code(stack, len(stack))))
+                stack.append(span)
+        while next_span < len(spans) and spans[next_span][0] == boundary:
+            span = spans[next_span]
+            out.append(_opener(span, _in_code(stack, len(stack))))
+            stack.append(span)
+            next_span += 1
+        quotes = sum(span[2] in _QUOTE_TYPES for span in stack)
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _entity_spans(text: str, entities) -> list:
+    """Entidades con formato como ``(inicio, fin, tipo, entidad, marcas)`` en índices de
+    ``text``; ``marcas`` es la apertura y el cierre del código (vacío en el resto)."""
+    wanted = [e for e in entities if e.get("type") in _MARKUP_TYPES and e.get("length", 0) > 0]
+    if not wanted:
+        return []
+    units = [e["offset"] for e in wanted] + [e["offset"] + e["length"] for e in wanted]
+    index_of = _utf16_indices(text, units)
+    spans = []
+    for entity in wanted:
+        start = index_of[entity["offset"]]
+        end = index_of[entity["offset"] + entity["length"]]
+        if end > start:
+            kind = entity["type"]
+            marks = _code_marks(text[start:end], entity) if kind in _CODE_TYPES else ()
+            spans.append((start, end, kind, entity, marks))
+    return spans
+
+
+def _utf16_indices(text: str, units: list) -> dict:
+    "Índice de ``text`` para cada offset UTF-16 pedido (en una sola pasada)."
+    if len(text.encode("utf-16-le")) == 2 * len(text):
+        return {unit: min(unit, len(text)) for unit in units}
+    targets = sorted(set(units))
+    result = {}
+    target = 0
+    offset = 0
+    for index, char in enumerate(text):
+        while target < len(targets) and targets[target] <= offset:
+            result[targets[target]] = index
+            target += 1
+        if target == len(targets):
+            break
+        offset += 2 if ord(char) > 0xFFFF else 1
+    for unit in targets[target:]:
+        result[unit] = len(text)
+    return result
+
+
+def _in_code(stack: list, depth: int) -> bool:
+    "Si hay un código abierto entre las primeras ``depth`` entidades de la pila."
+    return any(span[2] in _CODE_TYPES for span in stack[:depth])
+
+
+def _opener(span, in_code: bool) -> str:
+    kind = span[2]
+    if in_code:
+        return ""  # Telegram no permite formato dentro de código
+    if kind in _WRAPPERS:
+        return _WRAPPERS[kind][0]
+    if kind in _CODE_TYPES:
+        return span[4][0]
+    if kind in _QUOTE_TYPES:
+        return "> "
+    return "["  # text_link, text_mention
+
+
+def _closer(span, in_code: bool) -> str:
+    kind = span[2]
+    if in_code:
+        return ""
+    if kind in _WRAPPERS:
+        return _WRAPPERS[kind][1]
+    if kind in _CODE_TYPES:
+        return span[4][1]
+    if kind in _QUOTE_TYPES:
+        return ""
+    entity = span[3]
+    if kind == "text_mention":
+        return f"](tg://user?id={(entity.get('user') or {}).get('id', '')})"
+    return f"]({entity.get('url', '')})"
+
+
+def _code_marks(content: str, entity) -> tuple:
+    """Apertura y cierre de un código, con comillas invertidas suficientes para que el
+    contenido no lo cierre antes de tiempo."""
+    longest = run = 0
+    for char in content:
+        run = run + 1 if char == "`" else 0
+        longest = max(longest, run)
+    if entity["type"] == "pre":
+        fence = "`" * max(3, longest + 1)
+        return f"{fence}{entity.get('language') or ''}\n", f"\n{fence}"
+    fence = "`" * (longest + 1)
+    # Un espacio evita que el contenido pegue sus comillas a las del cerco
+    pad = " " if content.startswith("`") or content.endswith("`") else ""
+    return fence + pad, pad + fence
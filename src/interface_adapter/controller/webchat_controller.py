@@ -3,6 +3,7 @@ Path: src/interface_adapter/controller/webchat_controller.py
 """
 
 from src.entities.message import Message
+from src.shared.request_context import request_context
 
 
 class WebchatMessageController:
@@ -13,13 +14,20 @@ class WebchatMessageController:
         self.presenter = presenter
 
     async def handle(self, user_id, user_message_or_text):
-        """Genera una respuesta para un mensaje entrante del webchat. (async)"""
+        """Genera una respuesta para un mensaje entrante del webchat.
+
+        La respuesta es un texto vacío si un mensaje más nuevo del usuario reemplazó a este.
+        (async)
+        """
         if isinstance(user_message_or_text, Message):
             user_message = user_message_or_text
         else:
             user_message = Message(to=user_id, body=user_message_or_text)
 
-        response_message = await self.use_case.execute(user_id, user_message)
+        with request_context(channel="webchat", conversation_id=str(user_id)):
+            response_message = await self.use_case.execute(user_id, user_message)
+        if response_message is None:
+            return user_id, ""
         response_text = (
             response_message.body.strip()
             if response_message.body
@@ -7,17 +7,29 @@ from __future__ import annotations
 import asyncio
 import os
 import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
 
 import httpx
 
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiUnavailableError
 from src.entities.interfaces import GeminiResponderService, SystemInstructionsRepository
 from src.entities.message import Message
 from src.interface_adapter.gateways.gemini_gateway import GeminiGateway
+from src.shared.adaptive_limiter import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceededError
+from src.shared.bounded_executor import BoundedExecutor, ExecutorQueueFullError
 from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+from src.shared.overload import CANNED_ONLY, OVERLOAD_MESSAGE, SHORT_HISTORY, OverloadController
+from src.shared.request_context import get_request_context
 from src.use_cases.load_system_instructions import LoadSystemInstructionsUseCase
 
 logger = get_logger("agent-gateway")
 
+# Qué hacer con un fallback en curso cuando llega un mensaje más nuevo de la conversación
+SUPERSEDE_POLICIES = ("off", "cancel", "drop")
+
 
 class AgentGateway:
     """
@@ -28,8 +40,25 @@ class AgentGateway:
     - Es volátil: se pierde al reiniciar el proceso.
     - Justificación: simplicidad, performance y suficiente para el contexto de fallback.
     - Si se requiere persistencia, debe implementarse un repositorio externo e inyectarse.
+
+    Respuestas reemplazadas (``supersede_policy``):
+    - ``off``: cada mensaje recibe su respuesta aunque llegue uno más nuevo.
+    - ``cancel``: un mensaje nuevo cancela el fallback de Gemini en curso de la conversación.
+    - ``drop``: el fallback termina, pero su respuesta se descarta.
+    En ambos casos get_response devuelve None para el mensaje reemplazado.
+
+    Con ``rasa_limiter``/``gemini_limiter`` las llamadas a Rasa y a Gemini pasan por un
+    limitador de concurrencia adaptativo; si su cola está llena se responde como si el
+    servicio no estuviera disponible.
+
+    Con ``overload`` los prompts llevan menos historial desde el escalón SHORT_HISTORY y,
+    desde CANNED_ONLY, no se consulta a Gemini: solo responden Rasa y las respuestas fijas.
     """
 
+    _MAX_TRACKED_TURNS = 4096
+    _HISTORY_TURNS = 20
+    _SHORT_HISTORY_TURNS = 4
+
     _SALUDO_KEYWORDS: tuple[str, ...] = (
         "hola",
         "hola!",
@@ -66,7 +95,15 @@ class AgentGateway:
         gemini_service: GeminiResponderService = None,
         agent_bot_url: str | None = None,
         remote_available: bool | None = None,
+        blocking_executor: BoundedExecutor | None = None,
+        metrics: MetricsRegistry | None = None,
+        supersede_policy: str = "off",
+        rasa_limiter: AdaptiveConcurrencyLimiter | None = None,
+        gemini_limiter: AdaptiveConcurrencyLimiter | None = None,
+        overload: OverloadController | None = None,
     ):
+        if supersede_policy not in SUPERSEDE_POLICIES:
+            raise ValueError(f"supersede_policy desconocida: {supersede_policy}")
         rasa_url = agent_bot_url or os.getenv(
             "RASA_REST_URL", "http://localhost:5005/webhooks/rest/webhook"
         )
@@ -84,47 +121,142 @@ class AgentGateway:
         self._gemini_gateway: GeminiGateway | None = None
         self._system_instructions = None
         self._fallback_initialized = False
+        self._fallback_lock = threading.Lock()
         self._instructions_repository: SystemInstructionsRepository = instructions_repository
         self._gemini_service: GeminiResponderService = gemini_service
+        # Pool dedicado para responders bloqueantes: no compite con el executor por defecto
+        self._blocking_executor = blocking_executor or BoundedExecutor("gemini-blocking")
+        self._metrics = metrics or get_metrics()
+        self.supersede_policy = supersede_policy
+        self._turns: dict[str, int] = {}
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._rasa_limiter = rasa_limiter
+        self._gemini_limiter = gemini_limiter
+        self._overload = overload
         logger.debug("Inicializando AgentGateway con endpoint %s", self.agent_bot_url)
 
-    async def get_response(self, message_or_text) -> str:
+    @property
+    def remote_available(self) -> bool:
+        "Indica si se consulta a Rasa antes del fallback local."
+        return self._remote_available
+
+    @remote_available.setter
+    def remote_available(self, value: bool) -> None:
+        self._remote_available = bool(value)
+
+    def canned_responses(self) -> tuple[str, ...]:
+        "Respuestas fijas que el gateway devuelve sin consultar a Rasa ni a Gemini."
+        return (
+            self._SALUDO_RESPONSE,
+            self._DESPEDIDA_RESPONSE,
+            self._FALLBACK_RESPONSE,
+            OVERLOAD_MESSAGE,
+        )
+
+    async def warm_up_fallback(self) -> bool:
+        "Carga instrucciones y gateway de Gemini fuera del event loop, antes del primer pedido."
+        gateway = await asyncio.to_thread(self._ensure_fallback_components)
+        return gateway is not None
+
+    async def warm_up_remote(self) -> None:
+        "Abre la conexión con Rasa para que la primera consulta no pague el handshake."
+        if not self._remote_available or self.http_client is None:
+            return
+        parts = urlsplit(self.agent_bot_url)
+        await self.http_client.get(f"{parts.scheme}://{parts.netloc}/", timeout=5.0)
+
+    async def get_response(self, message_or_text) -> str | None:
         """
         Envía un mensaje al bot Rasa y devuelve la respuesta (async).
+
+        Devuelve None si un mensaje más nuevo de la conversación reemplazó a este.
         """
         payload, conversation_id = self._build_payload(message_or_text)
         message_text = payload["message"]
+        turn = self._begin_turn(conversation_id)
 
         if self._remote_available:
-            try:
-                logger.debug("Enviando payload a Rasa (%s)", self.agent_bot_url)
-                response = await self.http_client.post(self.agent_bot_url, json=payload, timeout=60)
-                data = response.json()
-                logger.debug(
-                    "Respuesta de Rasa recibida desde %s con %d mensajes",
-                    self.agent_bot_url,
-                    len(data) if isinstance(data, list) else 0,
-                )
-                text = " ".join([msg.get("text", "") for msg in data if "text" in msg]).strip()
-                if conversation_id:
-                    self._store_turn(conversation_id, "user", message_text)
-                    if text:
-                        self._store_turn(conversation_id, "bot", text)
+            text = await self._rasa_response(payload, conversation_id)
+            if text is not None:
                 return text
-            except httpx.RequestError:
-                # Si falla la conexión a Rasa, usar respuesta local
-                logger.warning("Fallo la conexión a Rasa, usando respuesta local (fallback)")
-                return await self._local_response(conversation_id, message_text)
-            except (ValueError, AttributeError) as exc:
-                logger.error(
-                    "Error procesando la respuesta de Rasa (%s): %s",
-                    self.agent_bot_url,
-                    exc,
-                    exc_info=True,
-                )
-                return f"[Error procesando la respuesta de Rasa: {exc}]"
-
-        return await self._local_response(conversation_id, message_text)
+
+        return await self._local_response(conversation_id, message_text, turn)
+
+    async def stream_response(self, message_or_text):
+        """
+        Igual que get_response, pero entrega la respuesta en fragmentos (async generator).
+
+        Las respuestas de Rasa y las locales llegan en un único fragmento; el fallback de
+        Gemini se entrega a medida que el modelo lo genera.
+        """
+        payload, conversation_id = self._build_payload(message_or_text)
+        message_text = payload["message"]
+        turn = self._begin_turn(conversation_id)
+
+        if self._remote_available:
+            text = await self._rasa_response(payload, conversation_id)
+            if text is not None:
+                yield text
+                return
+
+        if conversation_id:
+            self._store_turn(conversation_id, "user", message_text)
+        chunks: list[str] = []
+        canned = self._canned_response(message_text)
+        if canned is None and self._degraded(CANNED_ONLY):
+            canned = OVERLOAD_MESSAGE
+        if canned is not None:
+            chunks.append(canned)
+            yield canned
+        else:
+            async for chunk in self._stream_fallback(conversation_id, message_text):
+                if self._superseded(turn):
+                    self._metrics.increment("agent.superseded")
+                    return
+                chunks.append(chunk)
+                yield chunk
+        if conversation_id:
+            self._store_turn(conversation_id, "bot", "".join(chunks).strip())
+
+    async def _rasa_response(self, payload: dict[str, str], conversation_id: str) -> str | None:
+        "Consulta a Rasa. Devuelve None si Rasa no está accesible y debe usarse el fallback."
+        message_text = payload["message"]
+        started = time.monotonic()
+        try:
+            logger.debug("Enviando payload a Rasa (%s)", self.agent_bot_url)
+            async with _limited(self._rasa_limiter):
+                response = await self.http_client.post(self.agent_bot_url, json=payload, timeout=60)
+            self._observe_rasa(time.monotonic() - started)
+            data = response.json()
+            logger.debug(
+                "Respuesta de Rasa recibida desde %s con %d mensajes",
+                self.agent_bot_url,
+                len(data) if isinstance(data, list) else 0,
+            )
+            text = " ".join([msg.get("text", "") for msg in data if "text" in msg]).strip()
+            if conversation_id:
+                self._store_turn(conversation_id, "user", message_text)
+                if text:
+                    self._store_turn(conversation_id, "bot", text)
+            return text
+        except httpx.RequestError as exc:
+            if isinstance(exc, httpx.TimeoutException):
+                # Un Rasa saturado se ve como timeouts: su demora también es latencia
+                self._observe_rasa(time.monotonic() - started)
+            # Si falla la conexión a Rasa, usar respuesta local
+            logger.warning("Fallo la conexión a Rasa, usando respuesta local (fallback)")
+            return None
+        except ConcurrencyLimitExceededError as exc:
+            logger.warning("Rasa saturado, usando respuesta local (fallback): %s", exc)
+            return None
+        except (ValueError, AttributeError) as exc:
+            logger.error(
+                "Error procesando la respuesta de Rasa (%s): %s",
+                self.agent_bot_url,
+                exc,
+                exc_info=True,
+            )
+            return f"[Error procesando la respuesta de Rasa: {exc}]"
 
     def _build_payload(self, message_or_text) -> tuple[dict[str, str], str]:
         if isinstance(message_or_text, str):
@@ -139,42 +271,167 @@ class AgentGateway:
             conversation_id = message.to or ""
         return payload, conversation_id
 
-    async def _local_response(self, conversation_id: str, message_text: str) -> str:
-        normalized = message_text.lower().strip()
+    async def _local_response(
+        self, conversation_id: str, message_text: str, turn: tuple[str, int] | None = None
+    ) -> str | None:
         if conversation_id:
             self._store_turn(conversation_id, "user", message_text)
 
-        if any(keyword in normalized for keyword in self._SALUDO_KEYWORDS):
-            response = self._SALUDO_RESPONSE
-        elif any(keyword in normalized for keyword in self._DESPEDIDA_KEYWORDS):
-            response = self._DESPEDIDA_RESPONSE
-        else:
-            response = await self._fallback_response(conversation_id, message_text)
+        response = self._canned_response(message_text)
+        if response is None and self._degraded(CANNED_ONLY):
+            response = OVERLOAD_MESSAGE
+        if response is None:
+            response = await self._superseding_fallback(turn, conversation_id, message_text)
+            if response is None:
+                return None
 
         if conversation_id:
             self._store_turn(conversation_id, "bot", response)
         return response
 
+    def _begin_turn(self, conversation_id: str) -> tuple[str, int] | None:
+        """Registra un mensaje nuevo de la conversación y, con la política ``cancel``,
+        cancela el fallback que seguía generando la respuesta al anterior."""
+        if self.supersede_policy == "off":
+            return None
+        context = get_request_context()
+        key = (
+            f"{context.channel}:{context.conversation_id}"
+            if context.conversation_id
+            else conversation_id
+        )
+        if not key:
+            return None
+        turn = self._turns.pop(key, 0) + 1
+        self._turns[key] = turn
+        if len(self._turns) > self._MAX_TRACKED_TURNS:
+            self._turns.pop(next(iter(self._turns)))
+        in_flight = self._in_flight.get(key)
+        if self.supersede_policy == "cancel" and in_flight is not None and not in_flight.done():
+            in_flight.cancel()
+        return key, turn
+
+    def _superseded(self, turn: tuple[str, int] | None) -> bool:
+        "Si llegó un mensaje más nuevo de la conversación después de ``turn``."
+        return turn is not None and self._turns.get(turn[0]) != turn[1]
+
+    async def _superseding_fallback(
+        self, turn: tuple[str, int] | None, conversation_id: str, message_text: str
+    ) -> str | None:
+        "Fallback de Gemini registrado como en curso; None si otro mensaje lo reemplazó."
+        if turn is None:
+            return await self._fallback_response(conversation_id, message_text)
+        key = turn[0]
+        task = asyncio.ensure_future(self._fallback_response(conversation_id, message_text))
+        self._in_flight[key] = task
+        try:
+            response = await task
+        except asyncio.CancelledError:
+            if not (task.cancelled() and self._superseded(turn)):
+                raise  # cancelaron a quien espera la respuesta, no al fallback
+            response = None
+        finally:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+        if response is None or self._superseded(turn):
+            self._metrics.increment("agent.superseded")
+            logger.info("Respuesta descartada: llegó un mensaje más nuevo de %s", key)
+            return None
+        return response
+
+    def _canned_response(self, message_text: str) -> str | None:
+        normalized = message_text.lower().strip()
+        if any(keyword in normalized for keyword in self._SALUDO_KEYWORDS):
+            return self._SALUDO_RESPONSE
+        if any(keyword in normalized for keyword in self._DESPEDIDA_KEYWORDS):
+            return self._DESPEDIDA_RESPONSE
+        return None
+
     async def _fallback_response(self, conversation_id: str, message_text: str) -> str:
         prompt = self._build_prompt(conversation_id, message_text)
         gateway = self._ensure_fallback_components()
         if gateway is None:
             return self._FALLBACK_RESPONSE
 
+        started = time.monotonic()
         try:
-            # Ejecutar siempre en un thread para evitar bloquear el event loop
-            reply = await asyncio.to_thread(gateway.get_response, prompt, self._system_instructions)
+            async with _limited(self._gemini_limiter):
+                if isinstance(gateway, AsyncGeminiResponder):
+                    # Camino asíncrono nativo: cada llamada concurrente cuesta una corrutina
+                    reply = await gateway.get_response_async(prompt, self._system_instructions)
+                else:
+                    # Responders solo síncronos: pool dedicado y acotado para no bloquear el loop
+                    reply = await self._blocking_executor.run(
+                        gateway.get_response, prompt, self._system_instructions
+                    )
             if isinstance(reply, str) and reply.strip():
                 return reply.strip()
+        except (ExecutorQueueFullError, ConcurrencyLimitExceededError) as exc:
+            logger.warning("Fallback Gemini rechazado por saturación: %s", exc)
+        except GeminiUnavailableError as exc:
+            logger.warning("Fallback Gemini no disponible: %s", exc)
         except (ValueError, AttributeError, TypeError) as exc:
             logger.error("Error en fallback Gemini: %s", exc, exc_info=True)
+        finally:
+            self._observe_gemini(time.monotonic() - started)
         return self._FALLBACK_RESPONSE
 
+    async def _stream_fallback(self, conversation_id: str, message_text: str):
+        gateway = self._ensure_fallback_components()
+        if not isinstance(gateway, AsyncGeminiResponder):
+            yield await self._fallback_response(conversation_id, message_text)
+            return
+
+        prompt = self._build_prompt(conversation_id, message_text)
+        delivered = False
+        started = time.monotonic()
+        try:
+            async with _limited(self._gemini_limiter) as slot:
+                async for chunk in gateway.stream_response_async(prompt, self._system_instructions):
+                    if chunk:
+                        if not delivered:
+                            self._metrics.observe(
+                                "agent.gemini_first_chunk_seconds", time.monotonic() - started
+                            )
+                            if slot is not None:
+                                # En streaming la latencia que cuenta es la del primer fragmento
+                                slot.mark()
+                        delivered = True
+                        yield chunk
+        except ConcurrencyLimitExceededError as exc:
+            logger.warning("Fallback Gemini rechazado por saturación: %s", exc)
+        except GeminiUnavailableError as exc:
+            logger.warning("Fallback Gemini no disponible: %s", exc)
+        except (ValueError, AttributeError, TypeError) as exc:
+            logger.error("Error en fallback Gemini (streaming): %s", exc, exc_info=True)
+        self._observe_gemini(time.monotonic() - started)
+        if not delivered:
+            yield self._FALLBACK_RESPONSE
+
+    def _degraded(self, level: int) -> bool:
+        "Si el control de sobrecarga está en ``level`` o en un escalón más alto."
+        return self._overload is not None and self._overload.level >= level
+
+    def _observe_rasa(self, seconds: float) -> None:
+        if self._overload is not None:
+            self._overload.observe_latency(seconds)
+
+    def _observe_gemini(self, seconds: float) -> None:
+        self._metrics.observe("agent.gemini_seconds", seconds)
+        if self._overload is not None:
+            self._overload.observe_latency(seconds)
+
     def _ensure_fallback_components(self) -> GeminiGateway | None:
         if self._fallback_initialized:
             return self._gemini_gateway
+        # El warm-up puede estar cargando lo mismo desde otro thread
+        with self._fallback_lock:
+            if not self._fallback_initialized:
+                self._load_fallback_components()
+                self._fallback_initialized = True
+        return self._gemini_gateway
 
-        self._fallback_initialized = True
+    def _load_fallback_components(self) -> None:
         # Usar dependencias inyectadas
         try:
             if self._instructions_repository is not None:
@@ -207,23 +464,24 @@ class AgentGateway:
             logger.error("Gemini fallback deshabilitado: %s", exc, exc_info=True)
             self._gemini_gateway = None
 
-        return self._gemini_gateway
-
     def _store_turn(self, conversation_id: str, role: str, text: str) -> None:
         if not conversation_id or not text:
             return
         with self._history_lock:
             history = self._history.setdefault(conversation_id, [])
             history.append((role, text))
-            if len(history) > 20:
-                del history[:-20]
+            if len(history) > self._HISTORY_TURNS:
+                del history[: -self._HISTORY_TURNS]
 
     def _build_prompt(self, conversation_id: str, message_text: str) -> str:
         lines: list[str] = []
         if conversation_id:
             with self._history_lock:
                 history = list(self._history.get(conversation_id, []))
-            for role, text in history[-20:]:
+            turns = (
+                self._SHORT_HISTORY_TURNS if self._degraded(SHORT_HISTORY) else self._HISTORY_TURNS
+            )
+            for role, text in history[-turns:]:
                 prefix = "Usuario" if role == "user" else "Gemini"
                 lines.append(f"{prefix}: {text}")
         lines.append(f"Usuario: {message_text}")
@@ -231,6 +489,11 @@ class AgentGateway:
         return "\n".join(lines)
 
 
+def _limited(limiter: AdaptiveConcurrencyLimiter | None):
+    "Turno del limitador, o un contexto vacío si no hay limitador."
+    return limiter.slot() if limiter is not None else nullcontext()
+
+
 def _is_truthy(value: str | None) -> bool:
     if value is None:
         return False
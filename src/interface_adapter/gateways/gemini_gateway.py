@@ -2,11 +2,13 @@
 Path: src/interface_adapter/gateways/gemini_gateway.py
 """
 
-from src.entities.gemini_responder import GeminiResponder
+import asyncio
+
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
 from src.entities.system_instructions import SystemInstructions
 
 
-class GeminiGateway(GeminiResponder):
+class GeminiGateway(GeminiResponder, AsyncGeminiResponder):
     """Puente entre el servicio Gemini y la interfaz del gateway."""
 
     def __init__(self, service):
@@ -15,15 +17,37 @@ class GeminiGateway(GeminiResponder):
 
     def get_response(self, prompt, system_instructions: SystemInstructions = None):
         """Genera una respuesta usando el prompt y las instrucciones del sistema."""
+        instructions_content = self._instructions_content(system_instructions)
+        return self.service.get_response(prompt, instructions_content)
+
+    async def get_response_async(self, prompt, system_instructions: SystemInstructions = None):
+        """Genera una respuesta sin bloquear el event loop.
+
+        Usa el camino asíncrono nativo del servicio si existe; si el servicio solo es
+        síncrono, lo ejecuta en un thread como último recurso.
+        """
+        instructions_content = self._instructions_content(system_instructions)
+        if isinstance(self.service, AsyncGeminiResponder):
+            return await self.service.get_response_async(prompt, instructions_content)
+        return await asyncio.to_thread(self.service.get_response, prompt, instructions_content)
+
+    async def stream_response_async(self, prompt, system_instructions: SystemInstructions = None):
+        """Entrega la respuesta en fragmentos si el servicio soporta streaming."""
+        if isinstance(self.service, AsyncGeminiResponder):
+            instructions_content = self._instructions_content(system_instructions)
+            async for chunk in self.service.stream_response_async(prompt, instructions_content):
+                yield chunk
+        else:
+            yield await self.get_response_async(prompt, system_instructions)
+
+    @staticmethod
+    def _instructions_content(system_instructions):
         if isinstance(system_instructions, SystemInstructions):
             # Usa 'content' o 'instructions' según el atributo real
             content = getattr(system_instructions, "content", None) or getattr(
                 system_instructions, "instructions", None
             )
             if isinstance(content, list):
-                instructions_content = ", ".join(map(str, content))
-            else:
-                instructions_content = str(content)
-        else:
-            instructions_content = system_instructions
-        return self.service.get_response(prompt, instructions_content)
+                return ", ".join(map(str, content))
+            return str(content)
+        return system_instructions
@@ -4,35 +4,339 @@ Path: src/interface_adapter/presenters/markdown_converter.py
 
 import re
 
+from src.interface_adapter.presenters.message_splitter import utf16_len
+
+# Caracteres que MarkdownV2 exige escapar fuera de entidades de código
+_SPECIAL_CHARS = "_*[]()~`>#+-=|{}.!\\"
+_ESCAPE_TABLE = str.maketrans({char: "\\" + char for char in _SPECIAL_CHARS})
+# Dentro de `code`/```pre``` solo se escapan la comilla invertida y la barra
+_CODE_ESCAPE_TABLE = str.maketrans({"`": "\\`", "\\": "\\\\"})
+# Dentro de la URL de un enlace solo se escapan el paréntesis de cierre y la barra
+_URL_ESCAPE_TABLE = str.maketrans({")": "\\)", "\\": "\\\\"})
+
+_INLINE_TOKEN = re.compile(
+    r"\\(?P<escaped>[!-/:-@\[-`{-~])"
+    r"|(?P<stars>\*+)|(?P<unders>_+)|(?P<tildes>~~)|(?P<ticks>`+)"
+    r"|(?P<open_link>\[)"
+    r"|\](?:\((?P<url>[^()\s]+(?:\([^()\s]*\)[^()\s]*)*)\))?"
+)
+_FENCE = re.compile(r"^\s*(```+|~~~+)\s*([\w+-]*)")
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)(?:\s+#+)?\s*$")
+_BULLET = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^(\s*)(\d{1,9})[.)]\s+(.*)$")
+
+# Sin escapes: modo entidades
+_NO_ESCAPE = {}
+
+# Marcador MarkdownV2 de cada delimitador (tipo + carácter de origen)
+_MARKERS = {
+    "bold*": "*",
+    "bold_": "*",
+    "italic*": "_",
+    "italic_": "_",
+    "strike~": "~",
+    "link[": "[",
+}
+# Entidad de Telegram de cada delimitador
+_ENTITY_TYPES = {
+    "bold*": "bold",
+    "bold_": "bold",
+    "italic*": "italic",
+    "italic_": "italic",
+    "strike~": "strikethrough",
+    "link[": "text_link",
+}
+
+
+def escape_markdown_v2(text: str) -> str:
+    "Escapa todos los caracteres especiales de MarkdownV2."
+    return text.translate(_ESCAPE_TABLE)
+
 
 class MarkdownConverter:
-    "Convierte formato Markdown estándar a MarkdownV2 para Telegram."
-
-    def convert(self, text: str) -> str:
-        "Convierte negritas y cursivas a formato MarkdownV2 y escapa caracteres especiales."
-        text = re.sub(r"\*\*(.+?)\*\*", r"*\1*", text)
-        text = re.sub(r"\*(?!\*)([^*]+?)\*(?!\*)", r"_\1_", text)
-        return self._escape_markdown_v2(text)
-
-    def _escape_markdown_v2(self, text: str) -> str:
-        "Escapa caracteres especiales según las reglas de MarkdownV2."
-        special_chars = [
-            "[",
-            "]",
-            "(",
-            ")",
-            "~",
-            "`",
-            ">",
-            "#",
-            "+",
-            "-",
-            "=",
-            "|",
-            "{",
-            "}",
-            ".",
-            "!",
-            "\\",
-        ]
-        return "".join(["\\" + c if c in special_chars else c for c in text])
+    """Convierte Markdown estándar a MarkdownV2 de Telegram en una sola pasada.
+
+    Soporta negritas, cursivas, tachado, código en línea y en bloque, enlaces, listas y
+    encabezados. Los delimitadores se emparejan con una pila: los que no cierran quedan
+    como texto escapado, así que la salida siempre está balanceada. La misma pasada puede
+    producir texto plano con entidades de Telegram (``to_entities``).
+    """
+
+    def convert(self, text: str, at_line_start: bool = True) -> str:
+        """Convierte el texto completo. Con ``at_line_start=False`` la primera línea se
+        trata como continuación (sin listas ni encabezados), para convertir por tramos."""
+        return "".join(_render(text, at_line_start, None))
+
+    def to_entities(self, text: str) -> tuple[str, list]:
+        """Texto plano y entidades de Telegram (``bold``, ``text_link``, ``pre``...).
+
+        Los offsets y largos de las entidades están en unidades UTF-16."""
+        spans: list = []
+        out = _render(text, True, spans)
+        return "".join(out), _entities(out, spans)
+
+
+def _render(text: str, at_line_start: bool, spans: list | None) -> list:
+    """Renderiza línea por línea en ``out``. Con ``spans=None`` produce MarkdownV2; con una
+    lista, texto sin escapes y los tramos ``(tipo, pieza inicial, pieza final, extra)``."""
+    out: list[str] = []
+    fence = None
+    pre_start, language = 0, ""
+    skip_newline = False
+    for index, line in enumerate(text.split("\n")):
+        if index:
+            # En modo entidades las líneas de cercado no dejan una línea vacía
+            out.append("" if skip_newline else "\n")
+            skip_newline = False
+        if fence is not None:
+            if line.lstrip().startswith(fence):
+                fence = None
+                if spans is None:
+                    out.append("```")
+                else:
+                    # El salto de línea previo al cercado queda fuera de la entidad
+                    spans.append(("pre", pre_start, len(out) - 1, language))
+                    skip_newline = True
+            else:
+                out.append(line.translate(_CODE_ESCAPE_TABLE if spans is None else _NO_ESCAPE))
+        elif index == 0 and not at_line_start:
+            _InlineRenderer(out, spans).render(line)
+        else:
+            match = _FENCE.match(line)
+            if match is None:
+                _render_block_line(line, out, spans)
+                continue
+            fence, language = match.group(1), match.group(2)
+            if spans is None:
+                out.append("```" + language)
+            else:
+                pre_start = len(out) + 1
+                skip_newline = True
+    if fence is not None:
+        # Bloque de código sin cerrar: se cierra al final para mantener el balance
+        if spans is None:
+            out.append("\n```")
+        else:
+            # Sin líneas después de la apertura, pre_start queda fuera de ``out``
+            spans.append(("pre", min(pre_start, len(out)), len(out), language))
+    return out
+
+
+def _render_block_line(line: str, out: list, spans: list | None) -> None:
+    "Renderiza una línea de texto según su tipo de bloque (encabezado, lista o párrafo)."
+    match = _HEADING.match(line)
+    if match:
+        # Telegram no tiene encabezados: se muestran en negrita (sin negritas anidadas)
+        start = len(out)
+        out.append("*" if spans is None else "")
+        _InlineRenderer(out, spans, allow_bold=False).render(match.group(1))
+        if spans is None:
+            out.append("*")
+        else:
+            spans.append(("bold", start, len(out), None))
+        return
+    match = _BULLET.match(line)
+    if match:
+        out.append(match.group(1) + "• ")
+        _InlineRenderer(out, spans).render(match.group(2))
+        return
+    match = _NUMBERED.match(line)
+    if match:
+        dot = "\\." if spans is None else "."
+        out.append(f"{match.group(1)}{match.group(2)}{dot} ")
+        _InlineRenderer(out, spans).render(match.group(3))
+        return
+    _InlineRenderer(out, spans).render(line)
+
+
+def _entities(out: list, spans: list) -> list:
+    "Entidades de Telegram a partir de los tramos, con offsets en unidades UTF-16."
+    offsets = [0]
+    total = 0
+    for piece in out:
+        total += len(piece) if piece.isascii() else utf16_len(piece)
+        offsets.append(total)
+    entities = []
+    for kind, start, end, extra in spans:
+        length = offsets[end] - offsets[start]
+        if length <= 0:
+            continue
+        entity = {"type": kind, "offset": offsets[start], "length": length}
+        if kind == "text_link":
+            entity["url"] = extra
+        elif kind == "pre" and extra:
+            entity["language"] = extra
+        entities.append(entity)
+    entities.sort(key=lambda entity: (entity["offset"], -entity["length"]))
+    return entities
+
+
+class _InlineRenderer:
+    """Formato en línea de una línea de texto.
+
+    Cada delimitador de apertura se emite primero como texto escapado y se registra en la
+    pila; si aparece su cierre, se reemplaza por el marcador MarkdownV2 (o, en modo
+    entidades, se borra y se registra el tramo). Al cerrar, los delimitadores abiertos por
+    encima quedan como texto, así que las entidades nunca se cruzan. Cada delimitador entra
+    y sale de la pila una vez: tiempo lineal.
+    """
+
+    def __init__(self, out: list, spans: list | None = None, allow_bold: bool = True):
+        self.out = out
+        self.spans = spans
+        self.allow_bold = allow_bold
+        self.stack: list[tuple[str, int]] = []
+        self.open_counts = dict.fromkeys(_MARKERS, 0)
+        self.open_entities = dict.fromkeys(_ENTITY_TYPES.values(), 0)
+        self.missing_ticks: dict[int, int] = {}
+        if spans is None:
+            self.escape, self.code_escape, self.slash = _ESCAPE_TABLE, _CODE_ESCAPE_TABLE, "\\"
+        else:
+            self.escape, self.code_escape, self.slash = _NO_ESCAPE, _NO_ESCAPE, ""
+
+    def render(self, line: str) -> None:
+        out, escape, slash = self.out, self.escape, self.slash
+        pos, length = 0, len(line)
+        while pos < length:
+            match = _INLINE_TOKEN.search(line, pos)
+            if match is None:
+                out.append(line[pos:].translate(escape))
+                break
+            start, end = match.span()
+            if start > pos:
+                out.append(line[pos:start].translate(escape))
+            before = line[start - 1] if start else " "
+            after = line[end] if end < length else " "
+            group = match.lastgroup
+
+            if group == "escaped":
+                out.append(slash + match.group("escaped"))
+            elif group == "ticks":
+                end = self._code_span(line, match.group("ticks"), end)
+            elif group in ("stars", "unders"):
+                self._emphasis(match.group(group), before, after)
+            elif group == "tildes":
+                if self.open_counts["strike~"] and not before.isspace():
+                    self._close("strike~", "~")
+                elif not after.isspace():
+                    self._push("strike~", slash + "~" + slash + "~")
+                else:
+                    out.append(slash + "~" + slash + "~")
+            elif group == "open_link":
+                self._push("link[", slash + "[")
+            elif match.group("url") and self.open_counts["link["]:
+                url = match.group("url")
+                self._close("link[", "](" + url.translate(_URL_ESCAPE_TABLE) + ")", url)
+            else:
+                # "]" suelto: el "(url)" que lo siga se procesa como texto
+                out.append(slash + "]")
+                end = start + 1
+            pos = end
+
+    def _push(self, kind: str, literal: str) -> None:
+        # Telegram no anida una entidad dentro de otra del mismo tipo (``**a **b** c**``,
+        # ``[[a](u)](v)``): con una ya abierta, el delimitador queda como texto
+        entity = _ENTITY_TYPES[kind]
+        if not self.open_entities[entity]:
+            self.stack.append((kind, len(self.out)))
+            self.open_counts[kind] += 1
+            self.open_entities[entity] += 1
+        self.out.append(literal)
+
+    def _close(self, kind: str, closing: str, url: str | None = None) -> None:
+        out = self.out
+        while self.stack:
+            open_kind, index = self.stack.pop()
+            self.open_counts[open_kind] -= 1
+            self.open_entities[_ENTITY_TYPES[open_kind]] -= 1
+            if open_kind != kind:
+                continue  # queda como texto escapado
+            bold = kind.startswith("bold")
+            if self.spans is not None:
+                out[index] = ""
+                if self.allow_bold or not bold:
+                    self.spans.append((_ENTITY_TYPES[kind], index + 1, len(out), url))
+                return
+            marker = _MARKERS[kind]
+            if bold and not self.allow_bold:
+                marker = closing = ""
+            # "__" se leería como subrayado: se separan las cursivas contiguas, tanto de la
+            # pieza anterior como de la siguiente (``*_hola_*``, ``_*hola*_``)
+            if marker == "_":
+                if index and _ends_with_underscore(out[index - 1]):
+                    marker = "\r" + marker
+                if index + 1 < len(out) and out[index + 1].startswith("_"):
+                    marker += "\r"
+            if closing == "_" and _ends_with_underscore(out[-1]):
+                out.append("\r")
+            out[index] = marker
+            out.append(closing)
+            return
+
+    def _emphasis(self, run: str, before: str, after: str) -> None:
+        "Corrida de ``*`` o ``_``: primero cierra lo abierto, después abre."
+        char = run[0]
+        bold, italic = "bold" + char, "italic" + char
+        # Con guion bajo no hay énfasis dentro de palabras (snake_case)
+        intraword = char == "_"
+        can_close = not before.isspace() and not (intraword and after.isalnum())
+        can_open = not after.isspace() and not (intraword and before.isalnum())
+        counts = self.open_counts
+        remaining = len(run)
+        while remaining and can_close:
+            top = self.stack[-1][0] if self.stack else None
+            if remaining >= 2 and counts[bold] and top != italic:
+                self._close(bold, "*")
+                remaining -= 2
+            elif counts[italic]:
+                self._close(italic, "_")
+                remaining -= 1
+            elif remaining >= 2 and counts[bold]:
+                self._close(bold, "*")
+                remaining -= 2
+            else:
+                break
+        while remaining and can_open:
+            size = 2 if remaining >= 2 else 1
+            self._push(bold if size == 2 else italic, (self.slash + char) * size)
+            remaining -= size
+        if remaining:
+            self.out.append((self.slash + char) * remaining)
+
+    def _code_span(self, line: str, ticks: str, end: int) -> int:
+        "Emite un código en línea si la corrida de comillas cierra; devuelve la posición."
+        size = len(ticks)
+        closing = _find_tick_run(line, end, size, self.missing_ticks)
+        if closing < 0:
+            self.out.append(ticks.translate(self.escape))
+            return end
+        code = line[end:closing].translate(self.code_escape)
+        if self.spans is None:
+            self.out.append("`" + code + "`")
+        else:
+            self.out.append(code)
+            self.spans.append(("code", len(self.out) - 1, len(self.out), None))
+        return closing + size
+
+
+def _ends_with_underscore(piece: str) -> bool:
+    "Si la pieza termina en un marcador ``_`` (no en un guion bajo escapado)."
+    return piece.endswith("_") and not piece.endswith("\\_")
+
+
+def _find_tick_run(line: str, start: int, size: int, missing: dict) -> int:
+    """Posición de la siguiente corrida de exactamente ``size`` comillas invertidas, o -1.
+    Las búsquedas fallidas se recuerdan para no volver a recorrer la línea."""
+    if missing.get(size, len(line) + 1) <= start:
+        return -1
+    ticks = "`" * size
+    position = line.find(ticks, start)
+    while position >= 0:
+        run_end = position + size
+        if (run_end >= len(line) or line[run_end] != "`") and line[position - 1] != "`":
+            return position
+        while run_end < len(line) and line[run_end] == "`":
+            run_end += 1
+        position = line.find(ticks, run_end)
+    missing[size] = start
+    return -1
@@ -2,12 +2,18 @@
 Path: src/interface_adapter/presenters/markdown_validator.py
 """
 
+import re
+
+# Código (en bloque o en línea) y caracteres escapados no cuentan como formato
+_CODE_OR_ESCAPED = re.compile(r"```.*?```|`[^`\n]*`|\\.", re.DOTALL)
+
 
 class MarkdownValidator:
     "Validador simple para verificar el balanceo de ciertos elementos de MarkdownV2."
 
     def validate(self, text: str):
         "Valida que los elementos de MarkdownV2 estén balanceados."
+        text = _CODE_OR_ESCAPED.sub("", text)
         lines = text.splitlines()
         non_list_asterisks = 0
         for line in lines:
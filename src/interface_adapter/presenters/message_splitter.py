@@ -2,12 +2,348 @@
 Path: src/interface_adapter/presenters/message_splitter.py
 """
 
+import re
+
+# Niveles de corte, de mejor a peor
+_PARAGRAPH, _LINE, _SENTENCE, _WORD, _ANY = range(5)
+_SENTENCE_ENDS = ("\\. ", "\\! ", "? ")
+# En texto plano, por nivel: separadores y cuántos de sus caracteres quedan en la parte
+_PLAIN_LEVELS = (
+    (("\n\n", 0),),
+    (("\n", 0),),
+    ((". ", 1), ("! ", 1), ("? ", 1)),
+    ((" ", 0),),
+)
+
+# Fuera de código: texto (con escapes), cercados, marcadores, enlaces y saltos de línea
+_TEXT_TOKEN = re.compile(
+    r"(?P<run>(?:[^\\*_~`|\[\]\n]+|\\.|\|(?!\|)|\](?!\())+)"
+    r"|(?P<pre>```[^\n`]*\n?)|(?P<marker>\|\||__|[*_~`])|(?P<link>\[)"
+    r"|(?P<link_end>\]\((?:\\.|[^\\)])*\))|(?P<lines>\n+)|(?P<other>.)",
+    re.DOTALL,
+)
+_CODE_TOKEN = re.compile(r"(?P<run>(?:[^\\`]+|\\.)+)|(?P<marker>`)|(?P<other>.)", re.DOTALL)
+_PRE_TOKEN = re.compile(
+    r"(?P<run>(?:[^\\`\n]+|\\.)+)|(?P<marker>```)|(?P<lines>\n+)|(?P<other>.)", re.DOTALL
+)
+# Resto de un enlace a partir de "[": texto (con códigos en línea, que pueden tener
+# corchetes) y "](url)". Fuera de los códigos no cruza otro "[", así cada búsqueda recorre
+# un tramo distinto del texto
+_LINK_REST = re.compile(r"(?:\\.|`(?:\\.|[^\\`])*`|[^\\\[\]`])*(\]\((?:\\.|[^\\)])*\))", re.DOTALL)
+
+
+def utf16_len(text: str) -> int:
+    "Longitud en unidades UTF-16, la que usa Telegram para sus límites y offsets."
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _join(left: str, right: str) -> str:
+    # "_" + "__" se leería como "___": Telegram usa "\r" para separarlos
+    if left.endswith("_") and right.startswith("_"):
+        return left + "\r" + right
+    return left + right
+
 
 class MessageSplitter:
-    "Presenter para dividir mensajes largos en partes más pequeñas."
+    """Divide textos MarkdownV2 en partes que respetan el límite de Telegram.
+
+    El límite se mide en unidades UTF-16. Se prefiere cortar entre párrafos, líneas,
+    oraciones o palabras; nunca se separa un escape de su carácter, y el formato abierto
+    en el corte se cierra al final de la parte y se reabre al comienzo de la siguiente.
+    """
 
     def split(self, text: str, max_len: int) -> list:
         "Divide el texto en partes más pequeñas que cumplan con el límite de longitud."
         if not text:
             return []
-        return [text[i : i + max_len] for i in range(0, len(text), max_len)]
+        if utf16_len(text) <= max_len:
+            return [text]
+        return _Splitter(text, max_len).split()
+
+    def split_entities(self, text: str, entities: list, max_len: int) -> list:
+        """Divide texto plano con entidades de Telegram en partes ``(texto, entidades)``.
+
+        Los cortes siguen las mismas preferencias que ``split``; cada entidad se recorta a
+        las partes que toca, con offsets relativos a cada parte."""
+        if not text:
+            return []
+        if utf16_len(text) <= max_len:
+            return [(text, entities)]
+        ranges = []
+        start = start_units = 0
+        while start < len(text):
+            end, resume = _plain_cut(text, start, max_len)
+            end_units = start_units + utf16_len(text[start:end])
+            if text[start:end].strip():
+                ranges.append((start, end, start_units, end_units))
+            start_units = end_units + utf16_len(text[end:resume])
+            start = resume
+        return _distribute(text, ranges, entities)
+
+
+class _Splitter:
+    """Una pasada sobre los tokens del texto.
+
+    Mientras la parte actual entra en el límite se recuerda el último corte posible de
+    cada nivel, con la pila de formato abierto en ese punto. Al pasarse se usa el mejor
+    corte que deje la parte al menos a medias y se sigue desde ahí: como mucho se vuelve a
+    recorrer media parte, así que el tiempo es lineal.
+    """
+
+    def __init__(self, text: str, max_len: int):
+        self.text = text
+        self.max_len = max_len
+        self.parts: list[str] = []
+
+    def split(self) -> list:
+        text, length = self.text, len(self.text)
+        self._start(0, ())
+        pos = 0
+        while pos < length:
+            top = self.stack[-1][0] if self.stack else ""
+            in_code = top == "`" or top.startswith("```")
+            if in_code:
+                match = (_CODE_TOKEN if top == "`" else _PRE_TOKEN).match(text, pos)
+            else:
+                match = _TEXT_TOKEN.match(text, pos)
+            kind, end = match.lastgroup, match.end()
+            if kind == "link":
+                rest = _LINK_REST.match(text, end)
+                if rest is None:
+                    fits = self._run(pos, end, plain=True)  # "[" sin cierre: es texto
+                elif self._fits_whole(pos, rest.end()):
+                    # Un enlace que entra en una parte no se corta: va entero en una
+                    self._candidate(_ANY, pos, pos, pos, self.units)
+                    fits = self._advance(utf16_len(text[pos : rest.end()]), self.reserve)
+                    end = rest.end()
+                else:
+                    fits = self._open("[", rest.group(1), pos, end)
+            elif kind in ("run", "other"):
+                fits = self._run(pos, end, plain=not in_code)
+            elif kind == "lines":
+                level = _PARAGRAPH if end - pos > 1 else _LINE
+                self._candidate(level, pos, end, pos, self.units)
+                fits = self._advance(end - pos, self.reserve)
+            elif kind == "pre":
+                fits = self._open(match.group(), "```", pos, end)
+            elif kind == "link_end":
+                fits = self._close("[", pos, end) if top == "[" else self._run(pos, end, True)
+            elif in_code:
+                fits = self._close(top, pos, end)
+            elif match.group() != "`" and top == match.group():
+                # Solo cierra el formato más interno: el mismo marcador más abajo en la pila
+                # sería una entidad anidada en otra de su tipo, y se abre como una nueva
+                fits = self._close(match.group(), pos, end)
+            else:
+                fits = self._open(match.group(), match.group(), pos, end)
+            pos = end if fits else self._cut()
+        self._append(_join(self.prefix, text[self.start :]), text[self.start :])
+        return self.parts
+
+    def _append(self, part: str, content: str) -> None:
+        # Telegram rechaza mensajes vacíos: los tramos solo con espacios se descartan
+        if content.strip():
+            self.parts.append(part)
+
+    def _start(self, start: int, stack: tuple) -> None:
+        "Empieza una parte nueva reabriendo el formato de la pila."
+        self.start = start
+        self.stack = stack
+        self.prefix = self._reopen(stack)
+        # Si la parte sigue con un "_" (un cierre), el prefijo lleva un "\r" más
+        self.units = utf16_len(self.prefix) + (
+            self.prefix.endswith("_") and self.text.startswith("_", start)
+        )
+        self.reserve = self._reserve(stack)
+        self.after_opener = False
+        self.candidates: dict = {}
+        self.runs: list = []
+
+    @staticmethod
+    def _reopen(stack: tuple) -> str:
+        "Marcadores que reabren al comienzo de una parte el formato de la pila."
+        prefix = ""
+        for opener, _closer, _closing in stack:
+            prefix = _join(prefix, opener)
+        return prefix
+
+    def _fits_whole(self, start: int, end: int) -> bool:
+        "Si ``text[start:end]`` entra en una parte nueva que reabre el formato actual."
+        size = utf16_len(self._reopen(self.stack)) + utf16_len(self.text[start:end]) + 1
+        return size + self._reserve(self.stack) <= self.max_len
+
+    @staticmethod
+    def _reserve(stack: tuple) -> int:
+        "Unidades para cerrar el formato abierto (más un posible separador)."
+        if not stack:
+            return 0
+        closing = stack[-1][2]
+        return utf16_len(closing) + closing.startswith("_")
+
+    def _advance(self, size: int, reserve: int) -> bool:
+        if self.units + size + reserve > self.max_len:
+            return False
+        self.units += size
+        self.reserve = reserve
+        self.after_opener = False
+        return True
+
+    def _candidate(self, level: int, end: int, resume: int, base: int, units: int) -> None:
+        "Recuerda un corte: la parte termina en ``end`` y la siguiente empieza en ``resume``."
+        # Nunca justo después de abrir un formato: quedaría una entidad vacía
+        if end > self.start and not (self.after_opener and end == base):
+            self.candidates[level] = (end, resume, base, units, self.stack)
+
+    def _open(self, opener: str, closer: str, pos: int, end: int) -> bool:
+        self._candidate(_ANY, pos, pos, pos, self.units)
+        closing = _join(closer, self.stack[-1][2]) if self.stack else closer
+        stack = self.stack + ((opener, closer, closing),)
+        if not self._advance(end - pos, self._reserve(stack)):
+            return False
+        self.stack = stack
+        self.after_opener = True
+        return True
+
+    def _close(self, opener: str, pos: int, end: int) -> bool:
+        stack = self.stack
+        while stack and stack[-1][0] != opener:
+            stack = stack[:-1]  # con MarkdownV2 válido no hay nada que descartar
+        stack = stack[:-1]
+        if not self._advance(utf16_len(self.text[pos:end]), self._reserve(stack)):
+            return False
+        self.stack = stack
+        return True
+
+    def _run(self, pos: int, end: int, plain: bool) -> bool:
+        "Texto sin formato: se puede cortar en cualquier punto que no parta un escape."
+        self._candidate(_ANY, pos, pos, pos, self.units)
+        size = utf16_len(self.text[pos:end])
+        if self.units + size + self.reserve <= self.max_len:
+            if plain:
+                self.runs.append((pos, end, self.units, self.after_opener, self.stack))
+            self.units += size
+            self.after_opener = False
+            return True
+        limit = self._fit(pos, end)
+        if plain:
+            # Un espacio justo en el límite también sirve: se descarta al cortar
+            stop = min(limit + 1, end)
+            self.runs.append((pos, stop, self.units, self.after_opener, self.stack))
+        if limit > pos:
+            self._candidate(_ANY, limit, limit, pos, self.units)
+        return False
+
+    def _word_candidates(self) -> None:
+        """Busca hacia atrás el último fin de oración y el último espacio de la parte.
+
+        Se hace solo al cortar: recorre los tramos de texto desde el final y se detiene
+        cuando ya no puede encontrar un fin de oración que deje la parte a medias."""
+        text, candidates = self.text, self.candidates
+        for pos, stop, units, after_opener, stack in reversed(self.runs):
+            first = pos + 1 if after_opener else pos
+            if _WORD not in candidates:
+                space = text.rfind(" ", first, stop)
+                if space > self.start:
+                    candidates[_WORD] = (space, space + 1, pos, units, stack)
+            if _SENTENCE not in candidates:
+                found = max(text.rfind(mark, first, stop) for mark in _SENTENCE_ENDS)
+                if found >= 0:
+                    cut = text.index(" ", found)
+                    candidates[_SENTENCE] = (cut, cut + 1, pos, units, stack)
+            if _WORD in candidates and (_SENTENCE in candidates or units * 2 < self.max_len):
+                break
+
+    def _fit(self, pos: int, end: int) -> int:
+        "Mayor índice hasta el que el texto entra en la parte sin partir un escape."
+        budget = self.max_len - self.units - self.reserve
+        if budget <= 0:
+            return pos
+        text = self.text
+        segment = text[pos : min(pos + budget, end)]
+        if utf16_len(segment) == len(segment):
+            limit = pos + len(segment)
+        else:
+            limit = pos
+            while limit < end:
+                budget -= 2 if ord(text[limit]) > 0xFFFF else 1
+                if budget < 0:
+                    break
+                limit += 1
+        backslashes = limit
+        while backslashes > pos and text[backslashes - 1] == "\\":
+            backslashes -= 1
+        if (limit - backslashes) % 2:
+            limit -= 1
+        return limit
+
+    def _units_at(self, candidate) -> int:
+        end, _resume, base, units, _stack = candidate
+        return units + utf16_len(self.text[base:end])
+
+    def _cut(self) -> int:
+        "Cierra la parte en el mejor corte posible y devuelve dónde sigue el texto."
+        self._word_candidates()
+        candidates = self.candidates
+        boundaries = [
+            candidates[level]
+            for level in (_PARAGRAPH, _LINE, _SENTENCE, _WORD)
+            if level in candidates
+        ]
+        best = next((c for c in boundaries if self._units_at(c) * 2 >= self.max_len), None)
+        if best is None:
+            # Ninguno deja la parte a medias: el último límite de palabra, o un corte duro
+            fallback = boundaries or list(candidates.values())
+            best = max(fallback, key=lambda candidate: candidate[0], default=None)
+        if best is None:
+            raise ValueError(f"max_len={self.max_len} no alcanza para el formato abierto")
+        end, resume, _base, _units, stack = best
+        closing = stack[-1][2] if stack else ""
+        content = self.text[self.start : end]
+        self._append(_join(_join(self.prefix, content), closing), content)
+        self._start(resume, stack)
+        return resume
+
+
+def _plain_cut(text: str, start: int, max_len: int) -> tuple[int, int]:
+    "Fin de la parte que empieza en ``start`` y comienzo de la siguiente (texto sin marcas)."
+    segment = text[start : start + max_len]
+    limit = start + len(segment)
+    if utf16_len(segment) > max_len:
+        limit, budget = start, max_len
+        while budget >= (2 if ord(text[limit]) > 0xFFFF else 1):
+            budget -= 2 if ord(text[limit]) > 0xFFFF else 1
+            limit += 1
+        limit = max(limit, start + 1)
+    if limit >= len(text):
+        return len(text), len(text)
+    boundaries = []
+    for separators in _PLAIN_LEVELS:
+        found = max(
+            (text.rfind(sep, start + 1, limit + 1), keep, len(sep)) for sep, keep in separators
+        )
+        if found[0] >= 0:
+            boundaries.append((found[0] + found[1], found[0] + found[2]))
+    # Como en MarkdownV2: el mejor nivel que deje la parte a medias, o el último límite
+    usable = [cut for cut in boundaries if utf16_len(text[start : cut[0]]) * 2 >= max_len]
+    end, resume = usable[0] if usable else max(boundaries, default=(limit, limit))
+    while resume < len(text) and text[resume] == "\n":
+        resume += 1
+    return end, resume
+
+
+def _distribute(text: str, ranges: list, entities: list) -> list:
+    "Asigna a cada parte las entidades que la tocan, recortadas y con offsets relativos."
+    ordered = sorted(entities, key=lambda entity: entity["offset"])
+    parts, active, index = [], [], 0
+    for start, end, first, last in ranges:
+        while index < len(ordered) and ordered[index]["offset"] < last:
+            active.append(ordered[index])
+            index += 1
+        active = [entity for entity in active if entity["offset"] + entity["length"] > first]
+        clipped = []
+        for entity in active:
+            offset = max(entity["offset"], first)
+            length = min(entity["offset"] + entity["length"], last) - offset
+            clipped.append({**entity, "offset": offset - first, "length": length})
+        parts.append((text[start:end], clipped))
+    return parts
@@ -2,39 +2,94 @@
 Path: src/interface_adapter/presenters/telegram_presenter.py
 """
 
+import hashlib
+
 from src.entities.message import Message
 from src.interface_adapter.presenters.markdown_converter import MarkdownConverter
-from src.interface_adapter.presenters.markdown_validator import MarkdownValidator
 from src.interface_adapter.presenters.message_splitter import MessageSplitter
 from src.shared.logger_rasa_v0 import get_logger
+from src.shared.lru_cache import LRUCache
+from src.shared.metrics import MetricsRegistry
 
 logger = get_logger("telegram-presenter")
 
+# Límite de sendMessage, en unidades UTF-16
+TELEGRAM_MAX_LENGTH = 4096
+# Formatos de salida: MarkdownV2 escapado, o texto plano con entidades de Telegram
+TELEGRAM_FORMATS = ("markdown_v2", "entities")
+
 
 class TelegramMessagePresenter:
-    "Presenter para formatear mensajes de Telegram con soporte para Markdown V2."
+    """Presenter para formatear mensajes de Telegram.
+
+    En modo ``markdown_v2`` las partes llevan ``parse_mode``; en modo ``entities`` se
+    envía texto plano con un array ``entities`` (offsets UTF-16), sin escapes.
+
+    ``present`` guarda las partes de las últimas ``cache_size`` respuestas (un LRU por hash
+    del texto y las opciones de formato), así las respuestas fijas del bot no se convierten
+    ni se dividen en cada envío. ``prime`` lo llena de antemano.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        mode: str = "markdown_v2",
+        cache_size: int = 256,
+        metrics: MetricsRegistry | None = None,
+    ):
+        if mode not in TELEGRAM_FORMATS:
+            raise ValueError(f"Formato de Telegram desconocido: {mode}")
+        self.mode = mode
         self.converter = MarkdownConverter()
-        self.validator = MarkdownValidator()
         self.splitter = MessageSplitter()
+        self.cache = LRUCache("telegram_presenter", maxsize=cache_size, metrics=metrics)
 
     def present(self, message: Message) -> list:
-        "Presenta la respuesta escapando correctamente para MarkdownV2."
-        # Limita la longitud de los textos logueados
-        telegram_format = self.converter.convert(message.body)
-        parts = self.splitter.split(telegram_format, 4096)
-        result = []
-        error_logged = False
-        for part in parts:
-            logger.debug("Texto a validar para MarkdownV2: %r", part)
-            try:
-                self.validator.validate(part)
-                result.append({"text": part, "parse_mode": "MarkdownV2"})
-            except ValueError as e:
-                if not error_logged:
-                    logger.error("MarkdownV2 desbalanceado: %s | Texto: %r", e, part)
-                    error_logged = True
-                # Devuelve el texto sin formato si está desbalanceado
-                result.append({"text": part.replace("*", "").replace("_", ""), "parse_mode": None})
-        return result
+        "Presenta la respuesta en partes listas para sendMessage."
+        if self.cache.maxsize == 0:
+            return self.present_formatted(self.convert(message.body))
+        key = self._cache_key(message.body)
+        parts = self.cache.get(key)
+        if parts is None:
+            parts = self.present_formatted(self.convert(message.body))
+            self.cache.put(key, parts)
+        # Copias: quien envía puede modificar las partes sin tocar las del cache
+        return [dict(part) for part in parts]
+
+    def prime(self, texts) -> int:
+        "Presenta y guarda en el cache las respuestas conocidas; devuelve cuántas agregó."
+        if self.cache.maxsize == 0:
+            return 0
+        added = 0
+        for text in texts:
+            key = self._cache_key(text)
+            if text and key not in self.cache:
+                self.cache.put(key, self.present_formatted(self.convert(text)))
+                added += 1
+        return added
+
+    def _cache_key(self, text: str) -> tuple:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return self.mode, TELEGRAM_MAX_LENGTH, digest
+
+    def convert(self, text: str, at_line_start: bool = True) -> str:
+        """Formato intermedio que acepta ``present_formatted``: MarkdownV2, o el Markdown de
+        origen en modo entidades (las entidades se calculan al presentar)."""
+        if self.mode == "entities":
+            return text
+        return self.converter.convert(text, at_line_start)
+
+    def present_formatted(self, telegram_format: str) -> list:
+        "Divide un texto ya convertido en partes que Telegram acepta."
+        if self.mode == "entities":
+            plain, entities = self.converter.to_entities(telegram_format)
+            parts = self.splitter.split_entities(plain, entities, TELEGRAM_MAX_LENGTH)
+            logger.debug("Respuesta dividida en %d partes (entidades)", len(parts))
+            return [
+                {"text": text, "entities": part_entities} if part_entities else {"text": text}
+                for text, part_entities in parts
+            ]
+        # El conversor produce MarkdownV2 balanceado y el divisor cierra y reabre el
+        # formato en cada corte, así que todas las partes se envían con formato
+        parts = self.splitter.split(telegram_format, TELEGRAM_MAX_LENGTH)
+        logger.debug("Respuesta dividida en %d partes", len(parts))
+        return [{"text": part, "parse_mode": "MarkdownV2"} for part in parts]
@@ -0,0 +1,97 @@
+"""
+Path: src/interface_adapter/presenters/telegram_stream_presenter.py
+"""
+
+import re
+
+from src.interface_adapter.presenters.telegram_presenter import TelegramMessagePresenter
+
+# Fin de oración seguido de espacio, o salto de línea
+_SENTENCE_END = re.compile(r"[.!?…:;](?=\s)|\n")
+_FORMAT_MARKER = re.compile(r"\*\*|\*|__|_|`|~~")
+
+
+class TelegramStreamPresenter:
+    """Presenter incremental para respuestas que llegan en fragmentos.
+
+    Solo convierte prefijos estables: texto que termina en un fin de oración
+    y no deja formato abierto. Cada segmento estable se convierte una única vez y se
+    acumula; el texto pendiente es solo la cola aún no estable, y se recorre una sola vez
+    aunque lleguen muchos fragmentos sin un prefijo estable.
+    """
+
+    def __init__(self, presenter: TelegramMessagePresenter | None = None):
+        self.presenter = presenter or TelegramMessagePresenter()
+        self._pending = ""
+        self._text = ""
+        self._at_line_start = True
+        # Hasta dónde se recorrió el texto pendiente y qué marcadores quedaron abiertos
+        self._scanned = 0
+        self._open: set[str] = set()
+
+    @property
+    def text(self) -> str:
+        "Texto estable convertido (en el formato intermedio del presenter) hasta el momento."
+        return self._text
+
+    def feed(self, chunk: str) -> bool:
+        "Agrega un fragmento. Devuelve True si el prefijo estable avanzó."
+        if not chunk:
+            return False
+        self._pending += chunk
+        boundary = self._stable_boundary()
+        if boundary == 0:
+            return False
+        segment, self._pending = self._pending[:boundary], self._pending[boundary:]
+        # En el corte no había formato abierto: lo abierto después sigue valiendo
+        self._scanned -= boundary
+        self._append(segment)
+        return True
+
+    def finish(self) -> str:
+        "Convierte el texto pendiente al terminar el stream y devuelve el texto final."
+        if self._pending:
+            self._append(self._pending)
+            self._pending = ""
+            self._scanned = 0
+            self._open.clear()
+        return self._text
+
+    def parts(self, telegram_text: str | None = None) -> list:
+        "Partes listas para enviar (mismo formato que TelegramMessagePresenter.present)."
+        text = self._text if telegram_text is None else telegram_text
+        return self.presenter.present_formatted(text) if text else []
+
+    def _append(self, segment: str) -> None:
+        # Un segmento que empieza a mitad de línea no puede abrir una lista o un encabezado
+        self._text += self.presenter.convert(segment, self._at_line_start)
+        self._at_line_start = segment.endswith("\n")
+
+    def _stable_boundary(self) -> int:
+        "Fin del último prefijo estable del texto pendiente (0 si no hay); sigue donde quedó."
+        pending = self._pending
+        boundary = 0
+        for match in _SENTENCE_END.finditer(pending, self._scanned):
+            candidate = match.end()
+            for marker in _FORMAT_MARKER.finditer(pending, self._scanned, candidate):
+                if _is_delimiter(pending, marker.start(), marker.end()):
+                    self._open ^= {marker.group()}
+            self._scanned = candidate
+            # No cortar con negritas/cursivas o código abiertos
+            if not self._open:
+                boundary = candidate
+        return boundary
+
+
+def _is_delimiter(text: str, start: int, end: int) -> bool:
+    """Si el marcador en ``text[start:end]`` puede abrir o cerrar formato.
+
+    Como en MarkdownConverter: ``*`` o ``_`` entre espacios (una viñeta ``* ``, ``2 * 3``)
+    y ``_`` dentro de una palabra (snake_case) quedan como texto."""
+    if text[start] not in "*_":
+        return True
+    before = text[start - 1] if start else " "
+    after = text[end] if end < len(text) else " "
+    if before.isspace() and after.isspace():
+        return False
+    return not (text[start] == "_" and before.isalnum() and after.isalnum())
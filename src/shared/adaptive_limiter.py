@@ -0,0 +1,217 @@
+"""
+Path: src/shared/adaptive_limiter.py
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("adaptive-limiter")
+
+# Muestras por ventana de latencia mínima; la referencia es el mínimo de las dos últimas
+# ventanas, así puede subir si el servicio se vuelve más lento de forma permanente
+_WINDOW_SAMPLES = 100
+# Peso de cada muestra en el promedio móvil de la latencia reciente
+_LATENCY_WEIGHT = 0.2
+# Latencia de referencia mínima: por debajo, las diferencias son ruido y no congestión
+_MIN_REFERENCE_SECONDS = 0.005
+
+
+class ConcurrencyLimitExceededError(RuntimeError):
+    "La cola de espera del limitador está llena y la llamada se rechaza."
+
+
+class LimiterSlot:
+    "Turno concedido por el limitador; mide la latencia de la llamada."
+
+    def __init__(self, clock):
+        self._clock = clock
+        self.started = clock()
+        self.latency: float | None = None
+
+    def mark(self) -> None:
+        "Fija la latencia en este punto (por ejemplo, al recibir el primer fragmento)."
+        if self.latency is None:
+            self.latency = self._clock() - self.started
+
+
+class AdaptiveConcurrencyLimiter:
+    """Límite de llamadas concurrentes a un servicio que se ajusta solo (AIMD).
+
+    Mientras la latencia reciente se mantiene cerca de la mínima observada (hasta
+    ``tolerance`` veces) y el límite se está usando, sube de a uno cada ``limit`` llamadas;
+    ante una excepción de ``drop_exceptions`` (timeouts) o un pico de latencia lo multiplica
+    por ``backoff``, una sola vez por episodio. Las llamadas que exceden el límite esperan
+    turno en orden de llegada; con ``max_queue`` esperando, las nuevas se rechazan con
+    ``ConcurrencyLimitExceededError``.
+
+    Publica los gauges ``limiter.<name>.limit``, ``in_flight`` y ``queued``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        max_queue: int = 64,
+        tolerance: float = 2.0,
+        backoff: float = 0.7,
+        drop_exceptions: tuple = (asyncio.TimeoutError,),
+        metrics: MetricsRegistry | None = None,
+        clock=time.monotonic,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Se requiere 1 <= min_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff debe estar entre 0 y 1")
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.drop_exceptions = drop_exceptions
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._samples = 0
+        self._window_min: float | None = None
+        self._previous_min: float | None = None
+        self._recent: float | None = None
+        self._last_decrease = float("-inf")
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        "Llamadas concurrentes admitidas en este momento."
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        "Llamadas esperando turno."
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Espera turno y lo libera al salir, ajustando el límite según el resultado.
+
+        Las excepciones que no son de ``drop_exceptions`` (y las cancelaciones) no cuentan
+        como muestra de latencia."""
+        await self._acquire()
+        slot = LimiterSlot(self._clock)
+        try:
+            yield slot
+        except self.drop_exceptions:
+            self._decrease(slot.started, "timeout")
+            raise
+        else:
+            slot.mark()
+            self._on_sample(slot)
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        "Límite actual, llamadas en curso y en espera, y latencias de referencia."
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "min_latency": self._baseline(),
+            "recent_latency": self._recent,
+        }
+
+    async def _acquire(self) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            self._publish()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._metrics.increment(f"limiter.{self.name}.rejected")
+            raise ConcurrencyLimitExceededError(
+                f"{self.name}: {self._in_flight} llamadas en curso y {self.queued} en espera"
+            )
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._publish()
+        enqueued = self._clock()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # El turno llegó junto con la cancelación: se devuelve
+                self._release()
+            else:
+                # _wake pudo haberlo sacado ya de la cola al saltear los cancelados
+                with suppress(ValueError):
+                    self._waiters.remove(future)
+                self._publish()
+            raise
+        finally:
+            self._metrics.observe(f"limiter.{self.name}.wait_seconds", self._clock() - enqueued)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+        self._publish()
+
+    def _on_sample(self, slot: LimiterSlot) -> None:
+        latency = slot.latency
+        self._track_minimum(latency)
+        self._recent = (
+            latency
+            if self._recent is None
+            else self._recent + _LATENCY_WEIGHT * (latency - self._recent)
+        )
+        if self._recent > self.tolerance * max(self._baseline(), _MIN_REFERENCE_SECONDS):
+            self._decrease(slot.started, "latencia")
+        elif self._in_flight >= self._limit / 2:
+            # Solo se sube si el límite actual se está aprovechando
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._wake()
+
+    def _decrease(self, started: float, reason: str) -> None:
+        # Las llamadas que ya estaban en curso al bajar el límite no vuelven a bajarlo
+        if started < self._last_decrease:
+            return
+        self._last_decrease = self._clock()
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        # La latencia reciente se vuelve a medir con el límite nuevo
+        self._recent = self._baseline()
+        self._metrics.increment(f"limiter.{self.name}.decreases")
+        logger.info("Limitador %s: %d -> %d (%s)", self.name, previous, self.limit, reason)
+        self._publish()
+
+    def _track_minimum(self, latency: float) -> None:
+        self._samples += 1
+        if self._window_min is None or latency < self._window_min:
+            self._window_min = latency
+        if self._samples % _WINDOW_SAMPLES == 0:
+            self._previous_min, self._window_min = self._window_min, None
+
+    def _baseline(self) -> float | None:
+        candidates = [m for m in (self._window_min, self._previous_min) if m is not None]
+        return min(candidates) if candidates else None
+
+    def _publish(self) -> None:
+        self._metrics.set_gauge(f"limiter.{self.name}.limit", self.limit)
+        self._metrics.set_gauge(f"limiter.{self.name}.in_flight", self._in_flight)
+        self._metrics.set_gauge(f"limiter.{self.name}.queued", len(self._waiters))
@@ -0,0 +1,124 @@
+"""
+Path: src/shared/bounded_executor.py
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("bounded-executor")
+
+
+class ExecutorQueueFullError(RuntimeError):
+    "Se lanza cuando la cola de admisión del executor está llena y la tarea se rechaza."
+
+
+class BoundedExecutor:
+    """Pool de threads dedicado con cola de admisión acotada para llamadas bloqueantes.
+
+    A diferencia de ``asyncio.to_thread`` (que comparte el executor por defecto del loop),
+    las tareas esperan en una cola de profundidad máxima conocida: cuando se llena, ``run``
+    rechaza de inmediato con ``ExecutorQueueFullError``. El tiempo de espera de cada tarea
+    y la ocupación del pool se publican en el registro de métricas.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 8,
+        max_queue: int = 32,
+        metrics: MetricsRegistry | None = None,
+    ):
+        if max_workers <= 0:
+            raise ValueError("max_workers debe ser mayor que cero")
+        if max_queue < 0:
+            raise ValueError("max_queue no puede ser negativo")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._metrics = metrics or get_metrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0  # tareas admitidas: en cola + en ejecución
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        "Cantidad de tareas ejecutándose en este momento."
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        "Cantidad de tareas admitidas que esperan un thread libre."
+        return self._pending - self._active
+
+    async def run(self, func, *args, **kwargs):
+        """Ejecuta ``func`` en el pool dedicado y espera su resultado.
+
+        Propaga las variables de contexto igual que ``asyncio.to_thread``.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._metrics.increment(f"executor.{self.name}.rejected")
+                logger.warning(
+                    "Executor %s saturado (activos=%d, en cola=%d). Rechazando tarea.",
+                    self.name,
+                    self._active,
+                    self._pending - self._active,
+                )
+                raise ExecutorQueueFullError(f"Cola del executor {self.name} llena")
+            self._pending += 1
+        self._metrics.increment(f"executor.{self.name}.submitted")
+        self._publish()
+
+        enqueued_at = time.monotonic()
+        context = contextvars.copy_context()
+
+        def _task():
+            with self._lock:
+                self._active += 1
+            self._metrics.observe(
+                f"executor.{self.name}.wait_seconds", time.monotonic() - enqueued_at
+            )
+            self._publish()
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        try:
+            future = self._executor.submit(_task)
+        except RuntimeError:
+            self._release()
+            raise
+        # El callback corre también si la tarea se cancela antes de empezar
+        future.add_done_callback(lambda _f: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        "Devuelve una foto del estado del executor."
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        "Detiene el pool descartando las tareas que aún no empezaron."
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._publish()
+
+    def _publish(self) -> None:
+        self._metrics.set_gauge(f"executor.{self.name}.active", self.active)
+        self._metrics.set_gauge(f"executor.{self.name}.queued", self.queued)
@@ -1,10 +1,15 @@
 """Configuration helpers."""
 
+import asyncio
 import logging
 import os
+import signal
+import threading
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from types import MappingProxyType
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 
 DEFAULT_SYSTEM_INSTRUCTIONS_PATH = (
     Path(__file__).resolve().parent.parent
@@ -13,7 +18,14 @@ DEFAULT_SYSTEM_INSTRUCTIONS_PATH = (
     / "system_instructions.json"
 )
 
-load_dotenv()
+DEFAULT_RASA_REST_URL = "http://localhost:5005/webhooks/rest/webhook"
+
+# Variables definidas por el proceso: tienen prioridad sobre .env también al recargar
+_PROCESS_ENV_KEYS = frozenset(os.environ)
+_DOTENV_PATH = find_dotenv()
+load_dotenv(_DOTENV_PATH or None)
+# Claves que puso el último .env aplicado, para quitarlas si desaparecen al recargar
+_dotenv_keys = set(dotenv_values(_DOTENV_PATH)) - _PROCESS_ENV_KEYS if _DOTENV_PATH else set()
 
 logger = logging.getLogger("config")
 
@@ -26,13 +38,190 @@ def _parse_bool(val, default=False):
     return str(val).strip().lower() in ("1", "true", "yes", "on")
 
 
-def get_config():
+def _parse_int(name, default, minimum=1):
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+        if value < minimum:
+            raise ValueError
+    except (ValueError, TypeError):
+        logger.warning("%s inválido, usando %s.", name, default)
+        return default
+    return value
+
+
+def _parse_float(name, default, minimum=0.0):
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+        if value < minimum:
+            raise ValueError
+    except (ValueError, TypeError):
+        logger.warning("%s inválido, usando %s.", name, default)
+        return default
+    return value
+
+
+def _parse_model_routes(raw):
     """
-    Load and validate configuration from environment variables.
-    Raises ValueError if a required variable is missing or invalid.
+    Parsea GEMINI_MODELS: rutas separadas por coma, de la más barata a la más capaz,
+    con formato ``modelo:max_tokens[:canal|canal]``.
     """
-    config = {}
+    routes = []
+    if not raw:
+        return routes
+    for item in raw.split(","):
+        fields = [field.strip() for field in item.strip().split(":")]
+        if not fields[0]:
+            continue
+        try:
+            max_tokens = int(fields[1]) if len(fields) > 1 and fields[1] else 1_000_000
+        except ValueError:
+            logger.warning("GEMINI_MODELS: límite de tokens inválido en %r, ignorando.", item)
+            continue
+        channels = tuple(c for c in fields[2].split("|") if c) if len(fields) > 2 else ()
+        routes.append({"name": fields[0], "max_prompt_tokens": max_tokens, "channels": channels})
+    return routes
+
+
+def _parse_log_level(raw, default="INFO"):
+    level = str(raw or default).strip().upper()
+    if not isinstance(logging.getLevelName(level), int):
+        logger.warning("Nivel de log inválido %r, usando %s.", raw, default)
+        return default
+    return level
 
+
+def _parse_log_levels(raw):
+    "Parsea LOG_LEVELS: pares ``logger=NIVEL`` separados por coma."
+    levels = {}
+    if not raw:
+        return levels
+    for item in raw.split(","):
+        name, _, level = item.partition("=")
+        if not name.strip() or not level.strip():
+            continue
+        levels[name.strip()] = _parse_log_level(level)
+    return levels
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Snapshot inmutable y tipado de la configuración.
+
+    ``get(clave)`` y ``config[clave]`` aceptan las claves en mayúsculas de
+    ``get_config()``, por lo que el snapshot reemplaza al dict sin cambiar a quien lo lee.
+    """
+
+    telegram_api_key: str | None = None
+    google_gemini_api_key: str | None = None
+    telegram_message_delay: float = 0.5
+    rasa_rest_url: str = DEFAULT_RASA_REST_URL
+    disable_rasa: bool = False
+    log_message_max_length: int = 160
+    log_level: str = "INFO"
+    log_levels: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    log_format: str = "text"
+    telegram_streaming: bool = False
+    telegram_stream_edit_interval: float = 1.0
+    telegram_format: str = "markdown_v2"
+    telegram_inline_reply: bool = False
+    telegram_typing_interval: float = 4.0
+    coalesce_window: float = 0.0
+    coalesce_max_window: float = 3.0
+    supersede_policy: str = "off"
+    update_queue_path: str = ""
+    update_queue_lease: float = 60.0
+    update_queue_max_attempts: int = 5
+    update_queue_retention: float = 3600.0
+    telegram_inline_reply_budget: float = 5.0
+    presentation_cache_size: int = 256
+    gemini_model: str = "models/gemini-2.5-flash"
+    gemini_models: tuple = ()
+    gemini_latency_slo: float = 8.0
+    gemini_rpm: int = 0
+    gemini_tpm: int = 0
+    gemini_queue_max_wait: float = 20.0
+    gemini_executor_workers: int = 8
+    gemini_executor_queue_size: int = 32
+    adaptive_concurrency: bool = False
+    rasa_max_concurrency: int = 32
+    gemini_max_concurrency: int = 16
+    adaptive_concurrency_queue: int = 64
+    overload_control: bool = False
+    overload_queue_depth: int = 32
+    overload_loop_lag: float = 0.5
+    overload_latency: float = 15.0
+    overload_cooldown: float = 10.0
+    overload_hold: float = 3.0
+    rate_limit_per_minute: int = 0
+    rate_limit_burst: int = 10
+    rate_limit_ip_per_minute: int = 0
+    rate_limit_store_path: str = ""
+    rate_limit_max_identities: int = 10_000
+    config_reload_interval: float = 5.0
+    startup_warmup_timeout: float = 10.0
+    fake_upstreams: tuple = ()
+    fake_rasa_latency: float = 0.0
+    fake_gemini_latency: float = 0.3
+    fake_gemini_tokens_per_second: float = 0.0
+    fake_gemini_error_rate: float = 0.0
+    fake_telegram_latency: float = 0.0
+    fake_telegram_rate_limit: float = 0.0
+    fake_seed: int = 0
+
+    def get(self, key, default=None):
+        "Valor de la clave (``TELEGRAM_API_KEY``, ...) o ``default`` si no existe."
+        name = str(key).lower()
+        if name not in _FIELD_NAMES:
+            return default
+        return getattr(self, name)
+
+    def __getitem__(self, key):
+        name = str(key).lower()
+        if name not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, name)
+
+    def as_dict(self) -> dict:
+        "Configuración como dict mutable, con el formato que devuelve get_config()."
+        config = {}
+        for name in _FIELD_NAMES:
+            value = getattr(self, name)
+            if isinstance(value, MappingProxyType):
+                value = dict(value)
+            elif name == "gemini_models":
+                value = [dict(route) for route in value]
+            config[name.upper()] = value
+        return config
+
+    def require_api_keys(self) -> "AppConfig":
+        "Valida las claves obligatorias; lanza ValueError si falta alguna."
+        for key in ("TELEGRAM_API_KEY", "GOOGLE_GEMINI_API_KEY"):
+            if not self.get(key):
+                logger.error("%s es obligatorio y debe ser un string válido.", key)
+                raise ValueError(f"{key} es obligatorio y debe ser un string válido.")
+        return self
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(AppConfig))
+
+
+def _read_api_key(name, required):
+    value = os.getenv(name)
+    if not value or not isinstance(value, str) or len(value.strip()) < 10:
+        if required:
+            logger.error("%s es obligatorio y debe ser un string válido.", name)
+            raise ValueError(f"{name} es obligatorio y debe ser un string válido.")
+        return None
+    return value.strip()
+
+
+def _read_settings(require_keys=True) -> AppConfig:
     # TELEGRAM_MESSAGE_DELAY (opcional)
     raw_delay = os.getenv("TELEGRAM_MESSAGE_DELAY", "0.5")
     try:
@@ -42,32 +231,16 @@ def get_config():
     except (ValueError, TypeError):
         logger.warning("TELEGRAM_MESSAGE_DELAY inválido, usando 0.5.")
         telegram_delay = 0.5
-    config["TELEGRAM_MESSAGE_DELAY"] = telegram_delay
-
-    # TELEGRAM_API_KEY (obligatorio)
-    telegram_key = os.getenv("TELEGRAM_API_KEY")
-    if not telegram_key or not isinstance(telegram_key, str) or len(telegram_key.strip()) < 10:
-        logger.error("TELEGRAM_API_KEY es obligatorio y debe ser un string válido.")
-        raise ValueError("TELEGRAM_API_KEY es obligatorio y debe ser un string válido.")
-    config["TELEGRAM_API_KEY"] = telegram_key.strip()
-
-    # GOOGLE_GEMINI_API_KEY (obligatorio)
-    gemini_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-    if not gemini_key or not isinstance(gemini_key, str) or len(gemini_key.strip()) < 10:
-        logger.error("GOOGLE_GEMINI_API_KEY es obligatorio y debe ser un string válido.")
-        raise ValueError("GOOGLE_GEMINI_API_KEY es obligatorio y debe ser un string válido.")
-    config["GOOGLE_GEMINI_API_KEY"] = gemini_key.strip()
+
+    # TELEGRAM_API_KEY y GOOGLE_GEMINI_API_KEY (obligatorios para la aplicación)
+    telegram_key = _read_api_key("TELEGRAM_API_KEY", require_keys)
+    gemini_key = _read_api_key("GOOGLE_GEMINI_API_KEY", require_keys)
 
     # RASA_REST_URL (opcional)
-    rasa_url = os.getenv("RASA_REST_URL", "http://localhost:5005/webhooks/rest/webhook")
+    rasa_url = os.getenv("RASA_REST_URL", DEFAULT_RASA_REST_URL)
     if not isinstance(rasa_url, str) or not rasa_url.startswith("http"):
         logger.warning("RASA_REST_URL inválido, usando valor por defecto.")
-        rasa_url = "http://localhost:5005/webhooks/rest/webhook"
-    config["RASA_REST_URL"] = rasa_url
-
-    # DISABLE_RASA (opcional)
-    disable_rasa = _parse_bool(os.getenv("DISABLE_RASA"), default=False)
-    config["DISABLE_RASA"] = disable_rasa
+        rasa_url = DEFAULT_RASA_REST_URL
 
     # LOG_MESSAGE_MAX_LENGTH (opcional)
     raw_max_length = os.getenv("LOG_MESSAGE_MAX_LENGTH", "160")
@@ -78,18 +251,266 @@ def get_config():
     except (ValueError, TypeError):
         logger.warning("LOG_MESSAGE_MAX_LENGTH inválido, usando 160.")
         max_length = 160
-    config["LOG_MESSAGE_MAX_LENGTH"] = max_length
+
+    # TELEGRAM_FORMAT=entities envía texto plano con entidades en lugar de MarkdownV2
+    telegram_format = os.getenv("TELEGRAM_FORMAT", "markdown_v2").strip().lower()
+    if telegram_format not in ("markdown_v2", "entities"):
+        logger.warning("TELEGRAM_FORMAT inválido, usando markdown_v2.")
+        telegram_format = "markdown_v2"
+
+    # SUPERSEDE_POLICY: qué hacer con un fallback en curso si llega un mensaje más nuevo
+    supersede_policy = os.getenv("SUPERSEDE_POLICY", "off").strip().lower()
+    if supersede_policy not in ("off", "cancel", "drop"):
+        logger.warning("SUPERSEDE_POLICY inválido, usando off.")
+        supersede_policy = "off"
+
+    # LOG_FORMAT=json para producción
+    log_format = os.getenv("LOG_FORMAT", "text").strip().lower()
+    if log_format not in ("text", "json"):
+        logger.warning("LOG_FORMAT inválido, usando text.")
+        log_format = "text"
+
+    settings = AppConfig(
+        telegram_api_key=telegram_key,
+        google_gemini_api_key=gemini_key,
+        telegram_message_delay=telegram_delay,
+        rasa_rest_url=rasa_url,
+        disable_rasa=_parse_bool(os.getenv("DISABLE_RASA"), default=False),
+        log_message_max_length=max_length,
+        # Niveles de log: global y por logger (opcional)
+        log_level=_parse_log_level(os.getenv("LOG_LEVEL")),
+        log_levels=MappingProxyType(_parse_log_levels(os.getenv("LOG_LEVELS"))),
+        log_format=log_format,
+        # Entrega progresiva de respuestas largas en Telegram (opcional)
+        telegram_streaming=_parse_bool(os.getenv("TELEGRAM_STREAMING"), default=False),
+        telegram_stream_edit_interval=_parse_float("TELEGRAM_STREAM_EDIT_INTERVAL", 1.0),
+        telegram_format=telegram_format,
+        # Primera parte de la respuesta en el cuerpo del webhook, si se genera a tiempo
+        telegram_inline_reply=_parse_bool(os.getenv("TELEGRAM_INLINE_REPLY"), default=False),
+        telegram_inline_reply_budget=_parse_float("TELEGRAM_INLINE_REPLY_BUDGET", 5.0),
+        # Indicador «escribiendo…» mientras se genera la respuesta (opcional, 0 = apagado)
+        telegram_typing_interval=_parse_float("TELEGRAM_TYPING_INTERVAL", 4.0),
+        # Mensajes seguidos de un usuario de Telegram en un solo turno (opcional, 0 = apagado)
+        coalesce_window=_parse_float("COALESCE_WINDOW", 0.0),
+        coalesce_max_window=_parse_float("COALESCE_MAX_WINDOW", 3.0),
+        supersede_policy=supersede_policy,
+        # Cola durable de updates de Telegram para workers aparte (opcional, vacío = sin cola)
+        update_queue_path=os.getenv("UPDATE_QUEUE_PATH", "").strip(),
+        update_queue_lease=_parse_float("UPDATE_QUEUE_LEASE", 60.0, minimum=1.0),
+        update_queue_max_attempts=_parse_int("UPDATE_QUEUE_MAX_ATTEMPTS", 5),
+        update_queue_retention=_parse_float("UPDATE_QUEUE_RETENTION", 3600.0),
+        # Respuestas ya presentadas para Telegram que se guardan (opcional, 0 = sin cache)
+        presentation_cache_size=_parse_int("PRESENTATION_CACHE_SIZE", 256, minimum=0),
+        # Modelos Gemini (opcional). GEMINI_MODELS activa el ruteo entre varios modelos
+        gemini_model=os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash").strip(),
+        gemini_models=tuple(
+            MappingProxyType(route) for route in _parse_model_routes(os.getenv("GEMINI_MODELS"))
+        ),
+        gemini_latency_slo=_parse_float("GEMINI_LATENCY_SLO", 8.0),
+        # Cupos de Gemini por minuto (opcional, 0 = sin límite) y espera máxima en la cola
+        gemini_rpm=_parse_int("GEMINI_RPM", 0, minimum=0),
+        gemini_tpm=_parse_int("GEMINI_TPM", 0, minimum=0),
+        gemini_queue_max_wait=_parse_float("GEMINI_QUEUE_MAX_WAIT", 20.0),
+        # Pool dedicado para llamadas bloqueantes a Gemini (opcional)
+        gemini_executor_workers=_parse_int("GEMINI_EXECUTOR_WORKERS", 8),
+        gemini_executor_queue_size=_parse_int("GEMINI_EXECUTOR_QUEUE_SIZE", 32, minimum=0),
+        # Límite de concurrencia adaptativo (AIMD) para Rasa y Gemini (opcional)
+        adaptive_concurrency=_parse_bool(os.getenv("ADAPTIVE_CONCURRENCY"), default=False),
+        rasa_max_concurrency=_parse_int("RASA_MAX_CONCURRENCY", 32),
+        gemini_max_concurrency=_parse_int("GEMINI_MAX_CONCURRENCY", 16),
+        adaptive_concurrency_queue=_parse_int("ADAPTIVE_CONCURRENCY_QUEUE", 64, minimum=0),
+        # Degradación escalonada ante sobrecarga (opcional)
+        overload_control=_parse_bool(os.getenv("OVERLOAD_CONTROL"), default=False),
+        overload_queue_depth=_parse_int("OVERLOAD_QUEUE_DEPTH", 32),
+        overload_loop_lag=_parse_float("OVERLOAD_LOOP_LAG", 0.5, minimum=0.01),
+        overload_latency=_parse_float("OVERLOAD_LATENCY", 15.0, minimum=0.01),
+        overload_cooldown=_parse_float("OVERLOAD_COOLDOWN", 10.0),
+        overload_hold=_parse_float("OVERLOAD_HOLD", 3.0),
+        # Cupo de mensajes por chat/usuario y por IP (opcional, 0 = sin límite)
+        rate_limit_per_minute=_parse_int("RATE_LIMIT_PER_MINUTE", 0, minimum=0),
+        rate_limit_burst=_parse_int("RATE_LIMIT_BURST", 10),
+        rate_limit_ip_per_minute=_parse_int("RATE_LIMIT_IP_PER_MINUTE", 0, minimum=0),
+        rate_limit_store_path=os.getenv("RATE_LIMIT_STORE_PATH", "").strip(),
+        rate_limit_max_identities=_parse_int("RATE_LIMIT_MAX_IDENTITIES", 10_000),
+        # Recarga de .env en caliente (opcional, 0 = solo con SIGHUP)
+        config_reload_interval=_parse_float("CONFIG_RELOAD_INTERVAL", 5.0),
+        # Deadline del warm-up de arranque (opcional)
+        startup_warmup_timeout=_parse_float("STARTUP_WARMUP_TIMEOUT", 10.0),
+        # Servicios simulados para pruebas locales y de carga (opcional)
+        fake_upstreams=_parse_fake_upstreams(os.getenv("FAKE_UPSTREAMS")),
+        fake_rasa_latency=_parse_float("FAKE_RASA_LATENCY", 0.0),
+        fake_gemini_latency=_parse_float("FAKE_GEMINI_LATENCY", 0.3),
+        fake_gemini_tokens_per_second=_parse_float("FAKE_GEMINI_TOKENS_PER_SECOND", 0.0),
+        fake_gemini_error_rate=min(_parse_float("FAKE_GEMINI_ERROR_RATE", 0.0), 1.0),
+        fake_telegram_latency=_parse_float("FAKE_TELEGRAM_LATENCY", 0.0),
+        fake_telegram_rate_limit=_parse_float("FAKE_TELEGRAM_RATE_LIMIT", 0.0),
+        fake_seed=_parse_int("FAKE_SEED", 0, minimum=0),
+    )
 
     logger.debug(
         "Config cargada | TELEGRAM_KEY=%s | GEMINI_KEY=%s | RASA_URL=%s | "
         "DISABLE_RASA=%s | LOG_MESSAGE_MAX_LENGTH=%s",
-        bool(config["TELEGRAM_API_KEY"]),
-        bool(config["GOOGLE_GEMINI_API_KEY"]),
-        config["RASA_REST_URL"],
-        config["DISABLE_RASA"],
-        config["LOG_MESSAGE_MAX_LENGTH"],
+        bool(settings.telegram_api_key),
+        bool(settings.google_gemini_api_key),
+        settings.rasa_rest_url,
+        settings.disable_rasa,
+        settings.log_message_max_length,
     )
-    return config
+    return settings
+
+
+_FAKE_UPSTREAMS = ("rasa", "gemini", "telegram")
+
+
+def _parse_fake_upstreams(raw):
+    "Parsea FAKE_UPSTREAMS: servicios simulados separados por coma, o ``all``."
+    names = [name.strip().lower() for name in (raw or "").split(",") if name.strip()]
+    if "all" in names:
+        return _FAKE_UPSTREAMS
+    unknown = [name for name in names if name not in _FAKE_UPSTREAMS]
+    if unknown:
+        logger.warning("FAKE_UPSTREAMS: servicios desconocidos %s, ignorando.", unknown)
+    return tuple(name for name in _FAKE_UPSTREAMS if name in names)
+
+
+def get_config():
+    """
+    Load and validate configuration from environment variables.
+    Raises ValueError if a required variable is missing or invalid.
+    """
+    return _read_settings(require_keys=True).as_dict()
+
+
+_settings: AppConfig | None = None
+_settings_lock = threading.Lock()
+_subscribers: list = []
+
+
+def get_settings() -> AppConfig:
+    """
+    Snapshot de configuración construido una vez y cacheado.
+    No exige las claves de API: quien las necesite llama a ``require_api_keys()``.
+    """
+    global _settings
+    settings = _settings
+    if settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = _read_settings(require_keys=False)
+            settings = _settings
+    return settings
+
+
+def subscribe_settings(callback):
+    "Registra ``callback(snapshot)`` para cada recarga con cambios; devuelve el desuscriptor."
+    _subscribers.append(callback)
+
+    def unsubscribe():
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+    return unsubscribe
+
+
+def reload_settings(dotenv_path: str | None = None) -> AppConfig:
+    """
+    Vuelve a leer .env y el entorno y reemplaza el snapshot de forma atómica.
+    Notifica a los suscriptores solo si la configuración cambió.
+    """
+    global _settings
+    _apply_dotenv(dotenv_path or _DOTENV_PATH)
+    settings = _read_settings(require_keys=False)
+    with _settings_lock:
+        previous, _settings = _settings, settings
+    if previous != settings:
+        logger.info("Configuración recargada.")
+        for callback in list(_subscribers):
+            try:
+                callback(settings)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error notificando la recarga de configuración")
+    return settings
+
+
+def _apply_dotenv(path) -> None:
+    global _dotenv_keys
+    if not path:
+        return
+    values = {
+        key: value for key, value in dotenv_values(path).items() if key not in _PROCESS_ENV_KEYS
+    }
+    for key in _dotenv_keys - values.keys():
+        os.environ.pop(key, None)
+    for key, value in values.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    _dotenv_keys = set(values)
+
+
+def _dotenv_mtime(path) -> float | None:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class SettingsWatcher:
+    "Recarga la configuración ante SIGHUP o cuando cambia el mtime de .env."
+
+    def __init__(self, interval: float = 5.0, dotenv_path: str | None = None):
+        self.interval = interval
+        self.dotenv_path = dotenv_path if dotenv_path is not None else _DOTENV_PATH
+        self._mtime = _dotenv_mtime(self.dotenv_path) if self.dotenv_path else None
+        self._task: asyncio.Task | None = None
+        self._signal_installed = False
+
+    def start(self) -> None:
+        "Instala el handler de SIGHUP y el sondeo de .env en el event loop actual."
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reload_settings, self.dotenv_path)
+            self._signal_installed = True
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            logger.debug("SIGHUP no disponible; solo se sondea .env.")
+        if self.interval > 0 and self.dotenv_path:
+            self._task = loop.create_task(self._poll())
+
+    async def stop(self) -> None:
+        "Detiene el sondeo y quita el handler de SIGHUP."
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            self._signal_installed = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def check(self) -> bool:
+        "Recarga si .env cambió desde la última verificación; devuelve si recargó."
+        mtime = _dotenv_mtime(self.dotenv_path)
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        reload_settings(self.dotenv_path)
+        return True
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.check()
 
 
-__all__ = ["get_config", "DEFAULT_SYSTEM_INSTRUCTIONS_PATH"]
+__all__ = [
+    "AppConfig",
+    "DEFAULT_SYSTEM_INSTRUCTIONS_PATH",
+    "SettingsWatcher",
+    "get_config",
+    "get_settings",
+    "reload_settings",
+    "subscribe_settings",
+]
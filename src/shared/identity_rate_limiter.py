@@ -0,0 +1,59 @@
+"""
+Path: src/shared/identity_rate_limiter.py
+"""
+
+import time
+from collections import OrderedDict
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+from src.shared.token_bucket import TokenBucket
+
+
+class IdentityRateLimiter:
+    """Un token bucket por identidad (chat, usuario, IP), en memoria.
+
+    Cada identidad admite ráfagas de ``capacity`` mensajes y repone ``refill_rate`` por
+    segundo. Se guardan a lo sumo ``max_identities`` buckets: al superarlo se descarta el
+    usado hace más tiempo (esa identidad vuelve a empezar con el bucket lleno).
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        name: str,
+        capacity: float,
+        refill_rate: float,
+        max_identities: int = 10_000,
+        metrics: MetricsRegistry | None = None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_identities = max_identities
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, identity: str) -> bool:
+        "Consume un token de ``identity``; False si la identidad superó su cupo."
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            bucket = self._buckets[identity] = TokenBucket(
+                self.capacity, self.refill_rate, clock=self._clock
+            )
+            while len(self._buckets) > self.max_identities:
+                self._buckets.popitem(last=False)
+            self._metrics.set_gauge(f"rate_limit.{self.name}.identities", len(self._buckets))
+        else:
+            self._buckets.move_to_end(identity)
+        allowed = bucket.try_consume()
+        self._metrics.increment(f"rate_limit.{self.name}.{'allowed' if allowed else 'rejected'}")
+        return allowed
+
+    def close(self) -> None:
+        self._buckets.clear()
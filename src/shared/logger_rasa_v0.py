@@ -2,11 +2,30 @@
 Path: src/shared/logger_rasa_v0.py
 """
 
+import atexit
+import copy
+import json
 import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
 import coloredlogs
 
-from src.shared.config import get_config
+from src.shared.config import get_settings, subscribe_settings
+
+# Formato similar al de Rasa
+_FMT = "%(asctime)s %(levelname)-8s %(name)-24s - %(message)s"
+_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _truncate(message, max_length):
+    if max_length and max_length > 0 and isinstance(message, str) and len(message) > max_length:
+        ellipsis = "…"
+        cutoff = max(max_length - len(ellipsis), 1)
+        return f"{message[:cutoff].rstrip()}{ellipsis}"
+    return message
 
 
 class TruncatingColoredFormatter(coloredlogs.ColoredFormatter):
@@ -18,55 +37,135 @@ class TruncatingColoredFormatter(coloredlogs.ColoredFormatter):
 
     def format(self, record):
         original_msg, original_args = record.msg, record.args
-        if self.max_length and self.max_length > 0:
-            message = record.getMessage()
-            if isinstance(message, str) and len(message) > self.max_length:
-                ellipsis = "…"
-                cutoff = max(self.max_length - len(ellipsis), 1)
-                record.msg = f"{message[:cutoff].rstrip()}{ellipsis}"
-                record.args = ()
+        # El mensaje se interpola una sola vez; el formatter base solo lo copia
+        record.msg = _truncate(record.getMessage(), self.max_length)
+        record.args = ()
         try:
             return super().format(record)
         finally:
             record.msg, record.args = original_msg, original_args
 
 
-def get_logger(name="rasa-bot"):
-    "Configura y devuelve un logger con formato estilo Rasa usando coloredlogs."
-    config = get_config()
-    logger = logging.getLogger(name)
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, para agregadores de logs en producción."""
+
+    def __init__(self, max_length=None):
+        super().__init__()
+        self.max_length = max_length
+
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": _truncate(record.getMessage(), self.max_length),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler que no formatea en el thread que loguea.
+
+    Solo interpola el mensaje (los argumentos podrían mutar después); fecha, colores,
+    truncado y escritura ocurren en el thread del ``QueueListener``.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _LoggingPipeline:
+    "Cola compartida por todos los loggers y un único listener que escribe la salida."
+
+    def __init__(self):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler: logging.Handler | None = None
+        self.listener: QueueListener | None = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, max_length, log_format) -> None:
+        with self._lock:
+            if self.listener is None:
+                self.handler = coloredlogs.StandardErrorHandler()
+                self.listener = QueueListener(self.queue, self.handler)
+                self.listener.start()
+                atexit.register(self.stop)
+            self.handler.setFormatter(_build_formatter(max_length, log_format))
+
+    def stop(self) -> None:
+        "Vacía la cola y detiene el listener (se llama al salir del proceso)."
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+
+_PIPELINE = _LoggingPipeline()
+_CONFIGURED_LOGGERS: set[str] = set()
+
+
+def _build_formatter(max_length, log_format) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter(max_length=max_length)
+    return TruncatingColoredFormatter(
+        fmt=_FMT,
+        datefmt=_DATEFMT,
+        level_styles=coloredlogs.DEFAULT_LEVEL_STYLES,
+        field_styles=coloredlogs.DEFAULT_FIELD_STYLES,
+        max_length=max_length,
+    )
+
+
+def _max_length(config):
     raw_max_length = config.get("LOG_MESSAGE_MAX_LENGTH", 160)
     try:
         max_length = int(raw_max_length)
     except (TypeError, ValueError):
         max_length = 160
-    if max_length <= 0:
-        max_length = None
-    if not logger.handlers:
-        # Formato similar al de Rasa
-        fmt = "%(asctime)s %(levelname)-8s %(name)-24s - %(message)s"
-        datefmt = "%Y-%m-%d %H:%M:%S"
-        coloredlogs.install(
-            level="DEBUG",
-            logger=logger,
-            fmt=fmt,
-            datefmt=datefmt,
-            isatty=True,
-        )
-        formatter = TruncatingColoredFormatter(
-            fmt=fmt,
-            datefmt=datefmt,
-            level_styles=coloredlogs.DEFAULT_LEVEL_STYLES,
-            field_styles=coloredlogs.DEFAULT_FIELD_STYLES,
-            max_length=max_length,
-        )
-        for handler in logger.handlers:
-            handler.setFormatter(formatter)
+    return max_length if max_length > 0 else None
+
+
+def _resolve_level(name, config) -> int:
+    levels = config.get("LOG_LEVELS") or {}
+    level = logging.getLevelName(str(levels.get(name, config.get("LOG_LEVEL", "INFO"))).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def shutdown_logging() -> None:
+    "Escribe los registros pendientes y detiene el thread de logging."
+    _PIPELINE.stop()
+
+
+def get_logger(name="rasa-bot"):
+    """Devuelve un logger con formato estilo Rasa que escribe a través de una cola.
+
+    El nivel sale de LOG_LEVELS (por logger) o LOG_LEVEL; los registros de niveles
+    deshabilitados no se formatean. La salida (texto coloreado o JSON según LOG_FORMAT)
+    se escribe en un thread aparte para no bloquear el event loop.
+    """
+    config = get_settings()
+    logger = logging.getLogger(name)
+    _PIPELINE.ensure_started(_max_length(config), config.get("LOG_FORMAT", "text"))
+    if not any(isinstance(handler, _DeferredQueueHandler) for handler in logger.handlers):
+        logger.handlers.clear()
+        logger.addHandler(_DeferredQueueHandler(_PIPELINE.queue))
         logger.propagate = False
-    else:
-        for handler in logger.handlers:
-            formatter = getattr(handler, "formatter", None)
-            if isinstance(formatter, TruncatingColoredFormatter):
-                formatter.max_length = max_length
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(_resolve_level(name, config))
+    _CONFIGURED_LOGGERS.add(name)
     return logger
+
+
+def _apply_settings(config) -> None:
+    "Aplica niveles y formato recargados a los loggers ya creados."
+    if _PIPELINE.listener is not None:
+        _PIPELINE.ensure_started(_max_length(config), config.get("LOG_FORMAT", "text"))
+    for name in _CONFIGURED_LOGGERS:
+        logging.getLogger(name).setLevel(_resolve_level(name, config))
+
+
+subscribe_settings(_apply_settings)
@@ -0,0 +1,84 @@
+"""
+Path: src/shared/lru_cache.py
+"""
+
+import threading
+from collections import OrderedDict
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Cache acotado que descarta la entrada usada hace más tiempo.
+
+    Es thread-safe (se llena también desde el warm-up, en un thread aparte) y publica en
+    las métricas ``cache.<name>.hits``/``misses`` y el gauge ``cache.<name>.hit_ratio``.
+    Con ``maxsize=0`` no guarda nada.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, metrics: MetricsRegistry | None = None):
+        if maxsize < 0:
+            raise ValueError("maxsize no puede ser negativo")
+        self.name = name
+        self.maxsize = maxsize
+        self._metrics = metrics or get_metrics()
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_ratio(self) -> float:
+        "Aciertos sobre consultas totales (0 si todavía no hubo consultas)."
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, default=None):
+        "Valor guardado para ``key`` (y lo marca como recién usado) o ``default``."
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            ratio = self.hit_ratio
+        self._metrics.increment(f"cache.{self.name}.{'misses' if value is _MISSING else 'hits'}")
+        self._metrics.set_gauge(f"cache.{self.name}.hit_ratio", ratio)
+        return default if value is _MISSING else value
+
+    def put(self, key, value) -> None:
+        "Guarda ``value``; si se supera ``maxsize`` descarta la entrada menos reciente."
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        self._metrics.set_gauge(f"cache.{self.name}.size", size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._metrics.set_gauge(f"cache.{self.name}.size", 0)
+
+    def info(self) -> dict:
+        "Tamaño, aciertos, fallos y tasa de aciertos."
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hit_ratio,
+            }
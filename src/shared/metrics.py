@@ -0,0 +1,108 @@
+"""
+Path: src/shared/metrics.py
+"""
+
+import threading
+from collections import deque
+
+
+class MetricsRegistry:
+    """Registro en memoria de contadores, gauges y observaciones (latencias, esperas).
+
+    Es thread-safe para poder alimentarse tanto desde el event loop como desde pools de
+    threads. Las observaciones guardan agregados y una ventana de valores recientes para
+    calcular percentiles.
+    """
+
+    def __init__(self, window_size: int = 1024):
+        self._lock = threading.Lock()
+        self._window_size = window_size
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._observations: dict[str, dict] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        "Incrementa un contador."
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        "Fija el valor actual de un gauge."
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        "Registra una observación (por ejemplo, una latencia en segundos)."
+        with self._lock:
+            entry = self._observations.get(name)
+            if entry is None:
+                entry = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "max": value,
+                    "recent": deque(maxlen=self._window_size),
+                }
+                self._observations[name] = entry
+            entry["count"] += 1
+            entry["sum"] += value
+            entry["max"] = max(entry["max"], value)
+            entry["recent"].append(value)
+
+    def counter(self, name: str) -> float:
+        "Devuelve el valor actual de un contador (0 si no existe)."
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str, default: float | None = None) -> float | None:
+        "Devuelve el valor actual de un gauge."
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def percentile(self, name: str, quantile: float) -> float | None:
+        "Percentil (0-1) sobre la ventana de observaciones recientes."
+        with self._lock:
+            entry = self._observations.get(name)
+            values = sorted(entry["recent"]) if entry else []
+        return _percentile(values, quantile)
+
+    def snapshot(self) -> dict:
+        "Devuelve una copia serializable del estado actual de las métricas."
+        with self._lock:
+            observations = {}
+            for name, entry in self._observations.items():
+                values = sorted(entry["recent"])
+                observations[name] = {
+                    "count": entry["count"],
+                    "avg": entry["sum"] / entry["count"] if entry["count"] else 0.0,
+                    "max": entry["max"],
+                    "p50": _percentile(values, 0.50),
+                    "p95": _percentile(values, 0.95),
+                    "p99": _percentile(values, 0.99),
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": observations,
+            }
+
+    def reset(self) -> None:
+        "Descarta todas las métricas registradas."
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+def _percentile(sorted_values: list[float], quantile: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(int(quantile * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    "Devuelve el registro de métricas compartido por el proceso."
+    return _REGISTRY
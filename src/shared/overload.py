@@ -0,0 +1,157 @@
+"""
+Path: src/shared/overload.py
+"""
+
+import asyncio
+import time
+
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("overload-controller")
+
+# Escalones de degradación, de menor a mayor
+NORMAL = 0
+SHORT_HISTORY = 1  # prompts con menos historial
+CHEAPER_MODEL = 2  # el modelo Gemini más barato
+CANNED_ONLY = 3  # sin Gemini: respuestas de Rasa y fijas
+REJECT = 4  # rechazo inmediato con un mensaje amable
+LEVEL_NAMES = ("normal", "short_history", "cheaper_model", "canned_only", "reject")
+
+OVERLOAD_MESSAGE = (
+    "Estamos con mucha demanda en este momento. Por favor, volvé a escribirnos en unos minutos."
+)
+
+# Peso de cada muestra en el promedio móvil de la latencia de los servicios
+_LATENCY_WEIGHT = 0.2
+
+
+class OverloadController:
+    """Decide el escalón de degradación según la presión sobre el proceso.
+
+    Cada señal devuelve su valor actual y tiene un umbral; la presión es el máximo de
+    valor/umbral. Las señales propias son el lag del event loop (``max_loop_lag``) y la
+    latencia reciente de los servicios (``max_latency``, alimentada con
+    ``observe_latency``); se suman otras con ``add_signal`` (por ejemplo, colas).
+
+    Cada ``interval`` segundos se evalúa: con presión >= 1 sube un escalón; con presión
+    menor que ``recover_below`` durante ``cooldown`` segundos baja uno. Después de subir se
+    esperan ``hold`` segundos antes de volver a subir, y la latencia solo vuelve a contar
+    si llegaron muestras nuevas: una misma medición no recorre todos los escalones.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        cooldown: float = 10.0,
+        hold: float = 3.0,
+        recover_below: float = 0.5,
+        max_loop_lag: float = 0.5,
+        max_latency: float = 15.0,
+        metrics: MetricsRegistry | None = None,
+        clock=time.monotonic,
+    ):
+        self.interval = interval
+        self.cooldown = cooldown
+        self.hold = hold
+        self.recover_below = recover_below
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._signals: dict[str, tuple] = {}
+        self.level = NORMAL
+        self.pressure = 0.0
+        self.loop_lag = 0.0
+        self._latency = 0.0
+        self._latency_at: float | None = None
+        self._calm_since: float | None = None
+        self._raised_at: float | None = None
+        self._raised_latency_at: float | None = None
+        self._task: asyncio.Task | None = None
+        self.add_signal("loop_lag", lambda: self.loop_lag, max_loop_lag)
+        self.add_signal("latency", self._recent_latency, max_latency)
+        self._metrics.set_gauge("overload.level", NORMAL)
+
+    @property
+    def level_name(self) -> str:
+        return LEVEL_NAMES[self.level]
+
+    def add_signal(self, name: str, read, threshold: float) -> None:
+        "Agrega una señal: ``read()`` devuelve el valor actual; ``threshold`` > 0."
+        if threshold <= 0:
+            raise ValueError(f"Umbral inválido para la señal {name}")
+        self._signals[name] = (read, threshold)
+
+    def observe_latency(self, seconds: float) -> None:
+        "Registra la latencia de una llamada a Rasa o Gemini."
+        # Sin muestras recientes el promedio parte de cero: una sola llamada lenta no alcanza
+        previous = self._recent_latency()
+        self._latency = previous + _LATENCY_WEIGHT * (seconds - previous)
+        self._latency_at = self._clock()
+
+    def evaluate(self) -> int:
+        "Recalcula la presión y sube o baja a lo sumo un escalón; devuelve el escalón."
+        now = self._clock()
+        readings = {name: read() / threshold for name, (read, threshold) in self._signals.items()}
+        self.pressure = max(readings.values(), default=0.0)
+        self._metrics.set_gauge("overload.pressure", self.pressure)
+        if self.pressure >= 1:
+            self._calm_since = None
+            if self.level < REJECT and self._may_raise(now, readings):
+                cause = max(readings, key=readings.get)
+                self._raised_at = now
+                self._raised_latency_at = self._latency_at
+                self._set_level(self.level + 1, f"{cause}={self.pressure:.2f}")
+        elif self.pressure < self.recover_below and self.level > NORMAL:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.cooldown:
+                self._calm_since = now
+                self._set_level(self.level - 1, f"presión {self.pressure:.2f}")
+        else:
+            self._calm_since = None
+        return self.level
+
+    def start(self) -> None:
+        "Empieza a medir el lag del event loop y a evaluar cada ``interval`` segundos."
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._monitor())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self) -> None:
+        while True:
+            expected = self._clock() + self.interval
+            await asyncio.sleep(self.interval)
+            # Lo que el sleep se demoró de más es tiempo que el loop estuvo ocupado
+            self.loop_lag = max(0.0, self._clock() - expected)
+            self._metrics.set_gauge("overload.loop_lag", self.loop_lag)
+            self.evaluate()
+
+    def _may_raise(self, now: float, readings: dict) -> bool:
+        "Si se puede subir otro escalón: pasó ``hold`` y hay una señal nueva sobre su umbral."
+        if self._raised_at is not None and now - self._raised_at < self.hold:
+            return False
+        # La latencia sin muestras desde el último escalón ya se tuvo en cuenta
+        stale = "latency" if self._latency_at == self._raised_latency_at else None
+        return any(value >= 1 for name, value in readings.items() if name != stale)
+
+    def _recent_latency(self) -> float:
+        # Sin llamadas recientes (por ejemplo, con Gemini apagado) la latencia no cuenta
+        if self._latency_at is None or self._clock() - self._latency_at > self.cooldown:
+            return 0.0
+        return self._latency
+
+    def _set_level(self, level: int, reason: str) -> None:
+        previous = self.level
+        self.level = level
+        self._metrics.set_gauge("overload.level", level)
+        self._metrics.increment(f"overload.level.{LEVEL_NAMES[level]}")
+        log = logger.warning if level > previous else logger.info
+        log("Sobrecarga: %s -> %s (%s)", LEVEL_NAMES[previous], LEVEL_NAMES[level], reason)
@@ -0,0 +1,39 @@
+"""
+Path: src/shared/request_context.py
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    """Datos de la solicitud en curso que necesitan capas internas (router, scheduler).
+
+    Se propaga con ``contextvars``, por lo que llega a corrutinas y threads del executor
+    sin modificar las firmas de casos de uso y gateways.
+    """
+
+    channel: str | None = None
+    conversation_id: str | None = None
+
+
+_EMPTY_CONTEXT = RequestContext()
+_CURRENT: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> RequestContext:
+    "Devuelve el contexto de la solicitud en curso."
+    return _CURRENT.get() or _EMPTY_CONTEXT
+
+
+@contextmanager
+def request_context(**values):
+    "Establece campos del contexto durante el bloque y restaura el anterior al salir."
+    context = replace(get_request_context(), **values)
+    token = _CURRENT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT.reset(token)
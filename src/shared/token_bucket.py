@@ -0,0 +1,79 @@
+"""
+Path: src/shared/token_bucket.py
+"""
+
+import time
+
+
+class TokenBucket:
+    """Token bucket clásico: ``capacity`` tokens que se reponen a ``refill_rate`` por segundo.
+
+    ``consume`` admite dejar el balance en negativo para registrar consumos reales que
+    superaron lo estimado; esa deuda se paga con la reposición antes de volver a admitir.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, clock=time.monotonic):
+        if capacity <= 0 or refill_rate <= 0:
+            raise ValueError("capacity y refill_rate deben ser mayores que cero")
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    @classmethod
+    def per_minute(cls, amount: float, clock=time.monotonic) -> "TokenBucket":
+        "Bucket con capacidad ``amount`` que se repone completo en un minuto."
+        return cls(amount, amount / 60.0, clock=clock)
+
+    @classmethod
+    def restore(
+        cls, capacity: float, refill_rate: float, state: tuple[float, float], clock=time.monotonic
+    ) -> "TokenBucket":
+        "Reconstruye un bucket a partir de ``state`` (ver ``state``), por ejemplo desde disco."
+        bucket = cls(capacity, refill_rate, clock=clock)
+        bucket._tokens, bucket._updated = state
+        return bucket
+
+    @property
+    def state(self) -> tuple[float, float]:
+        "Tokens y momento de la última reposición, para guardar el bucket y restaurarlo."
+        self._refill()
+        return self._tokens, self._updated
+
+    @property
+    def tokens(self) -> float:
+        "Tokens disponibles en este momento."
+        self._refill()
+        return self._tokens
+
+    def try_consume(self, amount: float = 1) -> bool:
+        "Consume ``amount`` tokens si están disponibles; devuelve si pudo hacerlo."
+        self._refill()
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return True
+        return False
+
+    def consume(self, amount: float) -> None:
+        "Consume incondicionalmente (el balance puede quedar negativo)."
+        self._refill()
+        self._tokens -= amount
+
+    def time_until(self, amount: float = 1) -> float:
+        "Segundos hasta que haya ``amount`` tokens (0 si ya están disponibles)."
+        self._refill()
+        missing = min(amount, self.capacity) - self._tokens
+        return max(missing, 0.0) / self.refill_rate
+
+    def drain(self) -> None:
+        "Vacía el bucket (por ejemplo, al recibir un 429 del proveedor)."
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._updated = now
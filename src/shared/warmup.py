@@ -0,0 +1,92 @@
+"""
+Path: src/shared/warmup.py
+"""
+
+import asyncio
+import time
+
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("warmup")
+
+
+class WarmUp:
+    """Ejecuta en paralelo los pasos de warm-up con un deadline común.
+
+    Cada paso es una función sin argumentos que devuelve un awaitable. El warm-up se
+    considera completo cuando todos terminan o vence el deadline; los pasos que fallan o
+    no llegan a tiempo quedan registrados en ``status()`` pero no bloquean el arranque.
+    """
+
+    def __init__(self, steps: dict, timeout: float = 10.0, metrics: MetricsRegistry | None = None):
+        self.steps = dict(steps)
+        self.timeout = timeout
+        self._metrics = metrics or get_metrics()
+        self._results = {name: "pending" for name in self.steps}
+        self._task: asyncio.Task | None = None
+        self._done = asyncio.Event()
+        self._started: float | None = None
+        self._elapsed: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        "True cuando el warm-up terminó (o venció su deadline)."
+        return self._done.is_set()
+
+    def status(self) -> dict:
+        "Estado de cada paso y tiempo total, para el endpoint de readiness."
+        return {
+            "ready": self.ready,
+            "elapsed": self._elapsed,
+            "steps": dict(self._results),
+        }
+
+    def start(self) -> asyncio.Task:
+        "Lanza el warm-up en segundo plano."
+        if self._task is None:
+            self._started = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def wait(self) -> dict:
+        "Espera a que el warm-up termine y devuelve su estado."
+        await self._done.wait()
+        return self.status()
+
+    async def cancel(self) -> None:
+        "Cancela el warm-up en curso (al apagar la aplicación)."
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        tasks = {
+            asyncio.ensure_future(self._run_step(name, step)): name
+            for name, step in self.steps.items()
+        }
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=self.timeout)
+                for task in pending:
+                    self._results[tasks[task]] = "timeout"
+                    task.cancel()
+        finally:
+            self._elapsed = time.monotonic() - self._started
+            self._metrics.observe("startup.warmup_seconds", self._elapsed)
+            self._done.set()
+            logger.info("Warm-up completo en %.2fs: %s", self._elapsed, self._results)
+
+    async def _run_step(self, name: str, step) -> None:
+        started = time.monotonic()
+        try:
+            await step()
+        except Exception as exc:  # pylint: disable=broad-except
+            self._results[name] = f"error: {exc}"
+            logger.warning("Warm-up '%s' falló: %s", name, exc)
+            return
+        self._results[name] = "ok"
+        self._metrics.observe(f"startup.warmup.{name}_seconds", time.monotonic() - started)
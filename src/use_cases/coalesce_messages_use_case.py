@@ -0,0 +1,137 @@
+"""
+Path: src/use_cases/coalesce_messages_use_case.py
+"""
+
+import asyncio
+import time
+
+from src.entities.message import Message
+from src.shared.logger_rasa_v0 import get_logger
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+logger = get_logger("coalesce-messages-use-case")
+
+# Ventana adaptativa: múltiplo de la cadencia de escritura observada
+_CADENCE_FACTOR = 1.5
+# Peso de la última pausa en el promedio móvil de la cadencia
+_CADENCE_WEIGHT = 0.3
+
+
+class _Burst:
+    "Mensajes de una conversación que todavía esperan a que el usuario deje de escribir."
+
+    def __init__(self, message: Message, now: float):
+        self.messages = [message]
+        self.last_arrival = now
+
+
+class CoalesceMessagesUseCase:
+    """Agrupa los mensajes seguidos de una conversación en un único turno del agente.
+
+    El primer mensaje de una ráfaga espera hasta que pasan ``window`` segundos sin mensajes
+    nuevos y genera una sola respuesta para el texto unido; los que llegan mientras tanto se
+    suman a la ráfaga y ``execute`` devuelve None para ellos (no hay nada que enviar).
+
+    La ventana se adapta a la cadencia de cada conversación: 1,5 veces el promedio de las
+    pausas entre mensajes de una misma ráfaga, entre ``window / 2`` y ``max_window``. Con
+    ``window=0`` los mensajes pasan directo.
+    """
+
+    _MAX_TRACKED_CONVERSATIONS = 1024
+
+    def __init__(
+        self,
+        use_case,
+        window: float = 0.0,
+        max_window: float = 3.0,
+        metrics: MetricsRegistry | None = None,
+        clock=time.monotonic,
+    ):
+        self.use_case = use_case
+        self.window = window
+        self.max_window = max_window
+        self._metrics = metrics or get_metrics()
+        self._clock = clock
+        self._bursts: dict[str, _Burst] = {}
+        self._cadence: dict[str, float] = {}
+        self.messages = 0
+        self.turns = 0
+
+    async def execute(
+        self, conversation_id: str, user_message: Message, prompt: str = None
+    ) -> Message | None:
+        """Respuesta para la ráfaga que abre este mensaje, o None si se sumó a una en curso.
+
+        Los mensajes con ``prompt`` (audio transcripto) o multimedia no se agrupan."""
+        if self.window <= 0 or prompt is not None or user_message.is_media():
+            return await self.use_case.execute(conversation_id, user_message, prompt)
+        merged = await self._collect(str(conversation_id), user_message)
+        if merged is None:
+            return None
+        return await self.use_case.execute(conversation_id, merged)
+
+    def execute_stream(self, conversation_id: str, user_message: Message, prompt: str = None):
+        "Las respuestas progresivas no se agrupan: pasan directo al caso de uso."
+        return self.use_case.execute_stream(conversation_id, user_message, prompt)
+
+    def window_for(self, conversation_id: str) -> float:
+        "Ventana de espera actual de la conversación."
+        cadence = self._cadence.get(str(conversation_id))
+        if cadence is None:
+            return self.window
+        return min(self.max_window, max(self.window / 2, _CADENCE_FACTOR * cadence))
+
+    def stats(self) -> dict:
+        "Mensajes recibidos, turnos generados y llamadas al agente ahorradas."
+        return {
+            "messages": self.messages,
+            "turns": self.turns,
+            "reduction": 1 - self.turns / self.messages if self.messages else 0.0,
+        }
+
+    async def _collect(self, conversation_id: str, user_message: Message) -> Message | None:
+        now = self._clock()
+        self._record_message()
+        burst = self._bursts.get(conversation_id)
+        if burst is not None:
+            self._observe_pause(conversation_id, now - burst.last_arrival)
+            burst.messages.append(user_message)
+            burst.last_arrival = now
+            return None
+
+        burst = self._bursts[conversation_id] = _Burst(user_message, now)
+        try:
+            while True:
+                window = self.window_for(conversation_id)
+                remaining = burst.last_arrival + window - self._clock()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(remaining)
+        finally:
+            del self._bursts[conversation_id]
+        self._record_turn(window)
+        if len(burst.messages) > 1:
+            logger.debug(
+                "%d mensajes de %s agrupados en un turno", len(burst.messages), conversation_id
+            )
+        return Message(
+            to=user_message.to, body="\n".join(message.body for message in burst.messages)
+        )
+
+    def _observe_pause(self, conversation_id: str, pause: float) -> None:
+        previous = self._cadence.get(conversation_id)
+        self._cadence[conversation_id] = (
+            pause if previous is None else previous + _CADENCE_WEIGHT * (pause - previous)
+        )
+        if len(self._cadence) > self._MAX_TRACKED_CONVERSATIONS:
+            self._cadence.pop(next(iter(self._cadence)))
+
+    def _record_message(self) -> None:
+        self.messages += 1
+        self._metrics.increment("coalesce.messages")
+
+    def _record_turn(self, window: float) -> None:
+        self.turns += 1
+        self._metrics.increment("coalesce.turns")
+        self._metrics.observe("coalesce.window_seconds", window)
+        self._metrics.set_gauge("coalesce.reduction", self.stats()["reduction"])
@@ -17,26 +17,49 @@ class GenerateAgentResponseUseCase:
 
     async def execute(
         self, _conversation_id: str, user_message: Message, prompt: str = None
-    ) -> Message:
+    ) -> Message | None:
         """Genera una respuesta para el usuario.
 
-        El prompt puede ser texto transcripto si el mensaje es de audio. (async)
+        El prompt puede ser texto transcripto si el mensaje es de audio. Devuelve None si el
+        servicio descartó la respuesta porque un mensaje más nuevo la reemplazó. (async)
         """
         if prompt is not None:
             agent_bot_response = await self.agent_bot_service.get_response(prompt)
         else:
             agent_bot_response = await self.agent_bot_service.get_response(user_message.body)
+        if agent_bot_response is None:
+            return None
+        response_body = self._friendly_response(agent_bot_response)
+        response_message = Message(to=user_message.to, body=response_body)
+        return response_message
+
+    async def execute_stream(
+        self, _conversation_id: str, user_message: Message, prompt: str = None
+    ):
+        """Igual que execute, pero entrega la respuesta en fragmentos a medida que se genera.
+
+        Si el servicio no soporta streaming, entrega la respuesta completa de una vez. (async)
+        """
+        stream_response = getattr(self.agent_bot_service, "stream_response", None)
+        if stream_response is None:
+            response_message = await self.execute(_conversation_id, user_message, prompt)
+            # None: un mensaje más nuevo reemplazó a este y no hay nada que entregar
+            if response_message is not None and response_message.body:
+                yield response_message.body
+            return
+
+        text = prompt if prompt is not None else user_message.body
+        async for chunk in stream_response(text):
+            yield self._friendly_response(chunk)
+
+    @staticmethod
+    def _friendly_response(agent_bot_response):
         if (
             isinstance(agent_bot_response, str)
             and "Error al comunicarse con Rasa" in agent_bot_response
         ):
-            friendly_message = (
+            return (
                 "Lo sentimos, el servidor no está disponible en este momento. "
                 "Por favor, comuníquese con el área de mantenimiento."
             )
-            response_body = friendly_message
-        else:
-            response_body = agent_bot_response
-
-        response_message = Message(to=user_message.to, body=response_body)
-        return response_message
+        return agent_bot_response
@@ -0,0 +1,155 @@
+"""
+Tests for AdaptiveConcurrencyLimiter (src/shared/adaptive_limiter.py)
+"""
+
+import asyncio
+
+import pytest
+
+from src.shared.adaptive_limiter import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceededError
+from src.shared.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(**kwargs):
+    kwargs.setdefault("metrics", MetricsRegistry())
+    kwargs.setdefault("clock", FakeClock())
+    return AdaptiveConcurrencyLimiter("test", **kwargs)
+
+
+async def _call(limiter, latency):
+    async with limiter.slot():
+        limiter._clock.now += latency
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_latency_stays_low():
+    limiter = make_limiter(initial_limit=2, max_limit=4)
+    for _ in range(20):
+        await _call(limiter, 0.1)
+    # Con una llamada a la vez el límite no se aprovecha y no sube
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        async with limiter.slot():
+            await _call(limiter, 0.1)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_latency_spike_cuts_limit_once_per_episode():
+    metrics = MetricsRegistry()
+    limiter = make_limiter(initial_limit=10, metrics=metrics)
+    for _ in range(5):
+        await _call(limiter, 0.1)
+    release = asyncio.Event()
+
+    async def slow():
+        async with limiter.slot():
+            await release.wait()
+
+    calls = [asyncio.ensure_future(slow()) for _ in range(5)]
+    await asyncio.sleep(0)
+    limiter._clock.now += 2.0
+    release.set()
+    await asyncio.gather(*calls)
+    # Las cinco llamadas lentas estaban en curso juntas: un solo recorte
+    assert limiter.limit == 7
+    assert metrics.counter("limiter.test.decreases") == 1
+    assert metrics.gauge("limiter.test.limit") == 7
+
+    # Una llamada que empezó después del recorte y sigue lenta recorta de nuevo
+    await _call(limiter, 2.0)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_timeout_cuts_limit():
+    limiter = make_limiter(initial_limit=10)
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter.slot():
+            raise asyncio.TimeoutError
+    assert limiter.limit == 7
+    with pytest.raises(ValueError):
+        async with limiter.slot():
+            raise ValueError("no es congestión")
+    assert limiter.limit == 7
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_calls_over_the_limit_wait_their_turn():
+    metrics = MetricsRegistry()
+    limiter = AdaptiveConcurrencyLimiter("wait", initial_limit=1, max_queue=1, metrics=metrics)
+    release = asyncio.Event()
+    order = []
+
+    async def call(name):
+        async with limiter.slot():
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.ensure_future(call("first"))
+    second = asyncio.ensure_future(call("second"))
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 1
+    assert metrics.gauge("limiter.wait.queued") == 1
+    with pytest.raises(ConcurrencyLimitExceededError):
+        await call("third")
+    assert metrics.counter("limiter.wait.rejected") == 1
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdaptiveConcurrencyLimiter("cancel", initial_limit=1, metrics=MetricsRegistry())
+    release = asyncio.Event()
+
+    async def call():
+        async with limiter.slot():
+            await release.wait()
+
+    running = asyncio.ensure_future(call())
+    waiting = asyncio.ensure_future(call())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert limiter.queued == 0
+    release.set()
+    await running
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_cancelled_after_the_queue_was_drained():
+    limiter = AdaptiveConcurrencyLimiter("race", initial_limit=1, metrics=MetricsRegistry())
+    release = asyncio.Event()
+
+    async def call():
+        async with limiter.slot():
+            await release.wait()
+
+    running = asyncio.ensure_future(call())
+    waiting = asyncio.ensure_future(call())
+    await asyncio.sleep(0)
+    # La llamada en curso libera su lugar y saca de la cola al que ya estaba cancelado
+    release.set()
+    waiting.cancel()
+    await running
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
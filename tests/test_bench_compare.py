@@ -0,0 +1,46 @@
+"""
+Tests for the benchmark baseline comparison (bench_compare.py)
+"""
+
+from bench_compare import compare, summarize
+
+
+def _baseline(**medians):
+    return {"benchmarks": {name: {"median": value} for name, value in medians.items()}}
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = _baseline(a=1.0, b=1.0, c=1.0, gone=1.0)
+    current = _baseline(a=1.1, b=1.5, c=0.5, added=1.0)
+    rows, regressed = compare(baseline, current, tolerance=0.2)
+    statuses = {row[0]: row[4] for row in rows}
+    assert statuses == {
+        "a": "ok",
+        "b": "regression",
+        "c": "faster",
+        "gone": "missing",
+        "added": "new",
+    }
+    assert regressed is True
+    assert compare(baseline, _baseline(a=1.15), tolerance=0.2)[1] is False
+
+
+def test_summarize_keeps_only_compared_stats():
+    raw = {
+        "machine_info": {"python_version": "3.10.14", "cpu": {"brand_raw": "cpu"}},
+        "benchmarks": [
+            {
+                "fullname": "tests/test_benchmarks.py::test_x",
+                "stats": {"min": 1, "median": 2, "mean": 3, "stddev": 0, "rounds": 5, "data": []},
+            }
+        ],
+    }
+    summary = summarize(raw)
+    assert summary["machine"] == {"cpu": "cpu", "python": "3.10.14"}
+    assert summary["benchmarks"]["tests/test_benchmarks.py::test_x"] == {
+        "min": 1,
+        "median": 2,
+        "mean": 3,
+        "stddev": 0,
+        "rounds": 5,
+    }
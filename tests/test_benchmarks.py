@@ -3,10 +3,45 @@ tests/test_benchmarks.py
 """
 
 import asyncio
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
 
 import pytest
+from fastapi.testclient import TestClient
 
+from src.entities.message import Message
+from src.infrastructure.fastapi.fastapi_webhook import create_app
+from src.infrastructure.load_testing.scenario import synthetic_request
+from src.interface_adapter.controller.telegram_controller import TelegramMessageController
 from src.interface_adapter.gateways.agent_gateway import AgentGateway
+from src.interface_adapter.presenters.markdown_converter import MarkdownConverter
+from src.interface_adapter.presenters.markdown_validator import MarkdownValidator
+from src.interface_adapter.presenters.message_splitter import MessageSplitter, utf16_len
+from src.interface_adapter.presenters.telegram_presenter import TelegramMessagePresenter
+from src.shared.config import get_config
+from src.shared.logger_rasa_v0 import get_logger
+from src.use_cases.generate_agent_response_use_case import GenerateAgentResponseUseCase
+
+# Tamaños de respuesta de Gemini representativos: corta, larga y la más larga observada
+REPLY_SIZES = [4_000, 16_000, 40_000]
+_REPLY_PARAGRAPH = (
+    "## Bolsas de papel para tu negocio\n"
+    "Fabricamos **bolsas kraft y blancas** en medidas estándar (20x10x28 cm, 30x12x40 cm) "
+    "y a medida. El gramaje *recomendado* para delivery es de 80-100 g/m².\n"
+    "* Impresión a 1 o 2 colores, con tu logo.\n"
+    "* Manijas planas o retorcidas (precio + IVA).\n"
+    "1. Pedido mínimo: 1.000 unidades.\n"
+    "Más info en [nuestro sitio](https://madypack.com.ar) o escribinos: ¡respondemos rápido!\n\n"
+)
+
+
+def long_reply(size: int) -> str:
+    "Respuesta Markdown realista (encabezados, listas, negritas, enlaces) de ``size`` chars."
+    text = _REPLY_PARAGRAPH * (size // len(_REPLY_PARAGRAPH) + 1)
+    return text[:size].rsplit("\n", 1)[0]
 
 
 @pytest.mark.benchmark
@@ -19,3 +54,263 @@ def test_agent_gateway_local_response_benchmark(benchmark):
 
     result = benchmark(run)
     assert "Hola" in result
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "log_level", [logging.DEBUG, logging.CRITICAL], ids=["logs-on", "logs-off"]
+)
+def test_request_throughput_with_logging(benchmark, log_level):
+    "Throughput of a local request (gateway + use case + presenter) with logging on and off."
+    loggers = [
+        get_logger(name)
+        for name in ("agent-gateway", "generate-agent-response-use-case", "telegram-presenter")
+    ]
+    previous = [log.level for log in loggers]
+    for log in loggers:
+        log.setLevel(log_level)
+    use_case = GenerateAgentResponseUseCase(AgentGateway(http_client=None, remote_available=False))
+    presenter = TelegramMessagePresenter()
+    message = Message(to="bench", body="hola, necesito información del curso")
+
+    def run():
+        response = asyncio.run(use_case.execute("bench", message))
+        return presenter.present(response)
+
+    try:
+        result = benchmark(run)
+    finally:
+        for log, level in zip(loggers, previous, strict=True):
+            log.setLevel(level)
+    assert result
+
+
+_ROOT = Path(__file__).resolve().parent.parent
+# Arranque en frío: importar la app, ejecutar el lifespan y obtener el primer 200 en /test
+_COLD_START_SCRIPT = """
+import time
+started = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/test").status_code == 200
+print(time.perf_counter() - started)
+"""
+
+
+def _startup_env():
+    env = dict(os.environ)
+    env.setdefault("TELEGRAM_API_KEY", "1234567890abc")
+    env.setdefault("GOOGLE_GEMINI_API_KEY", "1234567890abc")
+    env["CONFIG_RELOAD_INTERVAL"] = "0"
+    return env
+
+
+def _import_breakdown(top=10):
+    "Módulos con mayor tiempo acumulado de import (``python -X importtime``), en ms."
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=_ROOT,
+        env=_startup_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            modules[name.strip()] = int(cumulative) / 1000
+        except ValueError:
+            continue  # cabecera
+    return dict(sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]), modules
+
+
+@pytest.mark.benchmark
+def test_startup_import_breakdown(benchmark):
+    "Import time of the web entry point; heavy SDKs must not load at import."
+    breakdown, modules = benchmark.pedantic(_import_breakdown, rounds=1, iterations=1)
+    benchmark.extra_info["import_ms_top"] = breakdown
+    assert "google.generativeai" not in modules
+    assert "main" in modules
+
+
+@pytest.mark.benchmark
+def test_startup_time_to_first_200(benchmark):
+    "Cold start: import, lifespan and first 200 on /test in a fresh interpreter."
+
+    def cold_start():
+        result = subprocess.run(
+            [sys.executable, "-c", _COLD_START_SCRIPT],
+            cwd=_ROOT,
+            env=_startup_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return float(result.stdout.strip().splitlines()[-1])
+
+    seconds = benchmark.pedantic(cold_start, rounds=3, iterations=1)
+    benchmark.extra_info["time_to_first_200_s"] = seconds
+    assert seconds > 0
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_markdown_converter_benchmark(benchmark, size):
+    "MarkdownConverter.convert on long Gemini replies."
+    text = long_reply(size)
+    result = benchmark(MarkdownConverter().convert, text)
+    assert len(result) >= len(text) * 0.9
+
+
+@pytest.mark.benchmark(group="presenter-worst-case")
+@pytest.mark.parametrize("size", [40_000, 400_000])
+@pytest.mark.parametrize(
+    "unit", ["*a ", "a`", "[x", "**b *"], ids=["stars", "ticks", "links", "mixed"]
+)
+def test_markdown_converter_unmatched_delimiters_benchmark(benchmark, unit, size):
+    "Worst case for the converter: thousands of delimiters that never close (linear time)."
+    text = (unit * (size // len(unit) + 1))[:size]
+    result = benchmark(MarkdownConverter().convert, text)
+    assert len(result) >= size
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_markdown_validator_benchmark(benchmark, size):
+    "MarkdownValidator.validate on converted replies (balanced or not, both paths count)."
+    text = MarkdownConverter().convert(long_reply(size))
+
+    def run():
+        try:
+            MarkdownValidator().validate(text)
+        except ValueError:
+            return False
+        return True
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_message_splitter_benchmark(benchmark, size):
+    "MessageSplitter.split into Telegram-sized parts."
+    text = MarkdownConverter().convert(long_reply(size))
+    parts = benchmark(MessageSplitter().split, text, 4096)
+    assert all(utf16_len(part) <= 4096 for part in parts)
+    assert len(parts) <= len(text) // 4096 + 2
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_telegram_presenter_benchmark(benchmark, size):
+    "TelegramMessagePresenter.present end to end (convert and split)."
+    message = Message(to="bench", body=long_reply(size))
+    parts = benchmark(TelegramMessagePresenter(cache_size=0).present, message)
+    assert len(parts) >= size // 4096
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_telegram_presenter_cached_benchmark(benchmark, size):
+    "TelegramMessagePresenter.present for a response already in the presentation cache."
+    message = Message(to="bench", body=long_reply(size))
+    presenter = TelegramMessagePresenter()
+    presenter.prime([message.body])
+    parts = benchmark(presenter.present, message)
+    assert parts == TelegramMessagePresenter(cache_size=0).present(message)
+    assert presenter.cache.hit_ratio == 1.0
+
+
+@pytest.mark.benchmark(group="presenter")
+@pytest.mark.parametrize("size", REPLY_SIZES)
+def test_telegram_presenter_entities_benchmark(benchmark, size):
+    "TelegramMessagePresenter.present in entities mode (plain text + UTF-16 entities)."
+    message = Message(to="bench", body=long_reply(size))
+    parts = benchmark(TelegramMessagePresenter(mode="entities", cache_size=0).present, message)
+    markdown_parts = TelegramMessagePresenter(cache_size=0).present(message)
+    assert sum(len(part["text"]) for part in parts) < sum(
+        len(part["text"]) for part in markdown_parts
+    )
+
+
+@pytest.mark.benchmark(group="controller")
+@pytest.mark.parametrize("entity_count", [10, 200])
+def test_apply_markdown_formatting_benchmark(benchmark, entity_count):
+    "Inbound Telegram entities converted to Markdown."
+    words = [f"palabra{index}" for index in range(entity_count * 2)]
+    text = " ".join(words)
+    entities, offset = [], 0
+    for index, word in enumerate(words):
+        if index % 2 == 0:
+            kind = "bold" if index % 4 == 0 else "italic"
+            entities.append({"offset": offset, "length": len(word), "type": kind})
+        offset += len(word) + 1
+    controller = TelegramMessageController(use_case=None, presenter=None)
+    result = benchmark(controller._apply_markdown_formatting, text, entities)
+    assert result.count("**") == entity_count  # la mitad de las entidades son negritas
+
+
+@pytest.mark.benchmark(group="controller")
+@pytest.mark.parametrize("entity_count", [150, 600])
+def test_apply_markdown_formatting_nested_benchmark(benchmark, entity_count):
+    "Messages with hundreds of nested entities, links and emoji (UTF-16 offsets)."
+    word = "😀 palabra"  # 10 unidades UTF-16
+    text = " ".join([word] * entity_count)
+    entities = []
+    for index in range(0, entity_count, 3):
+        offset = index * 11
+        entities.append({"offset": offset, "length": 32, "type": "bold"})
+        entities.append({"offset": offset + 3, "length": 7, "type": "italic"})
+        entities.append({"offset": offset + 14, "length": 7, "type": "text_link", "url": "u"})
+    controller = TelegramMessageController(use_case=None, presenter=None)
+    result = benchmark(controller._apply_markdown_formatting, text, entities)
+    assert result.count("](u)") == len(range(0, entity_count, 3))
+    assert result.count("😀") == entity_count
+
+
+@pytest.mark.benchmark(group="gateway")
+@pytest.mark.parametrize("conversations", [100, 10_000])
+def test_history_store_and_prompt_benchmark(benchmark, conversations):
+    "_store_turn and _build_prompt with many live conversations and full histories."
+    gateway = AgentGateway(http_client=None, remote_available=False)
+    for conversation in range(conversations):
+        for turn in range(20):
+            gateway._store_turn(str(conversation), "user" if turn % 2 else "bot", "texto " * 20)
+    counter = iter(range(10**9))
+
+    def run():
+        conversation_id = str(next(counter) % conversations)
+        gateway._store_turn(conversation_id, "user", "¿Tienen bolsas con manija?")
+        prompt = gateway._build_prompt(conversation_id, "¿Tienen bolsas con manija?")
+        gateway._store_turn(conversation_id, "bot", "Sí, planas y retorcidas.")
+        return prompt
+
+    prompt = benchmark(run)
+    assert prompt.endswith("Gemini:")
+
+
+@pytest.fixture
+def fake_upstreams_app(monkeypatch):
+    "App completa contra Rasa, Gemini y Telegram simulados, sin latencia."
+    monkeypatch.setenv("FAKE_UPSTREAMS", "all")
+    monkeypatch.setenv("FAKE_GEMINI_LATENCY", "0")
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "0")
+    with TestClient(create_app(get_config())) as client:
+        yield client
+
+
+@pytest.mark.benchmark(group="webhook")
+@pytest.mark.parametrize("channel", ["telegram", "webchat"])
+@pytest.mark.parametrize(
+    "text", ["hola", "¿Hacen bolsas con logo impreso?"], ids=["rasa", "gemini"]
+)
+def test_webhook_round_trip_benchmark(benchmark, fake_upstreams_app, channel, text):
+    "Webhook request to response against the local fakes (Rasa reply or Gemini fallback)."
+    request = synthetic_request(channel, 1, text)
+
+    response = benchmark(fake_upstreams_app.post, request.endpoint, json=request.payload)
+    assert response.status_code == 200
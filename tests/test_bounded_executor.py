@@ -0,0 +1,71 @@
+"""
+Tests for BoundedExecutor (src/shared/bounded_executor.py)
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.shared.bounded_executor import BoundedExecutor, ExecutorQueueFullError
+from src.shared.metrics import MetricsRegistry
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_runs_blocking_call():
+    metrics = MetricsRegistry()
+    executor = BoundedExecutor("test", max_workers=2, max_queue=2, metrics=metrics)
+    try:
+        result = await executor.run(lambda a, b: a + b, 2, 3)
+    finally:
+        executor.shutdown()
+    assert result == 5
+    assert metrics.counter("executor.test.submitted") == 1
+    assert metrics.snapshot()["observations"]["executor.test.wait_seconds"]["count"] == 1
+    assert executor.queued == 0
+    assert executor.active == 0
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_rejects_when_queue_full():
+    metrics = MetricsRegistry()
+    executor = BoundedExecutor("full", max_workers=1, max_queue=1, metrics=metrics)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        assert executor.active == 1
+        assert executor.queued == 1
+        with pytest.raises(ExecutorQueueFullError):
+            await executor.run(lambda: "rejected")
+        assert metrics.counter("executor.full.rejected") == 1
+        release.set()
+        assert await running is True
+        assert await queued == "queued"
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_propagates_exceptions():
+    executor = BoundedExecutor("errors", max_workers=1, max_queue=0, metrics=MetricsRegistry())
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(fail)
+        # El slot se libera aunque la tarea falle
+        assert await executor.run(lambda: "ok") == "ok"
+    finally:
+        executor.shutdown()
+
+
+def test_bounded_executor_invalid_sizes():
+    with pytest.raises(ValueError):
+        BoundedExecutor("bad", max_workers=0)
+    with pytest.raises(ValueError):
+        BoundedExecutor("bad", max_queue=-1)
@@ -1,8 +1,16 @@
+import dataclasses
 import os
 
 import pytest
 
-from src.shared.config import get_config
+from src.shared import config as config_module
+from src.shared.config import (
+    SettingsWatcher,
+    get_config,
+    get_settings,
+    reload_settings,
+    subscribe_settings,
+)
 
 
 def set_env_vars(env_dict):
@@ -83,3 +91,246 @@ def test_invalid_log_message_max_length(monkeypatch):
     monkeypatch.setenv("LOG_MESSAGE_MAX_LENGTH", "-5")
     config = get_config()
     assert config["LOG_MESSAGE_MAX_LENGTH"] == 160
+
+
+def test_log_levels_and_format(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    monkeypatch.setenv("LOG_LEVEL", "warning")
+    monkeypatch.setenv("LOG_LEVELS", "gemini-service=debug, agent-gateway=nope, =INFO")
+    monkeypatch.setenv("LOG_FORMAT", "xml")
+    config = get_config()
+    assert config["LOG_LEVEL"] == "WARNING"
+    assert config["LOG_LEVELS"] == {"gemini-service": "DEBUG", "agent-gateway": "INFO"}
+    assert config["LOG_FORMAT"] == "text"
+
+
+def test_telegram_format(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    assert get_config()["TELEGRAM_FORMAT"] == "markdown_v2"
+    monkeypatch.setenv("TELEGRAM_FORMAT", "Entities")
+    assert get_config()["TELEGRAM_FORMAT"] == "entities"
+    monkeypatch.setenv("TELEGRAM_FORMAT", "html")
+    assert get_config()["TELEGRAM_FORMAT"] == "markdown_v2"
+
+
+def test_presentation_cache_size(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    assert get_config()["PRESENTATION_CACHE_SIZE"] == 256
+    monkeypatch.setenv("PRESENTATION_CACHE_SIZE", "0")
+    assert get_config()["PRESENTATION_CACHE_SIZE"] == 0
+    monkeypatch.setenv("PRESENTATION_CACHE_SIZE", "-5")
+    assert get_config()["PRESENTATION_CACHE_SIZE"] == 256
+
+
+def test_telegram_inline_reply(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert config["TELEGRAM_INLINE_REPLY"] is False
+    assert config["TELEGRAM_INLINE_REPLY_BUDGET"] == 5.0
+    monkeypatch.setenv("TELEGRAM_INLINE_REPLY", "true")
+    monkeypatch.setenv("TELEGRAM_INLINE_REPLY_BUDGET", "2.5")
+    config = get_config()
+    assert config["TELEGRAM_INLINE_REPLY"] is True
+    assert config["TELEGRAM_INLINE_REPLY_BUDGET"] == 2.5
+
+
+def test_telegram_typing_interval(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    assert get_config()["TELEGRAM_TYPING_INTERVAL"] == 4.0
+    monkeypatch.setenv("TELEGRAM_TYPING_INTERVAL", "0")
+    assert get_config()["TELEGRAM_TYPING_INTERVAL"] == 0.0
+    monkeypatch.setenv("TELEGRAM_TYPING_INTERVAL", "-1")
+    assert get_config()["TELEGRAM_TYPING_INTERVAL"] == 4.0
+
+
+def test_coalesce_window(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert (config["COALESCE_WINDOW"], config["COALESCE_MAX_WINDOW"]) == (0.0, 3.0)
+    monkeypatch.setenv("COALESCE_WINDOW", "1.5")
+    monkeypatch.setenv("COALESCE_MAX_WINDOW", "x")
+    config = get_config()
+    assert (config["COALESCE_WINDOW"], config["COALESCE_MAX_WINDOW"]) == (1.5, 3.0)
+
+
+def test_supersede_policy(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    assert get_config()["SUPERSEDE_POLICY"] == "off"
+    monkeypatch.setenv("SUPERSEDE_POLICY", "Cancel")
+    assert get_config()["SUPERSEDE_POLICY"] == "cancel"
+    monkeypatch.setenv("SUPERSEDE_POLICY", "later")
+    assert get_config()["SUPERSEDE_POLICY"] == "off"
+
+
+def test_update_queue_settings(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert config["UPDATE_QUEUE_PATH"] == ""
+    assert config["UPDATE_QUEUE_LEASE"] == 60.0
+    assert config["UPDATE_QUEUE_MAX_ATTEMPTS"] == 5
+    assert config["UPDATE_QUEUE_RETENTION"] == 3600.0
+    monkeypatch.setenv("UPDATE_QUEUE_PATH", " data/updates.db ")
+    monkeypatch.setenv("UPDATE_QUEUE_RETENTION", "0")
+    monkeypatch.setenv("UPDATE_QUEUE_LEASE", "0.5")
+    monkeypatch.setenv("UPDATE_QUEUE_MAX_ATTEMPTS", "3")
+    config = get_config()
+    assert config["UPDATE_QUEUE_PATH"] == "data/updates.db"
+    assert config["UPDATE_QUEUE_LEASE"] == 60.0
+    assert config["UPDATE_QUEUE_MAX_ATTEMPTS"] == 3
+    assert config["UPDATE_QUEUE_RETENTION"] == 0.0
+
+
+def test_gemini_models_routes(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    monkeypatch.setenv(
+        "GEMINI_MODELS",
+        "models/gemini-2.5-flash-lite:400:telegram|webchat, models/gemini-2.5-flash:32000,bad:x",
+    )
+    config = get_config()
+    assert config["GEMINI_MODELS"] == [
+        {
+            "name": "models/gemini-2.5-flash-lite",
+            "max_prompt_tokens": 400,
+            "channels": ("telegram", "webchat"),
+        },
+        {"name": "models/gemini-2.5-flash", "max_prompt_tokens": 32000, "channels": ()},
+    ]
+
+
+@pytest.fixture
+def isolated_settings():
+    "Restaura el snapshot cacheado al terminar el test."
+    previous = config_module._settings
+    config_module._settings = None
+    yield
+    config_module._settings = previous
+
+
+def test_get_settings_is_cached_and_does_not_require_keys(monkeypatch, isolated_settings):
+    monkeypatch.delenv("TELEGRAM_API_KEY", raising=False)
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "2")
+    settings = get_settings()
+    assert settings is get_settings()
+    assert settings.telegram_api_key is None
+    assert settings.get("TELEGRAM_MESSAGE_DELAY") == 2.0
+    assert settings["GOOGLE_GEMINI_API_KEY"] == "abcdef1234567890"
+    assert settings.get("NO_EXISTE", "x") == "x"
+    with pytest.raises(ValueError):
+        settings.require_api_keys()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.telegram_message_delay = 1
+
+
+def test_app_config_as_dict_matches_get_config(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    monkeypatch.setenv("GEMINI_MODELS", "models/gemini-2.5-flash:32000")
+    assert config_module._read_settings().as_dict() == get_config()
+
+
+def test_reload_settings_notifies_subscribers_on_change(monkeypatch, isolated_settings):
+    monkeypatch.setenv("DISABLE_RASA", "false")
+    get_settings()
+    received = []
+    unsubscribe = subscribe_settings(received.append)
+    try:
+        reload_settings()
+        assert received == []
+        monkeypatch.setenv("DISABLE_RASA", "true")
+        settings = reload_settings()
+        assert received == [settings]
+        assert get_settings().disable_rasa is True
+    finally:
+        unsubscribe()
+
+
+def test_settings_watcher_reloads_when_dotenv_changes(monkeypatch, tmp_path, isolated_settings):
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "0.5")
+    dotenv_file = tmp_path / ".env"
+    dotenv_file.write_text("TELEGRAM_MESSAGE_DELAY=0.5\n")
+    watcher = SettingsWatcher(interval=0, dotenv_path=str(dotenv_file))
+    assert watcher.check() is False
+    dotenv_file.write_text("TELEGRAM_MESSAGE_DELAY=3\n")
+    os.utime(dotenv_file, (1, 1))
+    assert watcher.check() is True
+    assert get_settings().telegram_message_delay == 3.0
+
+
+def test_reload_settings_drops_keys_removed_from_dotenv(monkeypatch, tmp_path, isolated_settings):
+    monkeypatch.setattr(config_module, "_dotenv_keys", set())
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "0.5")
+    monkeypatch.setenv("COALESCE_WINDOW", "0")
+    monkeypatch.setattr(config_module, "_PROCESS_ENV_KEYS", frozenset({"COALESCE_WINDOW"}))
+    dotenv_file = tmp_path / ".env"
+    dotenv_file.write_text("TELEGRAM_MESSAGE_DELAY=3\nCOALESCE_WINDOW=2\n")
+    assert reload_settings(str(dotenv_file)).telegram_message_delay == 3.0
+    dotenv_file.write_text("")
+    settings = reload_settings(str(dotenv_file))
+    assert "TELEGRAM_MESSAGE_DELAY" not in os.environ
+    assert settings.telegram_message_delay == 0.5
+    # Las variables del proceso no se tocan aunque no estén en .env
+    assert os.environ["COALESCE_WINDOW"] == "0"
+
+
+def test_adaptive_concurrency_settings(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert config["ADAPTIVE_CONCURRENCY"] is False
+    assert config["RASA_MAX_CONCURRENCY"] == 32
+    assert config["GEMINI_MAX_CONCURRENCY"] == 16
+    assert config["ADAPTIVE_CONCURRENCY_QUEUE"] == 64
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY", "true")
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "0")
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_QUEUE", "0")
+    config = get_config()
+    assert config["ADAPTIVE_CONCURRENCY"] is True
+    assert config["GEMINI_MAX_CONCURRENCY"] == 16
+    assert config["ADAPTIVE_CONCURRENCY_QUEUE"] == 0
+
+
+def test_overload_settings(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert config["OVERLOAD_CONTROL"] is False
+    assert config["OVERLOAD_QUEUE_DEPTH"] == 32
+    assert config["OVERLOAD_LOOP_LAG"] == 0.5
+    assert config["OVERLOAD_LATENCY"] == 15.0
+    assert config["OVERLOAD_COOLDOWN"] == 10.0
+    assert config["OVERLOAD_HOLD"] == 3.0
+    monkeypatch.setenv("OVERLOAD_CONTROL", "1")
+    monkeypatch.setenv("OVERLOAD_LOOP_LAG", "0")
+    monkeypatch.setenv("OVERLOAD_QUEUE_DEPTH", "8")
+    config = get_config()
+    assert config["OVERLOAD_CONTROL"] is True
+    assert config["OVERLOAD_LOOP_LAG"] == 0.5
+    assert config["OVERLOAD_QUEUE_DEPTH"] == 8
+
+
+def test_rate_limit_settings(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_KEY", "1234567890abcdef")
+    monkeypatch.setenv("GOOGLE_GEMINI_API_KEY", "abcdef1234567890")
+    config = get_config()
+    assert config["RATE_LIMIT_PER_MINUTE"] == 0
+    assert config["RATE_LIMIT_BURST"] == 10
+    assert config["RATE_LIMIT_IP_PER_MINUTE"] == 0
+    assert config["RATE_LIMIT_STORE_PATH"] == ""
+    assert config["RATE_LIMIT_MAX_IDENTITIES"] == 10_000
+    monkeypatch.setenv("RATE_LIMIT_PER_MINUTE", "20")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "0")
+    monkeypatch.setenv("RATE_LIMIT_STORE_PATH", "data/rate_limit.db")
+    config = get_config()
+    assert config["RATE_LIMIT_PER_MINUTE"] == 20
+    assert config["RATE_LIMIT_BURST"] == 10
+    assert config["RATE_LIMIT_STORE_PATH"] == "data/rate_limit.db"
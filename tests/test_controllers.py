@@ -111,3 +111,87 @@ async def test_telegram_message_controller_handle_unknown_entity_type():
     result = await controller.handle(chat_id, user_message, entities=entities)
     assert result[0] == chat_id
     assert "Echo: hola mundo" in result[1]
+
+
+def test_apply_markdown_formatting_uses_utf16_offsets():
+    controller = TelegramMessageController(use_case=None, presenter=None)
+    # "😀" ocupa dos unidades UTF-16: "hola" empieza en el offset 3
+    entities = [{"offset": 3, "length": 4, "type": "bold"}]
+    assert controller._apply_markdown_formatting("😀 hola mundo", entities) == "😀 **hola** mundo"
+
+
+def test_apply_markdown_formatting_nested_and_overlapping_entities():
+    controller = TelegramMessageController(use_case=None, presenter=None)
+    nested = [
+        {"offset": 0, "length": 8, "type": "bold"},
+        {"offset": 4, "length": 4, "type": "text_link", "url": "https://madypack.com.ar"},
+        {"offset": 4, "length": 4, "type": "strikethrough"},
+    ]
+    assert (
+        controller._apply_markdown_formatting("ver aqui", nested)
+        == "**ver [~~aqui~~](https://madypack.com.ar)**"
+    )
+    overlapping = [
+        {"offset": 0, "length": 4, "type": "bold"},
+        {"offset": 2, "length": 4, "type": "italic"},
+    ]
+    assert controller._apply_markdown_formatting("abcdef", overlapping) == "**ab*cd****ef*"
+
+
+def test_apply_markdown_formatting_all_entity_types():
+    controller = TelegramMessageController(use_case=None, presenter=None)
+    text = "@ana mirá a`b y x=1 secreto nota\nfin"
+    entities = [
+        {"offset": 0, "length": 4, "type": "mention"},
+        {"offset": 5, "length": 4, "type": "text_mention", "user": {"id": 7}},
+        {"offset": 10, "length": 3, "type": "code"},
+        {"offset": 16, "length": 3, "type": "pre", "language": "python"},
+        {"offset": 17, "length": 1, "type": "bold"},  # sin formato dentro de código
+        {"offset": 20, "length": 7, "type": "spoiler"},
+        {"offset": 28, "length": 4, "type": "underline"},
+        {"offset": 28, "length": 8, "type": "blockquote"},
+    ]
+    assert controller._apply_markdown_formatting(text, entities) == (
+        "@ana [mirá](tg://user?id=7) ``a`b`` y ```python\nx=1\n``` ||secreto|| > __nota__\n> fin"
+    )
+
+
+class DummyStreamingUseCase:
+    async def execute_stream(self, chat_id, user_message, prompt=None):
+        _ = prompt
+        yield "Echo: "
+        yield user_message.body
+
+
+@pytest.mark.asyncio
+async def test_telegram_message_controller_handle_stream():
+    controller = TelegramMessageController(
+        use_case=DummyStreamingUseCase(), presenter=DummyPresenter()
+    )
+    entities = [{"offset": 0, "length": 4, "type": "bold"}]
+    chunks = [chunk async for chunk in controller.handle_stream("user7", "hola", entities)]
+    assert "".join(chunks) == "Echo: **hola**"
+
+
+class ContextCapturingUseCase:
+    def __init__(self):
+        self.context = None
+
+    async def execute(self, chat_id, user_message, prompt=None):
+        from src.shared.request_context import get_request_context
+
+        self.context = get_request_context()
+        return Message(to=chat_id, body="ok")
+
+
+@pytest.mark.asyncio
+async def test_controllers_bind_request_context():
+    from src.shared.request_context import get_request_context
+
+    use_case = ContextCapturingUseCase()
+    await TelegramMessageController(use_case, DummyPresenter()).handle(42, "hola")
+    assert use_case.context.channel == "telegram"
+    assert use_case.context.conversation_id == "42"
+    await WebchatMessageController(use_case, DummyPresenter()).handle("web9", "hola")
+    assert use_case.context.channel == "webchat"
+    assert get_request_context().channel is None
@@ -2,9 +2,11 @@
 Path: tests/test_entities.py
 """
 
+import asyncio
+
 import pytest
 
-from src.entities.gemini_responder import GeminiResponder
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
 from src.entities.message import Message
 
 
@@ -20,3 +22,10 @@ def test_gemini_responder_get_response_not_implemented():
     responder = GeminiResponder()
     with pytest.raises(NotImplementedError):
         responder.get_response("prompt")
+
+
+def test_async_gemini_responder_get_response_async_not_implemented():
+    "Test para AsyncGeminiResponder: get_response_async debe lanzar NotImplementedError"
+    responder = AsyncGeminiResponder()
+    with pytest.raises(NotImplementedError):
+        asyncio.run(responder.get_response_async("prompt"))
@@ -0,0 +1,77 @@
+"""
+Tests for the local upstream fakes (src/infrastructure/fakes)
+"""
+
+import time
+
+import httpx
+import pytest
+
+from src.infrastructure.fakes.fake_gemini import FakeGeminiResponder, FakeRateLimitError
+from src.infrastructure.fakes.fake_rasa import FakeRasa
+from src.infrastructure.fakes.fake_telegram import FakeTelegramApi
+
+
+def test_fake_gemini_is_deterministic_with_seed():
+    def outcomes(seed):
+        fake = FakeGeminiResponder(latency=0, error_rate=0.5, seed=seed)
+        return [fake.get_response("hola").startswith("Error") for _ in range(20)]
+
+    assert outcomes(7) == outcomes(7)
+    assert any(outcomes(7)) and not all(outcomes(7))
+
+
+@pytest.mark.asyncio
+async def test_fake_gemini_latency_and_stream():
+    fake = FakeGeminiResponder(latency=0.05, reply_tokens=40)
+    started = time.perf_counter()
+    text = await fake.get_response_async("hola")
+    assert time.perf_counter() - started >= 0.05
+    chunks = [chunk async for chunk in fake.stream_response_async("hola")]
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+
+
+@pytest.mark.asyncio
+async def test_fake_gemini_rate_limit_error():
+    fake = FakeGeminiResponder(latency=0, rate_limit_rate=1.0)
+    with pytest.raises(FakeRateLimitError) as excinfo:
+        await fake.get_response_async("hola")
+    assert excinfo.value.code == 429
+
+
+@pytest.mark.asyncio
+async def test_fake_rasa_replies_and_simulates_outage():
+    fake = FakeRasa(fallback_responder=FakeGeminiResponder(latency=0, reply="respuesta gemini"))
+    async with httpx.AsyncClient(transport=fake.transport(), base_url="http://rasa") as client:
+        response = await client.post(
+            "/webhooks/rest/webhook", json={"sender": "u1", "message": "hola"}
+        )
+        assert response.json()[0]["recipient_id"] == "u1"
+        assert response.json()[0]["text"]
+
+        response = await client.post(
+            "/webhooks/rest/webhook", json={"sender": "u1", "message": "zzz qwerty"}
+        )
+        assert response.json() == [{"recipient_id": "u1", "text": "respuesta gemini"}]
+
+        fake.outage = True
+        with pytest.raises(httpx.ConnectError):
+            await client.get("/")
+    assert fake.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_telegram_records_messages_and_rate_limits():
+    fake = FakeTelegramApi(rate_limit=1.0)
+    async with httpx.AsyncClient(transport=fake.transport(), base_url="http://tg") as client:
+        first = await client.post("/botTOKEN/sendMessage", json={"chat_id": 5, "text": "uno"})
+        second = await client.post("/botTOKEN/sendMessage", json={"chat_id": 5, "text": "dos"})
+        other_chat = await client.post("/botTOKEN/sendMessage", json={"chat_id": 6, "text": "x"})
+
+    assert first.json()["result"]["message_id"] == 1
+    assert second.status_code == 429
+    assert second.json()["parameters"]["retry_after"] >= 1
+    assert other_chat.status_code == 200
+    assert [call["text"] for call in fake.messages(5)] == ["uno"]
+    assert fake.rate_limited == 1
@@ -0,0 +1,170 @@
+"""
+Tests for the FastAPI webhooks (src/infrastructure/fastapi/fastapi_webhook.py)
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from src.infrastructure.fakes.fake_telegram import FakeTelegramApi
+from src.infrastructure.fastapi.fastapi_webhook import create_app, process_telegram_update
+from src.shared.config import get_config
+from src.shared.overload import OVERLOAD_MESSAGE, REJECT
+
+
+@pytest.fixture
+def fake_upstreams(monkeypatch):
+    "Rasa, Gemini y Telegram simulados y sin demoras; devuelve monkeypatch para más ajustes."
+    monkeypatch.setenv("FAKE_UPSTREAMS", "all")
+    monkeypatch.setenv("FAKE_GEMINI_LATENCY", "0")
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "0")
+    return monkeypatch
+
+
+@pytest.fixture
+def telegram_app(fake_upstreams):
+    "App contra Rasa, Gemini y Telegram simulados, con respuesta inline habilitada."
+    fake_upstreams.setenv("TELEGRAM_INLINE_REPLY", "true")
+    with TestClient(create_app(get_config())) as client:
+        yield client
+
+
+def _telegram_fake(client) -> FakeTelegramApi:
+    return client.app.state.container.fakes["telegram"]
+
+
+def test_telegram_webhook_replies_inline(telegram_app):
+    response = telegram_app.post("/telegram/webhook", json=FakeTelegramApi.text_update(5, "hola"))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["method"] == "sendMessage"
+    assert body["chat_id"] == 5
+    assert body["text"]
+    # Ni sendMessage ni sendChatAction: la respuesta inline no hace llamadas salientes
+    assert [call for call in _telegram_fake(telegram_app).calls if call.get("chat_id") == 5] == []
+
+
+def test_telegram_webhook_sends_extra_parts_outbound(telegram_app):
+    container = telegram_app.app.state.container
+    container.telegram_controller.handle = _handle_with("x " * 3000)
+    response = telegram_app.post("/telegram/webhook", json=FakeTelegramApi.text_update(6, "hola"))
+    assert response.json()["method"] == "sendMessage"
+    assert len(_telegram_fake(telegram_app).messages(6)) == 1
+
+
+def test_telegram_webhook_falls_back_when_over_budget(telegram_app):
+    container = telegram_app.app.state.container
+    container.telegram_inline_reply_budget = 0.01
+    container.telegram_controller.handle = _handle_with("tarde", delay=0.1)
+    response = telegram_app.post("/telegram/webhook", json=FakeTelegramApi.text_update(7, "hola"))
+    assert response.text == "OK"
+    assert [call["text"] for call in _telegram_fake(telegram_app).messages(7)] == ["tarde"]
+    calls = [call for call in _telegram_fake(telegram_app).calls if call.get("chat_id") == 7]
+    # «escribiendo…» mientras se genera, antes del mensaje
+    assert calls[0]["method"] == "sendChatAction"
+    assert calls[-1]["method"] == "sendMessage"
+
+
+def _handle_with(text, delay=0.0):
+    async def handle(chat_id, _text, _entities=None):
+        await asyncio.sleep(delay)
+        return chat_id, text
+
+    return handle
+
+
+def test_telegram_webhook_coalesces_a_burst(telegram_app):
+    container = telegram_app.app.state.container
+    container.coalesce_use_case.window = 0.2
+    update = FakeTelegramApi.text_update
+
+    async def burst():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=telegram_app.app), base_url="http://app"
+        ) as client:
+            first = asyncio.ensure_future(client.post("/telegram/webhook", json=update(9, "hola")))
+            await asyncio.sleep(0.05)
+            second = await client.post("/telegram/webhook", json=update(9, "precio"))
+            return await first, second
+
+    first, second = telegram_app.portal.call(burst)
+    assert first.json()["method"] == "sendMessage"
+    assert second.text == "OK"  # contestado junto con el primero
+    assert container.coalesce_use_case.stats()["turns"] == 1
+
+
+def test_telegram_webhook_enqueues_when_queue_is_configured(fake_upstreams, tmp_path):
+    fake_upstreams.setenv("UPDATE_QUEUE_PATH", str(tmp_path / "updates.db"))
+    fake_upstreams.setenv("COALESCE_WINDOW", "1.5")
+    with TestClient(create_app(get_config())) as client:
+        container = client.app.state.container
+        # La cola no se combina con el agrupado: cada update se contesta sin esperar
+        assert container.coalesce_use_case.window == 0
+        response = client.post("/telegram/webhook", json=FakeTelegramApi.text_update(9, "hola"))
+        assert response.text == "OK"
+        assert _telegram_fake(client).messages(9) == []
+
+        [update] = container.update_queue.claim("test")
+        assert update.conversation == "9"
+        client.portal.call(process_telegram_update, container, update.payload)
+        assert len(_telegram_fake(client).messages(9)) == 1
+
+
+def test_webhooks_reject_fast_at_the_last_overload_step(fake_upstreams):
+    fake_upstreams.setenv("OVERLOAD_CONTROL", "true")
+    with TestClient(create_app(get_config())) as client:
+        container = client.app.state.container
+        container.overload.level = REJECT
+        container.telegram_controller.handle = _handle_with("no debería responder")
+
+        response = client.post("/telegram/webhook", json=FakeTelegramApi.text_update(11, "hola"))
+        assert response.text == "OK"
+        [sent] = _telegram_fake(client).messages(11)
+        assert "mucha demanda" in sent["text"]
+
+        response = client.post("/webchat/webhook", json={"user_id": "u1", "text": "hola"})
+        assert response.json() == {"role": "assistant", "text": OVERLOAD_MESSAGE}
+
+
+def test_webhooks_rate_limit_each_identity(fake_upstreams):
+    fake_upstreams.setenv("RATE_LIMIT_PER_MINUTE", "1")
+    fake_upstreams.setenv("RATE_LIMIT_BURST", "1")
+    with TestClient(create_app(get_config())) as client:
+        container = client.app.state.container
+        container.telegram_controller.handle = _handle_with("respuesta")
+
+        client.post("/telegram/webhook", json=FakeTelegramApi.text_update(12, "hola"))
+        response = client.post("/telegram/webhook", json=FakeTelegramApi.text_update(12, "hola"))
+        # El aviso va en el cuerpo del webhook, sin pasar por el controller
+        assert response.json()["text"].startswith("Estás enviando muchos mensajes")
+        assert [call["text"] for call in _telegram_fake(client).messages(12)] == ["respuesta"]
+
+        first = client.post("/webchat/webhook", json={"user_id": "u1", "text": "hola"})
+        second = client.post("/webchat/webhook", json={"user_id": "u1", "text": "hola"})
+        other = client.post("/webchat/webhook", json={"user_id": "u2", "text": "hola"})
+        assert "muchos mensajes" not in first.json()["text"]
+        assert "muchos mensajes" in second.json()["text"]
+        assert "muchos mensajes" not in other.json()["text"]
+
+
+def test_webchat_ip_limit_uses_the_forwarded_client(fake_upstreams):
+    fake_upstreams.setenv("RATE_LIMIT_IP_PER_MINUTE", "1")
+    fake_upstreams.setenv("RATE_LIMIT_PER_MINUTE", "1")
+    fake_upstreams.setenv("RATE_LIMIT_BURST", "1")
+    app = create_app(get_config())
+    # Como en producción: uvicorn --proxy-headers con el proxy en FORWARDED_ALLOW_IPS
+    with TestClient(ProxyHeadersMiddleware(app, trusted_hosts="testclient")) as client:
+
+        def post(user_id, ip):
+            body = {"user_id": user_id, "text": "hola"}
+            headers = {"X-Forwarded-For": ip}
+            return client.post("/webchat/webhook", json=body, headers=headers).json()["text"]
+
+        assert "muchos mensajes" not in post("u1", "203.0.113.1")
+        assert "muchos mensajes" in post("u2", "203.0.113.1")
+        assert "muchos mensajes" not in post("u3", "203.0.113.2")
+        # El rechazo por IP no gastó el cupo de u2
+        assert "muchos mensajes" not in post("u2", "203.0.113.3")
@@ -8,9 +8,21 @@ from unittest.mock import AsyncMock, MagicMock
 import httpx
 import pytest
 
+from src.entities.gemini_responder import AsyncGeminiResponder
 from src.entities.interfaces import GeminiResponderService, SystemInstructionsRepository
 from src.entities.message import Message
+from src.interface_adapter.gateways import agent_gateway as agent_gateway_module
 from src.interface_adapter.gateways.agent_gateway import AgentGateway
+from src.shared.adaptive_limiter import AdaptiveConcurrencyLimiter
+from src.shared.metrics import MetricsRegistry
+from src.shared.overload import (
+    CANNED_ONLY,
+    NORMAL,
+    OVERLOAD_MESSAGE,
+    SHORT_HISTORY,
+    OverloadController,
+)
+from src.shared.request_context import request_context
 
 
 class DummyInstructionsRepository(SystemInstructionsRepository):
@@ -233,8 +245,7 @@ async def test_agent_gateway_internal_local_response_fallback(monkeypatch):
     monkeypatch.setattr(gateway, "_fallback_response", async_fallback_response)
     resp = await gateway.get_response("mensaje desconocido")
     assert "fallback called" in resp
-    gateway = make_gateway(http_client=None)
-    monkeypatch.setattr(gateway, "_fallback_response", async_fallback_response)
+    mock_http.post.side_effect = httpx.ConnectTimeout("Rasa no responde")
     resp = await gateway.get_response("mensaje desconocido")
     assert "fallback called" in resp
 
@@ -281,6 +292,7 @@ def test_agent_gateway_build_payload_str():
     # Test the behavior indirectly through a public method that uses _build_payload
     # Since _build_payload is protected, we'll test its behavior through get_response
     mock_http = AsyncMock()
+    mock_http.post.return_value = MagicMock(json=MagicMock(return_value=[{"text": "hola"}]))
     gateway.http_client = mock_http
     # This will internally call _build_payload
     asyncio.run(gateway.get_response("hola"))
@@ -294,6 +306,7 @@ def test_agent_gateway_build_payload_message():
     msg = Message(to="conv1", body="hola body")
     # Test the behavior indirectly through a public method that uses _build_payload
     mock_http = AsyncMock()
+    mock_http.post.return_value = MagicMock(json=MagicMock(return_value=[{"text": "hola"}]))
     gateway.http_client = mock_http
     # This will internally call _build_payload
     asyncio.run(gateway.get_response(msg))
@@ -344,3 +357,341 @@ async def test_agent_gateway_message_object_handling():
 
     # Verify the message was processed and gateway handled it correctly
     assert mock_http.post.called
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_fallback_uses_async_responder(monkeypatch):
+    "Test fallback awaits the native async responder instead of using a thread."
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = make_gateway(http_client=mock_http)
+
+    class DummyAsyncGateway(AsyncGeminiResponder):
+        "Dummy async responder."
+
+        async def get_response_async(self, prompt, system_instructions=None):
+            "Return a canned async reply."
+            return " respuesta async "
+
+    async def fail_to_thread(*_a, **_kw):
+        raise AssertionError("no debe usarse asyncio.to_thread")
+
+    monkeypatch.setattr(
+        gateway, "_ensure_fallback_components", MagicMock(return_value=DummyAsyncGateway())
+    )
+    monkeypatch.setattr(asyncio, "to_thread", fail_to_thread)
+    result = await gateway.get_response("consulta")
+    assert result == "respuesta async"
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_fallback_rejected_when_executor_full(monkeypatch):
+    "Test fallback returns the canned response when the blocking executor is saturated."
+    from src.shared.bounded_executor import ExecutorQueueFullError
+
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = make_gateway(http_client=mock_http)
+    mock_gateway = MagicMock()
+    mock_gateway.get_response.return_value = "respuesta gemini"
+
+    async def reject(*_a, **_kw):
+        raise ExecutorQueueFullError("llena")
+
+    monkeypatch.setattr(
+        gateway, "_ensure_fallback_components", MagicMock(return_value=mock_gateway)
+    )
+    monkeypatch.setattr(gateway._blocking_executor, "run", reject)
+    result = await gateway.get_response("consulta")
+    assert "no está disponible" in result.lower()
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_fallback_when_gemini_unavailable(monkeypatch):
+    "Test fallback returns the canned response when Gemini has no quota left."
+    from src.entities.gemini_responder import GeminiUnavailableError
+
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = make_gateway(http_client=mock_http)
+
+    class DummyQuotaGateway(AsyncGeminiResponder):
+        "Dummy responder without quota."
+
+        async def get_response_async(self, prompt, system_instructions=None):
+            "Raise quota error."
+            raise GeminiUnavailableError("sin cupo")
+
+    monkeypatch.setattr(
+        gateway, "_ensure_fallback_components", MagicMock(return_value=DummyQuotaGateway())
+    )
+    result = await gateway.get_response("consulta")
+    assert "no está disponible" in result.lower()
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_stream_response_from_gemini(monkeypatch):
+    "Test stream_response yields Gemini chunks and stores the full turn."
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = make_gateway(http_client=mock_http)
+
+    class DummyStreamingGateway(AsyncGeminiResponder):
+        "Dummy streaming responder."
+
+        async def stream_response_async(self, prompt, system_instructions=None):
+            "Yield two chunks."
+            yield "Primera parte. "
+            yield "Segunda parte."
+
+    monkeypatch.setattr(
+        gateway, "_ensure_fallback_components", MagicMock(return_value=DummyStreamingGateway())
+    )
+    msg = Message(to="conv-stream", body="consulta larga")
+    chunks = [chunk async for chunk in gateway.stream_response(msg)]
+    assert chunks == ["Primera parte. ", "Segunda parte."]
+    assert gateway._history["conv-stream"][-1] == ("bot", "Primera parte. Segunda parte.")
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_stream_response_rasa_and_canned():
+    "Test stream_response yields Rasa and canned answers as a single chunk."
+    mock_response = MagicMock()
+    mock_response.json.return_value = [{"text": "Hola desde Rasa"}]
+    mock_http = AsyncMock()
+    mock_http.post.return_value = mock_response
+    gateway = make_gateway(http_client=mock_http)
+    assert [c async for c in gateway.stream_response("hola")] == ["Hola desde Rasa"]
+
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    chunks = [c async for c in gateway.stream_response("adios")]
+    assert chunks == [AgentGateway._DESPEDIDA_RESPONSE]
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_stream_response_without_gateway(monkeypatch):
+    "Test stream_response falls back to the canned error when Gemini is unavailable."
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = make_gateway(http_client=mock_http)
+    monkeypatch.setattr(gateway, "_ensure_fallback_components", MagicMock(return_value=None))
+    chunks = [c async for c in gateway.stream_response("consulta")]
+    assert chunks == [AgentGateway._FALLBACK_RESPONSE]
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_warm_up_fallback_loads_components():
+    "Test warm_up_fallback preloads instructions and the Gemini gateway off the loop."
+    gateway = make_gateway()
+    assert await gateway.warm_up_fallback() is True
+    assert gateway._fallback_initialized is True
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_warm_up_remote_opens_rasa_connection():
+    "Test warm_up_remote hits the Rasa root only when Rasa is enabled."
+    mock_http = AsyncMock()
+    gateway = AgentGateway(
+        http_client=mock_http,
+        agent_bot_url="http://rasa:5005/webhooks/rest/webhook",
+        remote_available=True,
+    )
+    await gateway.warm_up_remote()
+    mock_http.get.assert_awaited_once_with("http://rasa:5005/", timeout=5.0)
+
+    gateway.remote_available = False
+    await gateway.warm_up_remote()
+    assert mock_http.get.await_count == 1
+
+
+def _slow_fallback_gateway(policy, started, cancelled):
+    "Gateway sin Rasa cuyo fallback tarda 50 ms y avisa si lo cancelan."
+    gateway = AgentGateway(http_client=None, remote_available=False, supersede_policy=policy)
+
+    async def slow_fallback(_conversation_id, message_text):
+        started.append(message_text)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(message_text)
+            raise
+        return f"respuesta a {message_text}"
+
+    gateway._fallback_response = slow_fallback
+    return gateway
+
+
+async def _ask(gateway, text, delay=0.0):
+    await asyncio.sleep(delay)
+    with request_context(channel="telegram", conversation_id="42"):
+        return await gateway.get_response(text)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["cancel", "drop"])
+async def test_agent_gateway_supersedes_stale_fallback(policy):
+    started, cancelled = [], []
+    gateway = _slow_fallback_gateway(policy, started, cancelled)
+    old, new = await asyncio.gather(
+        _ask(gateway, "consulta vieja"), _ask(gateway, "consulta nueva", delay=0.01)
+    )
+    assert old is None
+    assert new == "respuesta a consulta nueva"
+    assert started == ["consulta vieja", "consulta nueva"]
+    assert cancelled == (["consulta vieja"] if policy == "cancel" else [])
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_supersede_off_answers_every_message():
+    started, cancelled = [], []
+    gateway = _slow_fallback_gateway("off", started, cancelled)
+    results = await asyncio.gather(_ask(gateway, "uno"), _ask(gateway, "dos", delay=0.01))
+    assert results == ["respuesta a uno", "respuesta a dos"]
+    with pytest.raises(ValueError):
+        AgentGateway(http_client=None, supersede_policy="later")
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_supersede_is_per_conversation():
+    started, cancelled = [], []
+    gateway = _slow_fallback_gateway("cancel", started, cancelled)
+
+    async def ask_in(conversation_id, text):
+        with request_context(channel="telegram", conversation_id=conversation_id):
+            return await gateway.get_response(text)
+
+    results = await asyncio.gather(ask_in("1", "a"), ask_in("2", "b"))
+    assert results == ["respuesta a a", "respuesta a b"]
+    assert cancelled == []
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_supersede_propagates_caller_cancellation():
+    started, cancelled = [], []
+    gateway = _slow_fallback_gateway("cancel", started, cancelled)
+    request = asyncio.ensure_future(_ask(gateway, "consulta"))
+    await asyncio.sleep(0.01)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    assert cancelled == ["consulta"]
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_uses_fallback_when_rasa_limiter_is_full(monkeypatch):
+    "Con el limitador de Rasa lleno no se consulta a Rasa y responde el fallback."
+    limiter = AdaptiveConcurrencyLimiter(
+        "rasa", initial_limit=1, max_queue=0, metrics=MetricsRegistry()
+    )
+    mock_http = AsyncMock()
+    gateway = AgentGateway(
+        http_client=mock_http,
+        instructions_repository=DummyInstructionsRepository(),
+        gemini_service=DummyGeminiService(),
+        rasa_limiter=limiter,
+    )
+
+    async def async_fallback_response(_c, _m):
+        return "fallback called"
+
+    monkeypatch.setattr(gateway, "_fallback_response", async_fallback_response)
+    async with limiter.slot():
+        resp = await gateway.get_response("mensaje desconocido")
+    assert resp == "fallback called"
+    mock_http.post.assert_not_called()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_rasa_timeout_lowers_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(
+        "rasa",
+        initial_limit=10,
+        drop_exceptions=(httpx.TimeoutException,),
+        metrics=MetricsRegistry(),
+    )
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.ReadTimeout("lento")
+    gateway = AgentGateway(
+        http_client=mock_http,
+        instructions_repository=DummyInstructionsRepository(),
+        gemini_service=DummyGeminiService(),
+        rasa_limiter=limiter,
+    )
+    await gateway.get_response("hola")
+    assert limiter.limit == 7
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_degrades_under_overload(monkeypatch):
+    overload = OverloadController(metrics=MetricsRegistry())
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = httpx.RequestError("Rasa down")
+    gateway = AgentGateway(
+        http_client=mock_http,
+        instructions_repository=DummyInstructionsRepository(),
+        gemini_service=DummyGeminiService(),
+        overload=overload,
+    )
+    prompts = []
+
+    async def async_fallback_response(conversation_id, message_text):
+        prompts.append(gateway._build_prompt(conversation_id, message_text))
+        return "respuesta"
+
+    monkeypatch.setattr(gateway, "_fallback_response", async_fallback_response)
+    for index in range(6):
+        await gateway.get_response(Message(to="conv", body=f"pregunta {index}"))
+    assert prompts[-1].count("\n") > 5
+
+    overload.level = SHORT_HISTORY
+    await gateway.get_response(Message(to="conv", body="otra"))
+    # Cuatro turnos de historial más el mensaje nuevo
+    assert prompts[-1].count("\n") == 5
+
+    overload.level = CANNED_ONLY
+    assert await gateway.get_response(Message(to="conv", body="otra más")) == OVERLOAD_MESSAGE
+    assert await gateway.get_response("hola") == gateway.canned_responses()[0]
+    assert len(prompts) == 7
+
+
+@pytest.mark.asyncio
+async def test_agent_gateway_rasa_timeouts_raise_the_overload_level(monkeypatch):
+    class FakeTime:
+        now = 0.0
+
+        def monotonic(self):
+            return self.now
+
+    fake_time = FakeTime()
+    monkeypatch.setattr(agent_gateway_module, "time", fake_time)
+    overload = OverloadController(
+        max_latency=15.0, hold=0.0, metrics=MetricsRegistry(), clock=fake_time.monotonic
+    )
+
+    timed_out = asyncio.Event()
+
+    async def saturated_post(*_args, **_kwargs):
+        await timed_out.wait()
+        raise httpx.ReadTimeout("Rasa no responde")
+
+    mock_http = AsyncMock()
+    mock_http.post.side_effect = saturated_post
+    gateway = AgentGateway(
+        http_client=mock_http,
+        instructions_repository=DummyInstructionsRepository(),
+        gemini_service=DummyGeminiService(),
+        overload=overload,
+    )
+
+    async def async_fallback_response(_conversation_id, _message_text):
+        return "respuesta"
+
+    monkeypatch.setattr(gateway, "_fallback_response", async_fallback_response)
+    # Varias consultas en curso a la vez vencen juntas a los 60 s
+    calls = [asyncio.ensure_future(gateway.get_response("pregunta")) for _ in range(3)]
+    await asyncio.sleep(0)
+    fake_time.now += 60
+    timed_out.set()
+    assert await asyncio.gather(*calls) == ["respuesta"] * 3
+    assert overload.evaluate() > NORMAL
@@ -1,3 +1,6 @@
+import asyncio
+
+from src.entities.gemini_responder import AsyncGeminiResponder
 from src.entities.system_instructions import SystemInstructions
 from src.interface_adapter.gateways.gemini_gateway import GeminiGateway
 
@@ -88,3 +91,24 @@ def test_gemini_gateway_get_response_empty_prompt():
     gateway = GeminiGateway(DummyService())
     result = gateway.get_response("", "inst")
     assert result.startswith("resp:")
+
+
+def test_gemini_gateway_get_response_async_uses_native_service():
+    class DummyAsyncService(AsyncGeminiResponder):
+        def get_response(self, prompt, system_instructions):
+            raise AssertionError("no debe usarse el camino síncrono")
+
+        async def get_response_async(self, prompt, system_instructions=None):
+            return f"async:{prompt}:{system_instructions}"
+
+    gateway = GeminiGateway(DummyAsyncService())
+    result = asyncio.run(gateway.get_response_async("hola", SystemInstructions(["haz esto"])))
+    assert result == "async:hola:haz esto"
+
+
+def test_gemini_gateway_get_response_async_with_sync_service():
+    service = DummyService()
+    gateway = GeminiGateway(service)
+    result = asyncio.run(gateway.get_response_async("hola", "inst"))
+    assert result == "respuesta:hola:inst"
+    assert service.last_args == ("hola", "inst")
@@ -2,7 +2,7 @@
 Tests for GeminiService (src/infrastructure/google_generative_ai/gemini_service.py)
 """
 
-from unittest.mock import MagicMock, mock_open
+from unittest.mock import AsyncMock, MagicMock, mock_open
 
 import pytest
 
@@ -10,9 +10,9 @@ from src.infrastructure.google_generative_ai.gemini_service import GeminiService
 
 
 def test_gemini_service_init_success(monkeypatch):
-    "Mock get_config and genai.configure"
+    "Mock get_settings and genai.configure"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -27,9 +27,9 @@ def test_gemini_service_init_success(monkeypatch):
 
 
 def test_gemini_service_init_no_api_key(monkeypatch):
-    "Mock get_config and genai.configure with no API key"
+    "Mock get_settings and genai.configure with no API key"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config", lambda: {}
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings", lambda: {}
     )
     monkeypatch.setattr(
         "src.infrastructure.google_generative_ai.gemini_service.genai.configure",
@@ -43,9 +43,9 @@ def test_gemini_service_init_no_api_key(monkeypatch):
 
 
 def test_gemini_service_init_with_instructions(monkeypatch):
-    "Mock get_config, genai.configure, and load_system_instructions_from_json"
+    "Mock get_settings, genai.configure, and load_system_instructions_from_json"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -120,7 +120,7 @@ def test_load_system_instructions_from_json_oserror(monkeypatch):
 def test_gemini_service_get_response_no_text_attr(monkeypatch):
     "Test get_response when model response has no .text attribute"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -144,7 +144,7 @@ def test_gemini_service_get_response_no_text_attr(monkeypatch):
 def test_gemini_service_get_response_empty_prompt(monkeypatch):
     "Test get_response with empty prompt."
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -168,7 +168,7 @@ def test_gemini_service_get_response_empty_prompt(monkeypatch):
 def test_gemini_service_get_response_other_exception(monkeypatch):
     "Test get_response handles non-ValueError exception from model."
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -194,7 +194,7 @@ def test_gemini_service_get_response_other_exception(monkeypatch):
 def test_gemini_service_get_response(monkeypatch):
     "Test get_response with system instructions"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -218,7 +218,7 @@ def test_gemini_service_get_response(monkeypatch):
 def test_gemini_service_get_response_no_instructions(monkeypatch):
     "Test get_response without system instructions"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -242,7 +242,7 @@ def test_gemini_service_get_response_no_instructions(monkeypatch):
 def test_gemini_service_get_response_value_error(monkeypatch):
     "Test get_response handles ValueError from model"
     monkeypatch.setattr(
-        "src.infrastructure.google_generative_ai.gemini_service.get_config",
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
         lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
     )
     monkeypatch.setattr(
@@ -261,3 +261,118 @@ def test_gemini_service_get_response_value_error(monkeypatch):
     service = GeminiService()
     result = service.get_response("hola")
     assert "Error al generar respuesta" in result
+
+
+@pytest.mark.asyncio
+async def test_gemini_service_get_response_async(monkeypatch):
+    "Test get_response_async usa generate_content_async del SDK"
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
+        lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.configure",
+        lambda api_key: None,
+    )
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock()
+    mock_model.generate_content_async.return_value.text = "respuesta async"
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.GenerativeModel",
+        lambda name: mock_model,
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.logger", MagicMock()
+    )
+    service = GeminiService()
+    result = await service.get_response_async("hola", system_instructions="INST")
+    assert result == "respuesta async"
+    mock_model.generate_content_async.assert_awaited_once_with("INST\n\nhola")
+    mock_model.generate_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_gemini_service_get_response_async_value_error(monkeypatch):
+    "Test get_response_async maneja ValueError del modelo"
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
+        lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.configure",
+        lambda api_key: None,
+    )
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(side_effect=ValueError("fail"))
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.GenerativeModel",
+        lambda name: mock_model,
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.logger", MagicMock()
+    )
+    service = GeminiService()
+    result = await service.get_response_async("hola")
+    assert "Error al generar respuesta" in result
+
+
+@pytest.mark.asyncio
+async def test_gemini_service_stream_response_async(monkeypatch):
+    "Test stream_response_async entrega los fragmentos del stream del SDK"
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
+        lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.configure",
+        lambda api_key: None,
+    )
+
+    class FakeStream:
+        def __init__(self, texts):
+            self._texts = iter(texts)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return MagicMock(text=next(self._texts))
+            except StopIteration as exc:
+                raise StopAsyncIteration from exc
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(return_value=FakeStream(["Hola ", "", "mundo"]))
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.GenerativeModel",
+        lambda name: mock_model,
+    )
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.logger", MagicMock()
+    )
+    service = GeminiService()
+    chunks = [chunk async for chunk in service.stream_response_async("hola")]
+    assert chunks == ["Hola ", "mundo"]
+    mock_model.generate_content_async.assert_awaited_once_with("hola", stream=True)
+
+
+def test_gemini_service_warm_up_configures_once_and_caches_model(monkeypatch):
+    "Test warm_up configures the SDK once and reuses the model object"
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.get_settings",
+        lambda: {"GOOGLE_GEMINI_API_KEY": "key123"},
+    )
+    configure = MagicMock()
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.configure", configure
+    )
+    build = MagicMock(return_value=MagicMock())
+    monkeypatch.setattr(
+        "src.infrastructure.google_generative_ai.gemini_service.genai.GenerativeModel", build
+    )
+    service = GeminiService()
+    configure.assert_not_called()
+    service.warm_up()
+    service.get_response("hola")
+    configure.assert_called_once_with(api_key="key123")
+    build.assert_called_once_with(service.model_name)
@@ -0,0 +1,42 @@
+"""
+Tests for IdentityRateLimiter (src/shared/identity_rate_limiter.py)
+"""
+
+from src.shared.identity_rate_limiter import IdentityRateLimiter
+from src.shared.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_each_identity_has_its_own_bucket():
+    metrics = MetricsRegistry()
+    clock = FakeClock()
+    limiter = IdentityRateLimiter("test", 2, 1.0, metrics=metrics, clock=clock)
+    assert limiter.allow("telegram:1")
+    assert limiter.allow("telegram:1")
+    assert not limiter.allow("telegram:1")
+    assert limiter.allow("telegram:2")
+    clock.now += 1
+    assert limiter.allow("telegram:1")
+    assert metrics.counter("rate_limit.test.allowed") == 4
+    assert metrics.counter("rate_limit.test.rejected") == 1
+
+
+def test_least_recently_used_identity_is_evicted():
+    metrics = MetricsRegistry()
+    limiter = IdentityRateLimiter("lru", 1, 0.001, max_identities=2, metrics=metrics)
+    limiter.allow("a")
+    limiter.allow("b")
+    assert not limiter.allow("a")
+    limiter.allow("c")
+    assert len(limiter) == 2
+    assert metrics.gauge("rate_limit.lru.identities") == 2
+    # «b» se descartó y vuelve a empezar con el bucket lleno; «c» sigue sin cupo
+    assert limiter.allow("b")
+    assert not limiter.allow("c")
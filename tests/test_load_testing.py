@@ -0,0 +1,128 @@
+"""
+Tests for the load-testing harness (src/infrastructure/load_testing)
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.infrastructure.fastapi.fastapi_webhook import create_app
+from src.infrastructure.fastapi.metered_transport import MeteredTransport
+from src.infrastructure.load_testing.report import format_report
+from src.infrastructure.load_testing.runner import run_in_process
+from src.infrastructure.load_testing.scenario import (
+    ScenarioError,
+    load_scenario,
+    parse_scenario,
+)
+from src.shared.config import get_config
+from src.shared.metrics import MetricsRegistry
+
+
+def test_scenario_arrivals_follow_phase_rates():
+    scenario = parse_scenario(
+        {"phases": [{"duration": 1, "rate": 10}, {"duration": 2, "rate": 5}], "users": 3}
+    )
+    arrivals = list(scenario.arrivals())
+    assert len(arrivals) == 20
+    assert arrivals == sorted(arrivals)
+    assert len(list(scenario.scaled(2).arrivals())) == 40
+
+
+def test_scenario_rotates_users_and_messages():
+    scenario = parse_scenario(
+        {
+            "phases": [{"duration": 1, "rate": 1}],
+            "users": 2,
+            "channels": {"webchat": 1},
+            "messages": ["a", "b"],
+        }
+    )
+    requests = scenario.requests()
+    sent = [next(requests) for _ in range(4)]
+    assert [request.user for request in sent] == ["load-0", "load-1", "load-0", "load-1"]
+    assert [request.payload["text"] for request in sent] == ["a", "b", "b", "a"]
+    assert {request.endpoint for request in sent} == {"/webchat/webhook"}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"phases": []},
+        {"phases": [{"duration": 1}]},
+        {"phases": [{"duration": 1, "rate": 1}], "channels": {"sms": 1}},
+        {"phases": [{"duration": 1, "rate": 1}], "events": [{"at": 1, "action": "x"}]},
+    ],
+)
+def test_invalid_scenarios_are_rejected(data):
+    with pytest.raises(ScenarioError):
+        parse_scenario(data)
+
+
+def test_recorded_traffic_is_replayed_in_order(tmp_path):
+    recorded = tmp_path / "traffic.jsonl"
+    update = {"update_id": 7, "message": {"chat": {"id": 42}, "text": "hola"}}
+    recorded.write_text(
+        json.dumps(update) + "\n" + json.dumps({"user_id": "w1", "text": "buenas"}) + "\n",
+        encoding="utf-8",
+    )
+    scenario_path = tmp_path / "replay.json"
+    scenario_path.write_text(
+        json.dumps({"phases": [{"duration": 1, "rate": 1}], "recorded": "traffic.jsonl"}),
+        encoding="utf-8",
+    )
+    requests = load_scenario(scenario_path).requests()
+    first, second, third = next(requests), next(requests), next(requests)
+    assert (first.channel, first.user, first.payload) == ("telegram", "42", update)
+    assert (second.channel, second.user) == ("webchat", "w1")
+    assert third == first
+
+
+def test_bundled_scenarios_are_valid():
+    for name in ("burst", "many_users", "long_conversation", "rasa_outage", "recorded_replay"):
+        assert load_scenario(f"load_tests/{name}.json").duration > 0
+
+
+@pytest.mark.asyncio
+async def test_metered_transport_records_latency_and_errors():
+    metrics = MetricsRegistry()
+
+    def handler(request):
+        return httpx.Response(503 if request.url.path == "/down" else 200)
+
+    transport = MeteredTransport("rasa", httpx.MockTransport(handler), metrics=metrics)
+    async with httpx.AsyncClient(transport=transport, base_url="http://rasa") as client:
+        await client.get("/")
+        await client.get("/down")
+    snapshot = metrics.snapshot()
+    assert snapshot["observations"]["upstream.rasa.latency_seconds"]["count"] == 2
+    assert snapshot["counters"]["upstream.rasa.errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_in_process_against_fakes_with_rasa_outage(monkeypatch):
+    monkeypatch.setenv("FAKE_UPSTREAMS", "all")
+    monkeypatch.setenv("FAKE_GEMINI_LATENCY", "0.01")
+    monkeypatch.setenv("TELEGRAM_MESSAGE_DELAY", "0")
+    app = create_app(get_config())
+    scenario = parse_scenario(
+        {
+            "name": "mini",
+            "phases": [{"duration": 0.5, "rate": 40}],
+            "users": 4,
+            "events": [{"at": 0.2, "action": "rasa_outage"}],
+        }
+    )
+
+    report = await run_in_process(app, scenario, track_memory=True)
+
+    endpoints = report["endpoints"]
+    assert sum(stats["sent"] for stats in endpoints.values()) == report["target_requests"] == 20
+    assert all(stats["errors"] == 0 for stats in endpoints.values())
+    assert all(stats["p95"] is not None for stats in endpoints.values())
+    stages = report["stages"]
+    assert stages["latency"]["upstream.rasa.latency_seconds"]["count"] == 20
+    assert stages["errors"]["upstream.rasa.errors"] > 0
+    assert report["memory"]["peak_bytes"] >= 0
+    assert "webchat_webhook" in format_report(report)
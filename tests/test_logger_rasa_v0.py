@@ -2,9 +2,15 @@
 Tests for logger_rasa_v0.py (src/shared/logger_rasa_v0.py)
 """
 
+import json
 import logging
 
-from src.shared.logger_rasa_v0 import TruncatingColoredFormatter, get_logger
+from src.shared.logger_rasa_v0 import (
+    JsonFormatter,
+    TruncatingColoredFormatter,
+    _DeferredQueueHandler,
+    get_logger,
+)
 
 
 def test_truncating_formatter_truncates():
@@ -58,21 +64,21 @@ def test_get_logger_truncates(monkeypatch):
     logger = logging.getLogger("rasa-bot-test")
     logger.handlers.clear()
     monkeypatch.setattr(
-        "src.shared.logger_rasa_v0.get_config", lambda: {"LOG_MESSAGE_MAX_LENGTH": 8}
+        "src.shared.logger_rasa_v0.get_settings", lambda: {"LOG_MESSAGE_MAX_LENGTH": 8}
     )
     monkeypatch.setattr("coloredlogs.install", lambda **kwargs: None)
     monkeypatch.setattr("coloredlogs.DEFAULT_LEVEL_STYLES", {})
     monkeypatch.setattr("coloredlogs.DEFAULT_FIELD_STYLES", {})
     log = get_logger("rasa-bot-test")
     assert log.name == "rasa-bot-test"
-    assert log.level == logging.DEBUG
+    assert log.level == logging.INFO
 
 
 def test_get_logger_invalid_max_length(monkeypatch):
     logger = logging.getLogger("rasa-bot-invalid")
     logger.handlers.clear()
     monkeypatch.setattr(
-        "src.shared.logger_rasa_v0.get_config",
+        "src.shared.logger_rasa_v0.get_settings",
         lambda: {"LOG_MESSAGE_MAX_LENGTH": "notanint"},
     )
     monkeypatch.setattr("coloredlogs.install", lambda **kwargs: None)
@@ -80,18 +86,57 @@ def test_get_logger_invalid_max_length(monkeypatch):
     monkeypatch.setattr("coloredlogs.DEFAULT_FIELD_STYLES", {})
     log = get_logger("rasa-bot-invalid")
     assert log.name == "rasa-bot-invalid"
-    assert log.level == logging.DEBUG
+    assert log.level == logging.INFO
 
 
 def test_get_logger_negative_max_length(monkeypatch):
     logger = logging.getLogger("rasa-bot-neg")
     logger.handlers.clear()
     monkeypatch.setattr(
-        "src.shared.logger_rasa_v0.get_config", lambda: {"LOG_MESSAGE_MAX_LENGTH": -1}
+        "src.shared.logger_rasa_v0.get_settings", lambda: {"LOG_MESSAGE_MAX_LENGTH": -1}
     )
     monkeypatch.setattr("coloredlogs.install", lambda **kwargs: None)
     monkeypatch.setattr("coloredlogs.DEFAULT_LEVEL_STYLES", {})
     monkeypatch.setattr("coloredlogs.DEFAULT_FIELD_STYLES", {})
     log = get_logger("rasa-bot-neg")
     assert log.name == "rasa-bot-neg"
-    assert log.level == logging.DEBUG
+    assert log.level == logging.INFO
+
+
+def test_get_logger_per_logger_levels(monkeypatch):
+    monkeypatch.setattr(
+        "src.shared.logger_rasa_v0.get_settings",
+        lambda: {"LOG_LEVEL": "WARNING", "LOG_LEVELS": {"rasa-bot-verbose": "DEBUG"}},
+    )
+    assert get_logger("rasa-bot-verbose").level == logging.DEBUG
+    assert get_logger("rasa-bot-quiet").level == logging.WARNING
+
+
+def test_get_logger_writes_through_queue(monkeypatch):
+    monkeypatch.setattr("src.shared.logger_rasa_v0.get_settings", lambda: {})
+    log = get_logger("rasa-bot-queue")
+    get_logger("rasa-bot-queue")
+    handlers = [h for h in log.handlers if isinstance(h, _DeferredQueueHandler)]
+    assert len(handlers) == 1
+    assert log.propagate is False
+
+
+def test_deferred_queue_handler_interpolates_once():
+    handler = _DeferredQueueHandler(None)
+    args = ["valor"]
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "datos: %s", (args,), None)
+    prepared = handler.prepare(record)
+    args.append("mutado")
+    assert prepared.msg == "datos: ['valor']"
+    assert prepared.args is None
+    assert record.args == (args,)
+
+
+def test_json_formatter_outputs_one_json_line():
+    fmt = JsonFormatter(max_length=10)
+    record = logging.LogRecord("test", logging.WARNING, __file__, 1, "0123456789ABCDEF", (), None)
+    payload = json.loads(fmt.format(record))
+    assert payload["level"] == "WARNING"
+    assert payload["logger"] == "test"
+    assert payload["message"].endswith("…")
+    assert len(payload["message"]) <= 10
@@ -0,0 +1,42 @@
+"""
+Tests for LRUCache (src/shared/lru_cache.py)
+"""
+
+import pytest
+
+from src.shared.lru_cache import LRUCache
+from src.shared.metrics import MetricsRegistry
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache("test", maxsize=2, metrics=MetricsRegistry())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" pasa a ser la menos reciente
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_reports_hit_ratio():
+    metrics = MetricsRegistry()
+    cache = LRUCache("test", maxsize=4, metrics=metrics)
+    assert cache.hit_ratio == 0.0
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("x", default="nada")
+    assert cache.info() == {"size": 1, "maxsize": 4, "hits": 2, "misses": 1, "hit_ratio": 2 / 3}
+    assert metrics.counter("cache.test.hits") == 2
+    assert metrics.counter("cache.test.misses") == 1
+    assert metrics.gauge("cache.test.hit_ratio") == pytest.approx(2 / 3)
+
+
+def test_lru_cache_with_zero_size_stores_nothing():
+    cache = LRUCache("test", maxsize=0, metrics=MetricsRegistry())
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    with pytest.raises(ValueError):
+        LRUCache("test", maxsize=-1)
@@ -2,7 +2,7 @@
 Tests for MessageSplitter (src/interface_adapter/presenters/message_splitter.py)
 """
 
-from src.interface_adapter.presenters.message_splitter import MessageSplitter
+from src.interface_adapter.presenters.message_splitter import MessageSplitter, utf16_len
 
 
 def test_splitter_empty_text():
@@ -32,3 +32,101 @@ def test_splitter_multiple_chunks():
     text = "a" * 25
     # max_len=8, debe dividir en 4 partes: 8+8+8+1
     assert splitter.split(text, 8) == ["a" * 8, "a" * 8, "a" * 8, "a"]
+
+
+def test_splitter_prefers_paragraphs_then_sentences_then_words():
+    splitter = MessageSplitter()
+    text = "Primer párrafo corto\\.\n\nSegundo párrafo\\. Con dos oraciones"
+    assert splitter.split(text, 40) == [
+        "Primer párrafo corto\\.",
+        "Segundo párrafo\\. Con dos oraciones",
+    ]
+    assert splitter.split("Una oración\\. Otra oración más larga", 24) == [
+        "Una oración\\.",
+        "Otra oración más larga",
+    ]
+    assert splitter.split("palabra " * 5, 20) == ["palabra palabra", "palabra palabra", "palabra "]
+
+
+def test_splitter_never_breaks_an_escape():
+    splitter = MessageSplitter()
+    parts = splitter.split("\\." * 10, 5)
+    assert parts == ["\\.\\.", "\\.\\.", "\\.\\.", "\\.\\.", "\\.\\."]
+
+
+def test_splitter_counts_utf16_code_units():
+    splitter = MessageSplitter()
+    parts = splitter.split("😀" * 6, 4)
+    assert parts == ["😀😀", "😀😀", "😀😀"]
+    assert utf16_len("😀a") == 3
+
+
+def test_splitter_closes_and_reopens_formatting():
+    splitter = MessageSplitter()
+    assert splitter.split("*negrita que sigue* y _más_", 18) == [
+        "*negrita que*",
+        "*sigue* y _más_",
+    ]
+    assert splitter.split("[un enlace largo](http://a.b)", 24) == [
+        "[un enlace](http://a.b)",
+        "[largo](http://a.b)",
+    ]
+    assert splitter.split("```py\nx \\= 1\ny \\= 2\n```", 20) == [
+        "```py\nx \\= 1```",
+        "```py\ny \\= 2\n```",
+    ]
+
+
+def test_splitter_separates_adjacent_underscore_markers():
+    splitter = MessageSplitter()
+    parts = splitter.split("___cursiva y subrayado_\r__ fin", 26)
+    assert parts[0] == "___cursiva y_\r__"
+    assert parts[1] == "__\r_subrayado_\r__ fin"
+
+
+def test_splitter_separates_reopened_italic_from_its_closing_marker():
+    # El corte cae justo antes del "_" que cierra la cursiva reabierta
+    assert MessageSplitter().split("_uno dos _x_ y", 11) == ["_uno dos_", "_\r_x_ y"]
+
+
+def test_splitter_keeps_links_whole():
+    splitter = MessageSplitter()
+    assert splitter.split("uno dos [tres cuatro](http://a.b) cinco", 30) == [
+        "uno dos",
+        "[tres cuatro](http://a.b)",
+        "cinco",
+    ]
+    # Corchetes dentro de un código dentro del enlace: sigue siendo un enlace
+    link = "[see `arr[0]` here and more words to pad](http://example.com/x)"
+    assert splitter.split(f"intro {link} fin", 65) == ["intro", link, "fin"]
+    # Un enlace más largo que una parte se corta cerrándolo y reabriéndolo
+    assert splitter.split(link, 37) == [
+        "[see `arr[0]`](http://example.com/x)",
+        "[here and more](http://example.com/x)",
+        "[words to pad](http://example.com/x)",
+    ]
+
+
+def test_splitter_only_closes_the_innermost_marker():
+    # El "*" de "tres" abre otra negrita dentro de la cursiva, no cierra la de afuera
+    assert MessageSplitter().split("*uno _dos *tres* cuatro_ cinco*", 16) == [
+        "*uno _dos_*",
+        "*_*tres*_*",
+        "*_cuatro_ cinco*",
+    ]
+
+
+def test_split_entities_clips_entities_to_each_part():
+    splitter = MessageSplitter()
+    text = "uno dos tres cuatro\n\ncinco seis"
+    entities = [
+        {"type": "bold", "offset": 4, "length": 15},
+        {"type": "text_link", "offset": 21, "length": 10, "url": "https://a.com"},
+    ]
+    assert splitter.split_entities(text, entities, 20) == [
+        ("uno dos tres cuatro", [{"type": "bold", "offset": 4, "length": 15}]),
+        ("cinco seis", [{"type": "text_link", "offset": 0, "length": 10, "url": "https://a.com"}]),
+    ]
+    parts = splitter.split_entities("😀 " * 10, [{"type": "italic", "offset": 0, "length": 30}], 8)
+    assert [text for text, _ in parts] == ["😀 😀 😀", "😀 😀 😀", "😀 😀 😀", "😀 "]
+    assert [entities[0]["length"] for _, entities in parts] == [8, 8, 8, 3]
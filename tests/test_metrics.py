@@ -0,0 +1,36 @@
+"""
+Tests for MetricsRegistry (src/shared/metrics.py)
+"""
+
+from src.shared.metrics import MetricsRegistry, get_metrics
+
+
+def test_metrics_counters_and_gauges():
+    metrics = MetricsRegistry()
+    metrics.increment("requests")
+    metrics.increment("requests", 2)
+    metrics.set_gauge("queue", 5)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["requests"] == 3
+    assert snapshot["gauges"]["queue"] == 5
+    assert metrics.counter("missing") == 0
+
+
+def test_metrics_observations_percentiles():
+    metrics = MetricsRegistry()
+    for value in range(1, 101):
+        metrics.observe("latency", value / 100)
+    stats = metrics.snapshot()["observations"]["latency"]
+    assert stats["count"] == 100
+    assert stats["max"] == 1.0
+    assert 0.49 <= stats["p50"] <= 0.52
+    assert 0.94 <= stats["p95"] <= 0.97
+    assert metrics.percentile("missing", 0.5) is None
+
+
+def test_metrics_reset_and_shared_registry():
+    metrics = MetricsRegistry()
+    metrics.increment("a")
+    metrics.reset()
+    assert metrics.snapshot() == {"counters": {}, "gauges": {}, "observations": {}}
+    assert get_metrics() is get_metrics()
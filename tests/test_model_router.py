@@ -0,0 +1,131 @@
+"""
+Tests for GeminiModelRouter (src/infrastructure/google_generative_ai/model_router.py)
+"""
+
+import pytest
+
+from src.entities.gemini_responder import AsyncGeminiResponder, GeminiResponder
+from src.infrastructure.google_generative_ai.model_router import (
+    GeminiModelRouter,
+    ModelRoute,
+    estimate_tokens,
+)
+from src.shared.metrics import MetricsRegistry
+from src.shared.overload import CHEAPER_MODEL, OverloadController
+from src.shared.request_context import request_context
+
+
+class StubResponder(GeminiResponder, AsyncGeminiResponder):
+    "Responder falso que identifica al modelo que respondió."
+
+    def __init__(self, name, reply=None):
+        self.name = name
+        self.reply = reply
+        self.calls = 0
+
+    def get_response(self, prompt, system_instructions=None):
+        self.calls += 1
+        return self.reply if self.reply is not None else f"{self.name}:{prompt}"
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        return self.get_response(prompt, system_instructions)
+
+
+def make_router(**kwargs):
+    lite = StubResponder("lite")
+    pro = StubResponder("pro")
+    routes = [
+        ModelRoute("lite", lite, max_prompt_tokens=50),
+        ModelRoute("pro", pro, max_prompt_tokens=10_000),
+    ]
+    return GeminiModelRouter(routes, metrics=MetricsRegistry(), **kwargs), lite, pro
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 40) == 10
+
+
+@pytest.mark.asyncio
+async def test_router_short_prompt_goes_to_cheapest_model():
+    router, lite, pro = make_router()
+    assert await router.get_response_async("hola") == "lite:hola"
+    assert lite.calls == 1
+    assert pro.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_router_long_prompt_goes_to_stronger_model():
+    router, lite, pro = make_router()
+    long_prompt = "¿Cuánto cuestan 500 bolsas blancas con manijas e impresión? " * 10
+    await router.get_response_async(long_prompt)
+    assert pro.calls == 1
+    assert router.decisions[-1]["model"] == "pro"
+    assert router.decisions[-1]["ok"] is True
+
+
+def test_router_skips_model_over_latency_slo():
+    router, _lite, _pro = make_router(latency_slo=1.0, min_samples=3)
+    for _ in range(3):
+        router.record_latency("lite", 5.0)
+    route, reason = router.select("hola")
+    assert route.name == "pro"
+    assert "SLO" in reason
+
+
+def test_router_excluded_route_comes_back_when_samples_expire():
+    now = [0.0]
+    router, _lite, _pro = make_router(
+        latency_slo=1.0, min_samples=3, sample_ttl=60.0, clock=lambda: now[0]
+    )
+    for _ in range(3):
+        router.record_latency("lite", 5.0)
+    assert router.select("hola")[0].name == "pro"
+    now[0] = 61.0
+    assert router.p95("lite") is None
+    assert router.select("hola")[0].name == "lite"
+
+
+def test_router_uses_cheapest_route_under_overload():
+    overload = OverloadController(metrics=MetricsRegistry())
+    overload.level = CHEAPER_MODEL
+    router, _lite, _pro = make_router(latency_slo=1.0, min_samples=3, overload=overload)
+    for _ in range(3):
+        router.record_latency("lite", 5.0)
+    route, reason = router.select("hola")
+    assert route.name == "lite"
+    assert "sobrecarga" in reason
+
+
+def test_router_respects_channel_restrictions():
+    webchat_only = StubResponder("webchat-model")
+    default = StubResponder("default")
+    router = GeminiModelRouter(
+        [
+            ModelRoute("webchat-model", webchat_only, channels=("webchat",)),
+            ModelRoute("default", default),
+        ],
+        metrics=MetricsRegistry(),
+    )
+    with request_context(channel="telegram"):
+        router.get_response("hola")
+    with request_context(channel="webchat"):
+        router.get_response("hola")
+    assert default.calls == 1
+    assert webchat_only.calls == 1
+    assert [d["channel"] for d in router.decisions] == ["telegram", "webchat"]
+
+
+def test_router_records_errors():
+    failing = StubResponder("lite", reply="Error al generar respuesta con Gemini: quota")
+    metrics = MetricsRegistry()
+    router = GeminiModelRouter([ModelRoute("lite", failing)], metrics=metrics)
+    router.get_response("hola")
+    assert router.decisions[-1]["ok"] is False
+    assert metrics.counter("gemini.router.lite.errors") == 1
+    assert metrics.counter("gemini.router.lite.selected") == 1
+
+
+def test_router_requires_routes():
+    with pytest.raises(ValueError):
+        GeminiModelRouter([])
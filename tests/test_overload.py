@@ -0,0 +1,132 @@
+"""
+Tests for OverloadController (src/shared/overload.py)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.shared.metrics import MetricsRegistry
+from src.shared.overload import (
+    CANNED_ONLY,
+    NORMAL,
+    REJECT,
+    SHORT_HISTORY,
+    OverloadController,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(**kwargs):
+    kwargs.setdefault("metrics", MetricsRegistry())
+    kwargs.setdefault("clock", FakeClock())
+    return OverloadController(**kwargs)
+
+
+def test_climbs_one_step_per_hold_while_overloaded():
+    metrics = MetricsRegistry()
+    clock = FakeClock()
+    controller = make_controller(metrics=metrics, clock=clock, hold=3.0)
+    depth = {"value": 40}
+    controller.add_signal("queue_depth", lambda: depth["value"], 32)
+    assert controller.evaluate() == SHORT_HISTORY
+    clock.now += 1
+    assert controller.evaluate() == SHORT_HISTORY
+    for level in (2, CANNED_ONLY, REJECT, REJECT):
+        clock.now += 3
+        assert controller.evaluate() == level
+    assert controller.level_name == "reject"
+    assert metrics.gauge("overload.level") == REJECT
+    assert metrics.counter("overload.level.short_history") == 1
+    assert metrics.counter("overload.level.reject") == 1
+
+
+def test_recovers_one_step_per_cooldown():
+    clock = FakeClock()
+    controller = make_controller(clock=clock, cooldown=10.0, hold=0.0)
+    depth = {"value": 40}
+    controller.add_signal("queue_depth", lambda: depth["value"], 32)
+    controller.evaluate()
+    controller.evaluate()
+    assert controller.level == 2
+
+    depth["value"] = 5
+    controller.evaluate()
+    clock.now += 9
+    assert controller.evaluate() == 2
+    clock.now += 1
+    assert controller.evaluate() == SHORT_HISTORY
+    clock.now += 10
+    assert controller.evaluate() == NORMAL
+
+
+def test_moderate_pressure_holds_the_level():
+    clock = FakeClock()
+    controller = make_controller(clock=clock, cooldown=1.0)
+    depth = {"value": 40}
+    controller.add_signal("queue_depth", lambda: depth["value"], 32)
+    controller.evaluate()
+    depth["value"] = 24
+    for _ in range(5):
+        clock.now += 1
+        assert controller.evaluate() == SHORT_HISTORY
+
+
+def test_latency_signal_expires_without_recent_calls():
+    clock = FakeClock()
+    controller = make_controller(clock=clock, max_latency=10.0, cooldown=10.0)
+    controller.observe_latency(60.0)
+    controller.observe_latency(60.0)
+    assert controller.evaluate() == SHORT_HISTORY
+    # Sin llamadas nuevas (Gemini apagado por la degradación) la latencia deja de contar
+    clock.now += 11
+    controller.evaluate()
+    assert controller.pressure == 0.0
+
+
+def test_one_slow_call_does_not_climb_the_ladder():
+    clock = FakeClock()
+    controller = make_controller(clock=clock, max_latency=15.0, hold=0.0)
+    controller.observe_latency(16.0)
+    for _ in range(3):
+        clock.now += 1
+        assert controller.evaluate() == NORMAL
+
+
+def test_latency_climbs_again_only_with_new_samples():
+    clock = FakeClock()
+    controller = make_controller(clock=clock, max_latency=10.0, hold=1.0)
+    for _ in range(5):
+        controller.observe_latency(30.0)
+    assert controller.evaluate() == SHORT_HISTORY
+    # El mismo promedio, sin llamadas nuevas, no sube otro escalón
+    for _ in range(5):
+        clock.now += 1
+        assert controller.evaluate() == SHORT_HISTORY
+    controller.observe_latency(30.0)
+    assert controller.evaluate() == 2
+
+
+def test_invalid_threshold_is_rejected():
+    with pytest.raises(ValueError):
+        make_controller().add_signal("queue_depth", lambda: 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_monitor_measures_event_loop_lag():
+    controller = OverloadController(interval=0.01, max_loop_lag=0.05, metrics=MetricsRegistry())
+    controller.start()
+    await asyncio.sleep(0.02)
+    # Bloquea el loop más que el lag admitido
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await controller.stop()
+    assert controller.level >= SHORT_HISTORY
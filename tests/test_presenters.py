@@ -2,9 +2,14 @@
 Tests for TelegramMessagePresenter and MarkdownConverter.
 """
 
+import time
+
+import pytest
+
 from src.entities.message import Message
 from src.interface_adapter.presenters.markdown_converter import MarkdownConverter
 from src.interface_adapter.presenters.telegram_presenter import TelegramMessagePresenter
+from src.shared.metrics import MetricsRegistry
 
 
 def test_markdown_converter_bold_and_italic():
@@ -12,8 +17,8 @@ def test_markdown_converter_bold_and_italic():
     converter = MarkdownConverter()
     text = "**bold** and *italic*"
     result = converter.convert(text)
-    # Should convert bold and italic to _bold_ and _italic_, and escape special chars
-    assert "_bold_" in result
+    # Should convert bold to *bold* and italic to _italic_, and escape special chars
+    assert "*bold*" in result
     assert "_italic_" in result
     # Should escape special chars
     for char in ["[", "]", "(", ")", "!", "."]:
@@ -27,24 +32,28 @@ def test_telegram_message_presenter_markdown():
     result = presenter.present(msg)
     assert isinstance(result, list)
     assert result[0]["parse_mode"] == "MarkdownV2"
-    assert "_Hola_" in result[0]["text"]
+    assert "*Hola*" in result[0]["text"]
     assert "_mundo_" in result[0]["text"]
     assert "\\!" in result[0]["text"]
 
 
-def test_telegram_message_presenter_invalid_markdown(monkeypatch):
-    "Test TelegramMessagePresenter handles invalid markdown gracefully."
+def test_telegram_message_presenter_unbalanced_markdown_is_escaped():
+    "Unclosed markers are escaped instead of dropping MarkdownV2."
     presenter = TelegramMessagePresenter()
-    msg = Message(to="user", body="*texto desbalanceado")
-    # Forzar MarkdownValidator a lanzar ValueError
-    monkeypatch.setattr(
-        presenter.validator,
-        "validate",
-        lambda t: (_ for _ in ()).throw(ValueError("desbalanceado")),
-    )
+    result = presenter.present(Message(to="user", body="*texto desbalanceado"))
+    assert result == [{"text": "\\*texto desbalanceado", "parse_mode": "MarkdownV2"}]
+
+
+def test_telegram_message_presenter_long_formatted_message():
+    "Long replies are split into MarkdownV2 parts that keep their formatting."
+    presenter = TelegramMessagePresenter()
+    msg = Message(to="user", body="**" + "texto en negrita. " * 300 + "fin**")
     result = presenter.present(msg)
-    assert result[0]["parse_mode"] is None
-    assert "texto desbalanceado" in result[0]["text"]
+    assert len(result) > 1
+    assert all(part["parse_mode"] == "MarkdownV2" for part in result)
+    assert all(len(part["text"]) <= 4096 for part in result)
+    assert all(part["text"].startswith("*") for part in result)
+    assert all(part["text"].endswith("*") for part in result)
 
 
 def test_telegram_message_presenter_long_message():
@@ -55,3 +64,128 @@ def test_telegram_message_presenter_long_message():
     result = presenter.present(msg)
     assert isinstance(result, list)
     assert len(result) > 1  # Debe dividir el mensaje en partes
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("snake_case y __negrita__", "snake\\_case y *negrita*"),
+        ("## **Título** final", "*Título final*"),
+        ("- uno\n* dos\n1. tres", "• uno\n• dos\n1\\. tres"),
+        ("Ver [sitio](https://a.com/x_(y)) ya", "Ver [sitio](https://a.com/x_(y\\)) ya"),
+        ("`a*b*` y ``c`d``", "`a*b*` y `c\\`d`"),
+        ("```python\nx = '`'\n```", "```python\nx = '\\`'\n```"),
+        ("```\nsin cerrar", "```\nsin cerrar\n```"),
+        ("**a *b** c*", "\\*\\*a _b_\\* c\\*"),
+        ("***ambos*** ~~no~~", "*_ambos_* ~no~"),
+        # Una entidad ya abierta no se vuelve a abrir: sus delimitadores quedan como texto
+        ("*_hola_*", "_\\_hola\\__"),
+        ("_*hola*_", "_\\*hola\\*_"),
+        ("**uno **dos** tres**", "*uno \\*\\*dos* tres\\*\\*"),
+        ("_a *b _c_ d* e_", "_a \\*b \\_c_ d\\* e\\_"),
+        ("[[a](http://u)](http://v)", "[\\[a](http://u)\\]\\(http://v\\)"),
+        ("2 * 3 = 6", "2 \\* 3 \\= 6"),
+        ("\\*literal\\*", "\\*literal\\*"),
+        ("[roto](", "\\[roto\\]\\("),
+    ],
+)
+def test_markdown_converter_renders_balanced_markdown_v2(text, expected):
+    assert MarkdownConverter().convert(text) == expected
+
+
+def test_markdown_converter_continuation_line_is_not_a_list():
+    assert MarkdownConverter().convert("- sigue", at_line_start=False) == "\\- sigue"
+
+
+def test_markdown_converter_to_entities_uses_utf16_offsets():
+    text, entities = MarkdownConverter().to_entities(
+        "# Hola\n😀 **negrita** y [sitio](https://a.com)\n```py\nx = 1\n```\nfin"
+    )
+    assert text == "Hola\n😀 negrita y sitio\nx = 1\nfin"
+    assert entities == [
+        {"type": "bold", "offset": 0, "length": 4},
+        {"type": "bold", "offset": 8, "length": 7},
+        {"type": "text_link", "offset": 18, "length": 5, "url": "https://a.com"},
+        {"type": "pre", "offset": 24, "length": 5, "language": "py"},
+    ]
+
+
+def test_markdown_converter_to_entities_keeps_unmatched_delimiters_as_text():
+    text, entities = MarkdownConverter().to_entities("*a **b** `c` snake_case 2 * 3")
+    assert text == "*a b c snake_case 2 * 3"
+    assert entities == [
+        {"type": "bold", "offset": 3, "length": 1},
+        {"type": "code", "offset": 5, "length": 1},
+    ]
+
+
+@pytest.mark.parametrize("text, expected", [("a\n```", "a\n"), ("```py", "")])
+def test_markdown_converter_to_entities_trailing_unclosed_fence(text, expected):
+    assert MarkdownConverter().to_entities(text) == (expected, [])
+
+
+def test_telegram_message_presenter_entities_mode():
+    presenter = TelegramMessagePresenter(mode="entities")
+    result = presenter.present(Message(to="user", body="**Hola** mundo!"))
+    assert result == [
+        {"text": "Hola mundo!", "entities": [{"type": "bold", "offset": 0, "length": 4}]}
+    ]
+    assert presenter.present(Message(to="user", body="sin formato")) == [{"text": "sin formato"}]
+
+
+def test_telegram_message_presenter_entities_mode_is_shorter_than_markdown_v2():
+    body = "Precio (con IVA): $1.000-2.000. **Oferta!** " * 400
+    markdown = TelegramMessagePresenter().present(Message(to="user", body=body))
+    entities = TelegramMessagePresenter(mode="entities").present(Message(to="user", body=body))
+    assert len(entities) < len(markdown)
+    assert all("parse_mode" not in part for part in entities)
+    assert all(part["entities"][0]["type"] == "bold" for part in entities)
+
+
+def test_telegram_message_presenter_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        TelegramMessagePresenter(mode="html")
+
+
+def test_telegram_message_presenter_caches_presented_responses():
+    presenter = TelegramMessagePresenter(metrics=MetricsRegistry())
+    message = Message(to="user", body="**Hola** mundo!")
+    first = presenter.present(message)
+    first[0]["text"] = "modificado"  # las partes devueltas son copias
+    assert presenter.present(message) == [{"text": "*Hola* mundo\\!", "parse_mode": "MarkdownV2"}]
+    assert presenter.cache.info()["hits"] == 1
+    assert presenter.cache.hit_ratio == 0.5
+    # El modo es parte de la clave
+    presenter.mode = "entities"
+    assert presenter.present(message)[0]["text"] == "Hola mundo!"
+
+
+def test_telegram_message_presenter_prime():
+    presenter = TelegramMessagePresenter(metrics=MetricsRegistry())
+    assert presenter.prime(["Adiós", "Adiós", "", "**Hola**"]) == 2
+    assert presenter.present(Message(to="user", body="Adiós")) == [
+        {"text": "Adiós", "parse_mode": "MarkdownV2"}
+    ]
+    assert presenter.cache.info()["misses"] == 0
+    uncached = TelegramMessagePresenter(cache_size=0)
+    assert uncached.prime(["Adiós"]) == 0
+    uncached.present(Message(to="user", body="Adiós"))
+    assert len(uncached.cache) == 0
+
+
+@pytest.mark.parametrize("unit", ["*a ", "`", "[x", "_a ", "**b *"])
+def test_markdown_converter_scales_linearly(unit):
+    "Unmatched delimiters must not make conversion quadratic."
+    converter = MarkdownConverter()
+
+    def best_of(text):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            converter.convert(text)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    small = best_of(unit * 2_000)
+    large = best_of(unit * 20_000)
+    assert large < small * 30
@@ -0,0 +1,38 @@
+"""
+Tests for RasaDomainRepository (src/infrastructure/repositories/rasa_domain_repository.py)
+"""
+
+from src.infrastructure.repositories.rasa_domain_repository import (
+    FALLBACK_INTENT,
+    RasaDomainRepository,
+    normalize_text,
+)
+
+
+def test_normalize_text_strips_accents_and_punctuation():
+    assert normalize_text("¡Hola, ¿Qué TAL?") == "hola que tal"
+
+
+def test_classify_matches_nlu_examples():
+    repository = RasaDomainRepository()
+    assert repository.classify("Hola") == "saludo"
+    assert repository.classify("hasta luego!") == "despedida"
+    assert repository.classify("zzz qwerty") == FALLBACK_INTENT
+
+
+def test_reply_for_uses_rule_actions_and_domain_responses():
+    repository = RasaDomainRepository()
+    intent, texts, custom_actions = repository.reply_for("buenos días")
+    assert intent == "saludo"
+    assert texts == repository.responses()["utter_saludo"][:1]
+    assert custom_actions == []
+
+    _, texts, custom_actions = repository.reply_for("zzz qwerty")
+    assert texts == []
+    assert custom_actions == ["action_gemini_fallback"]
+
+
+def test_missing_project_returns_empty_data(tmp_path):
+    repository = RasaDomainRepository(tmp_path)
+    assert repository.responses() == {}
+    assert repository.classify("hola") == FALLBACK_INTENT
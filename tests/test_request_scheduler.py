@@ -0,0 +1,177 @@
+"""
+Tests for GeminiRequestScheduler (src/infrastructure/google_generative_ai/request_scheduler.py)
+and TokenBucket (src/shared/token_bucket.py)
+"""
+
+import asyncio
+
+import pytest
+
+from src.entities.gemini_responder import AsyncGeminiResponder
+from src.infrastructure.google_generative_ai.request_scheduler import (
+    GeminiQuotaExceededError,
+    GeminiRequestScheduler,
+)
+from src.shared.metrics import MetricsRegistry
+from src.shared.request_context import request_context
+from src.shared.token_bucket import TokenBucket
+
+
+class FakeClock:
+    "Reloj manual para los tests del bucket."
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingResponder(AsyncGeminiResponder):
+    "Responder falso que registra el orden de las llamadas."
+
+    def __init__(self, failures=None):
+        self.calls = []
+        self.failures = list(failures or [])
+
+    async def get_response_async(self, prompt, system_instructions=None):
+        self.calls.append(prompt)
+        if self.failures:
+            raise self.failures.pop(0)
+        return f"ok:{prompt}"
+
+
+class RateLimited(Exception):
+    "Imita google.api_core.exceptions.ResourceExhausted."
+
+    code = 429
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(2, 1, clock=clock)
+    assert bucket.try_consume()
+    assert bucket.try_consume()
+    assert not bucket.try_consume()
+    assert bucket.time_until(1) == pytest.approx(1.0)
+    clock.now = 1.5
+    assert bucket.try_consume()
+    assert bucket.tokens == pytest.approx(0.5)
+
+
+def test_token_bucket_consume_allows_debt_and_drain():
+    clock = FakeClock()
+    bucket = TokenBucket(10, 5, clock=clock)
+    bucket.consume(15)
+    assert bucket.time_until(1) == pytest.approx(1.2)
+    clock.now = 10
+    bucket.drain()
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_state_round_trip():
+    clock = FakeClock()
+    bucket = TokenBucket(4, 2, clock=clock)
+    bucket.consume(3)
+    restored = TokenBucket.restore(4, 2, bucket.state, clock=clock)
+    clock.now = 1
+    assert restored.tokens == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_without_limits_passes_through():
+    responder = RecordingResponder()
+    scheduler = GeminiRequestScheduler(responder, metrics=MetricsRegistry())
+    assert await scheduler.get_response_async("hola") == "ok:hola"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_webchat_before_telegram():
+    responder = RecordingResponder()
+    scheduler = GeminiRequestScheduler(
+        responder, request_bucket=TokenBucket(1, 20), metrics=MetricsRegistry()
+    )
+    await scheduler.get_response_async("primero")
+
+    async def ask(channel, prompt):
+        with request_context(channel=channel):
+            return await scheduler.get_response_async(prompt)
+
+    background = asyncio.create_task(scheduler.get_response_async("fondo"))
+    telegram = asyncio.create_task(ask("telegram", "telegram"))
+    webchat = asyncio.create_task(ask("webchat", "webchat"))
+    await asyncio.gather(background, telegram, webchat)
+    assert responder.calls == ["primero", "webchat", "telegram", "fondo"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_drops_requests_past_deadline():
+    metrics = MetricsRegistry()
+    responder = RecordingResponder()
+    scheduler = GeminiRequestScheduler(
+        responder, request_bucket=TokenBucket(1, 0.1), max_wait=0.05, metrics=metrics
+    )
+    await scheduler.get_response_async("primero")
+    with pytest.raises(GeminiQuotaExceededError):
+        await scheduler.get_response_async("segundo")
+    assert responder.calls == ["primero"]
+    assert metrics.counter("gemini.scheduler.dropped") == 1
+    assert scheduler.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_token_budget_delays_large_prompts():
+    responder = RecordingResponder()
+    scheduler = GeminiRequestScheduler(
+        responder, token_bucket=TokenBucket(10, 1), max_wait=0.05, metrics=MetricsRegistry()
+    )
+    assert await scheduler.get_response_async("x" * 20) == "ok:" + "x" * 20
+    # El presupuesto quedó en negativo (entrada + salida): el siguiente no entra a tiempo
+    with pytest.raises(GeminiQuotaExceededError):
+        await scheduler.get_response_async("y")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_after_rate_limit():
+    metrics = MetricsRegistry()
+    responder = RecordingResponder(failures=[RateLimited("429")])
+    scheduler = GeminiRequestScheduler(
+        responder, request_bucket=TokenBucket(5, 50), metrics=metrics
+    )
+    assert await scheduler.get_response_async("hola") == "ok:hola"
+    assert responder.calls == ["hola", "hola"]
+    assert metrics.counter("gemini.scheduler.rate_limited") == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_surfaces_quota_error_after_retries():
+    responder = RecordingResponder(failures=[RateLimited("429"), RateLimited("429")])
+    scheduler = GeminiRequestScheduler(
+        responder, request_bucket=TokenBucket(5, 50), metrics=MetricsRegistry()
+    )
+    with pytest.raises(GeminiQuotaExceededError):
+        await scheduler.get_response_async("hola")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_propagates_other_errors():
+    responder = RecordingResponder(failures=[RuntimeError("boom")])
+    scheduler = GeminiRequestScheduler(
+        responder, request_bucket=TokenBucket(5, 50), metrics=MetricsRegistry()
+    )
+    with pytest.raises(RuntimeError):
+        await scheduler.get_response_async("hola")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_streams_after_admission():
+    class StreamingResponder(AsyncGeminiResponder):
+        async def stream_response_async(self, prompt, system_instructions=None):
+            yield "Hola "
+            yield "mundo"
+
+    scheduler = GeminiRequestScheduler(
+        StreamingResponder(), request_bucket=TokenBucket(1, 20), metrics=MetricsRegistry()
+    )
+    chunks = [chunk async for chunk in scheduler.stream_response_async("hola")]
+    assert chunks == ["Hola ", "mundo"]
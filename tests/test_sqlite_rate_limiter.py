@@ -0,0 +1,54 @@
+"""
+Tests for SqliteRateLimiter (src/infrastructure/rate_limit/sqlite_rate_limiter.py)
+"""
+
+from src.infrastructure.rate_limit import sqlite_rate_limiter
+from src.infrastructure.rate_limit.sqlite_rate_limiter import SqliteRateLimiter
+from src.shared.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_buckets_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    clock = FakeClock()
+    first = SqliteRateLimiter(path, "test", 2, 1.0, metrics=MetricsRegistry(), clock=clock)
+    second = SqliteRateLimiter(path, "test", 2, 1.0, metrics=MetricsRegistry(), clock=clock)
+    try:
+        assert first.allow("webchat:u1")
+        assert second.allow("webchat:u1")
+        assert not first.allow("webchat:u1")
+        assert second.allow("webchat:u2")
+        clock.now += 1
+        assert second.allow("webchat:u1")
+        assert not first.allow("webchat:u1")
+    finally:
+        first.close()
+        second.close()
+
+
+def test_pruning_only_touches_the_limiter_own_buckets(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_rate_limiter, "_PRUNE_EVERY", 1)
+    path = str(tmp_path / "rate_limit.db")
+    clock = FakeClock()
+    metrics = MetricsRegistry()
+    # Se repone en 200 s; el de IP, en 60 s
+    identity = SqliteRateLimiter(path, "identity", 2, 0.01, metrics=metrics, clock=clock)
+    ip = SqliteRateLimiter(path, "ip", 60, 1.0, metrics=metrics, clock=clock)
+    try:
+        assert identity.allow("webchat:u1")
+        assert identity.allow("webchat:u1")
+        clock.now += 100
+        assert ip.allow("ip:10.0.0.1")
+        # La poda del limitador de IP no le devuelve el bucket lleno a webchat:u1
+        assert identity.allow("webchat:u1")
+        assert not identity.allow("webchat:u1")
+    finally:
+        identity.close()
+        ip.close()
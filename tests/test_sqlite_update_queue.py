@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.queue.sqlite_update_queue import SqliteUpdateQueue
+from src.infrastructure.queue.update_worker import UpdateWorker
+from src.shared.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = SqliteUpdateQueue(
+        str(tmp_path / "updates.db"),
+        lease_seconds=30.0,
+        max_attempts=2,
+        metrics=MetricsRegistry(),
+        clock=clock,
+    )
+    yield queue
+    queue.close()
+
+
+def test_append_claim_complete(queue):
+    update_id = queue.append("telegram", 42, {"message": {"text": "hola"}})
+    [update] = queue.claim("w1")
+    assert update.id == update_id
+    assert update.conversation == "42"
+    assert update.payload == {"message": {"text": "hola"}}
+    assert update.attempts == 1
+    assert queue.claim("w2") == []
+    assert queue.complete(update_id, "w1") is True
+    assert queue.stats() == {"pending": 0, "claimed": 0, "done": 1, "failed": 0}
+
+
+def test_updates_survive_reopening(tmp_path, queue):
+    queue.append("telegram", 1, {"n": 1})
+    queue.close()
+    reopened = SqliteUpdateQueue(str(tmp_path / "updates.db"), metrics=MetricsRegistry())
+    try:
+        assert [update.payload for update in reopened.claim("w1")] == [{"n": 1}]
+    finally:
+        reopened.close()
+
+
+def test_claim_keeps_conversation_order(queue):
+    first = queue.append("telegram", 1, {"n": 1})
+    queue.append("telegram", 1, {"n": 2})
+    other = queue.append("telegram", 2, {"n": 3})
+    assert [update.id for update in queue.claim("w1", limit=5)] == [first, other]
+    # El segundo mensaje de la conversación 1 espera a que termine el primero
+    assert queue.claim("w2", limit=5) == []
+    queue.complete(first, "w1")
+    assert [update.payload for update in queue.claim("w2", limit=5)] == [{"n": 2}]
+
+
+def test_expired_lease_is_reclaimed(queue, clock):
+    update_id = queue.append("telegram", 1, {})
+    queue.claim("w1")
+    clock.now += 31
+    [update] = queue.claim("w2")
+    assert update.id == update_id
+    assert update.attempts == 2
+    # El worker original ya no puede cerrar ni renovar el update
+    assert queue.complete(update_id, "w1") is False
+    assert queue.renew(update_id, "w1") is False
+    assert queue.renew(update_id, "w2") is True
+
+
+def test_expired_lease_without_attempts_left_fails(queue, clock):
+    queue.append("telegram", 1, {})
+    queue.claim("w1")
+    clock.now += 31
+    queue.claim("w2")
+    clock.now += 31
+    assert queue.claim("w3") == []
+    assert queue.stats()["failed"] == 1
+
+
+def test_fail_retries_until_max_attempts(queue):
+    update_id = queue.append("telegram", 1, {})
+    queue.claim("w1")
+    assert queue.fail(update_id, "w1", "boom") is True
+    assert queue.stats()["pending"] == 1
+    queue.claim("w1")
+    queue.fail(update_id, "w1", "boom")
+    assert queue.stats()["failed"] == 1
+    assert queue.claim("w1") == []
+
+
+def test_purge_removes_old_done_updates(queue, clock):
+    update_id = queue.append("telegram", 1, {})
+    queue.append("telegram", 2, {})
+    queue.claim("w1")
+    queue.complete(update_id, "w1")
+    assert queue.purge(older_than=60) == 0
+    clock.now += 61
+    assert queue.purge(older_than=60) == 1
+    assert queue.stats() == {"pending": 1, "claimed": 0, "done": 0, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_update_worker_processes_and_retries(queue):
+    queue.append("telegram", 1, {"n": 1})
+    queue.append("telegram", 1, {"n": 2})
+    queue.append("telegram", 2, {"n": 3})
+    seen = []
+
+    async def handler(update):
+        seen.append(update.payload["n"])
+        if update.payload["n"] == 3 and update.attempts == 1:
+            raise ValueError("transitorio")
+
+    stop = asyncio.Event()
+    worker = UpdateWorker(queue, handler, "w1", concurrency=2, poll_interval=0.01)
+    run = asyncio.create_task(worker.run(stop))
+    for _ in range(200):
+        if queue.stats()["done"] == 3:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await run
+    assert queue.stats()["done"] == 3
+    assert seen.index(1) < seen.index(2)
+    assert seen.count(3) == 2
+
+
+@pytest.mark.asyncio
+async def test_update_worker_purges_done_updates_and_publishes_pending(tmp_path, clock):
+    metrics = MetricsRegistry()
+    queue = SqliteUpdateQueue(str(tmp_path / "updates.db"), metrics=metrics, clock=clock)
+    update_id = queue.append("telegram", 1, {})
+    queue.claim("w1")
+    queue.complete(update_id, "w1")
+    clock.now += 61
+
+    async def handler(update):
+        await asyncio.sleep(0.2)  # sigue en curso: el segundo update queda pendiente
+
+    queue.append("telegram", 2, {})
+    queue.append("telegram", 2, {})
+    stop = asyncio.Event()
+    worker = UpdateWorker(queue, handler, "w1", poll_interval=0.01, retention=60)
+    run = asyncio.create_task(worker.run(stop))
+    await asyncio.sleep(0.05)
+    # El worker publica el gauge al consultar la cola vacía de updates reclamables
+    assert metrics.gauge("queue.pending") == 1
+    assert queue.stats()["done"] == 0
+    stop.set()
+    await run
+    queue.close()
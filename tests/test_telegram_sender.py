@@ -0,0 +1,149 @@
+"""
+Tests for TelegramSender (src/infrastructure/telegram/telegram_sender.py)
+"""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.telegram.telegram_sender import TelegramSender
+from src.interface_adapter.presenters.telegram_stream_presenter import TelegramStreamPresenter
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class RecordingClient:
+    "Cliente HTTP falso que registra las llamadas a la Bot API."
+
+    def __init__(self, with_message_id=True):
+        self.calls = []
+        self.with_message_id = with_message_id
+
+    async def post(self, url, json=None, timeout=None):
+        self.calls.append((url.rsplit("/", 1)[-1], json))
+        if self.with_message_id:
+            return FakeResponse({"ok": True, "result": {"message_id": len(self.calls)}})
+        return FakeResponse({"ok": False})
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_sender_send_parts_in_order():
+    client = RecordingClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=0)
+    await sender.send_parts(1, [{"text": "a"}, {"text": "b"}])
+    assert [c[0] for c in client.calls] == ["sendMessage", "sendMessage"]
+    assert [c[1]["text"] for c in client.calls] == ["a", "b"]
+    assert client.calls[0][1]["chat_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sender_stream_sends_first_sentence_then_edits():
+    client = RecordingClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=0, edit_interval=0)
+    await sender.stream(
+        7, _chunks("Primera oración. Segu", "nda oración. Fin"), TelegramStreamPresenter()
+    )
+    methods = [c[0] for c in client.calls]
+    assert methods[0] == "sendMessage"
+    assert client.calls[0][1]["text"] == "Primera oración\\."
+    assert set(methods[1:]) == {"editMessageText"}
+    assert client.calls[-1][1]["message_id"] == 1
+    assert client.calls[-1][1]["text"].endswith("Fin")
+
+
+@pytest.mark.asyncio
+async def test_sender_stream_rate_limits_edits():
+    client = RecordingClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=0, edit_interval=60)
+    chunks = _chunks("Uno. ", "Dos. ", "Tres. ", "Cuatro.")
+    await sender.stream(1, chunks, TelegramStreamPresenter())
+    # Primer envío inmediato y una sola edición final (las intermedias se omiten)
+    assert [c[0] for c in client.calls] == ["sendMessage", "editMessageText"]
+
+
+@pytest.mark.asyncio
+async def test_sender_stream_appends_parts_without_message_id():
+    client = RecordingClient(with_message_id=False)
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=0, edit_interval=0)
+    await sender.stream(1, _chunks("Uno. ", "Dos. ", "Tres."), TelegramStreamPresenter())
+    assert {c[0] for c in client.calls} == {"sendMessage"}
+    assert "".join(c[1]["text"] for c in client.calls) == "Uno\\. Dos\\. Tres\\."
+
+
+def test_sender_inline_message_takes_the_chat_slot():
+    sender = TelegramSender(RecordingClient(), "https://api.test/botTOKEN", message_delay=10)
+    payload = sender.inline_message(3, {"text": "hola", "parse_mode": "MarkdownV2"})
+    assert payload == {
+        "method": "sendMessage",
+        "chat_id": 3,
+        "text": "hola",
+        "parse_mode": "MarkdownV2",
+    }
+    # Con un envío pendiente en el chat la respuesta inline se adelantaría
+    assert sender.inline_message(3, {"text": "otra"}) is None
+    assert sender.inline_message(4, {"text": "otro chat"}) is not None
+
+
+@pytest.mark.asyncio
+async def test_sender_typing_refreshes_until_block_ends():
+    client = RecordingClient()
+    sender = TelegramSender(
+        client, "https://api.test/botTOKEN", message_delay=0, typing_interval=0.02
+    )
+    async with sender.typing(8):
+        await asyncio.sleep(0.05)
+        await sender.send_parts(8, [{"text": "listo"}])
+    sent = len(client.calls)
+    await asyncio.sleep(0.05)
+    assert len(client.calls) == sent
+    methods = [c[0] for c in client.calls]
+    assert methods.count("sendChatAction") >= 2
+    assert client.calls[0][1] == {"chat_id": 8, "action": "typing"}
+    assert "sendMessage" in methods
+
+
+@pytest.mark.asyncio
+async def test_sender_chat_action_never_delays_replies():
+    client = RecordingClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=10)
+    await sender.send_parts(9, [{"text": "a"}])
+    assert await sender.send_chat_action(9) is False  # el chat tiene su turno reservado
+    assert await sender.send_chat_action(10) is True
+    assert [c[0] for c in client.calls] == ["sendMessage", "sendChatAction"]
+
+
+@pytest.mark.asyncio
+async def test_sender_message_waits_for_chat_action_in_flight():
+    class SlowActionClient(RecordingClient):
+        async def post(self, url, json=None, timeout=None):
+            if url.endswith("sendChatAction"):
+                await asyncio.sleep(0.03)
+            return await super().post(url, json=json, timeout=timeout)
+
+    client = SlowActionClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", message_delay=0)
+    action = asyncio.ensure_future(sender.send_chat_action(11))
+    await asyncio.sleep(0)
+    await sender.send_message(11, {"text": "hola"})
+    await action
+    assert [c[0] for c in client.calls] == ["sendChatAction", "sendMessage"]
+
+
+@pytest.mark.asyncio
+async def test_sender_typing_disabled_with_zero_interval():
+    client = RecordingClient()
+    sender = TelegramSender(client, "https://api.test/botTOKEN", typing_interval=0)
+    async with sender.typing(12):
+        await asyncio.sleep(0.01)
+    assert client.calls == []
@@ -0,0 +1,71 @@
+"""
+Tests for TelegramStreamPresenter (src/interface_adapter/presenters/telegram_stream_presenter.py)
+"""
+
+from src.entities.message import Message
+from src.interface_adapter.presenters.telegram_presenter import TelegramMessagePresenter
+from src.interface_adapter.presenters.telegram_stream_presenter import TelegramStreamPresenter
+
+
+def test_stream_presenter_waits_for_complete_sentence():
+    presenter = TelegramStreamPresenter()
+    assert presenter.feed("Hola, esto es") is False
+    assert presenter.text == ""
+    assert presenter.feed(" una oración. Y otra") is True
+    assert presenter.text == "Hola, esto es una oración\\."
+
+
+def test_stream_presenter_does_not_cut_open_formatting():
+    presenter = TelegramStreamPresenter()
+    assert presenter.feed("Tenemos **bolsas. blancas") is False
+    assert presenter.feed("** disponibles. ") is True
+    assert presenter.text.count("*") % 2 == 0
+
+
+def test_stream_presenter_tracks_underscores_and_ignores_bullets():
+    presenter = TelegramStreamPresenter()
+    assert presenter.feed("Hola _esto es. importante") is False
+    assert presenter.feed("_ y snake_case. ") is True
+    assert presenter.text == "Hola _esto es\\. importante_ y snake\\_case\\."
+
+    presenter = TelegramStreamPresenter()
+    assert presenter.feed("* uno. ") is True
+    assert presenter.feed("* dos. ") is True
+
+
+def test_stream_presenter_scans_pending_text_once():
+    presenter = TelegramStreamPresenter()
+    presenter.feed("Tenemos **bolsas. ")
+    for _ in range(5):
+        assert presenter.feed("blancas. ") is False
+    # Solo queda por recorrer el espacio final
+    assert presenter._scanned == len(presenter._pending) - 1
+    assert presenter.feed("ok** listo. ") is True
+    assert presenter.text.count("*") % 2 == 0
+
+
+def test_stream_presenter_matches_full_presentation():
+    body = "Primera oración. **Segunda** con *cursiva*!\nTercera línea sin cierre"
+    presenter = TelegramStreamPresenter()
+    for index in range(0, len(body), 7):
+        presenter.feed(body[index : index + 7])
+    presenter.finish()
+    expected = TelegramMessagePresenter().present(Message(to="u", body=body))
+    assert presenter.parts() == expected
+
+
+def test_stream_presenter_entities_mode_matches_full_presentation():
+    body = "Primera oración. **Segunda** con *cursiva*!\n- Lista con `código`"
+    telegram_presenter = TelegramMessagePresenter(mode="entities")
+    presenter = TelegramStreamPresenter(telegram_presenter)
+    for index in range(0, len(body), 5):
+        presenter.feed(body[index : index + 5])
+    presenter.finish()
+    assert presenter.parts() == telegram_presenter.present(Message(to="u", body=body))
+
+
+def test_stream_presenter_empty():
+    presenter = TelegramStreamPresenter()
+    assert presenter.feed("") is False
+    assert presenter.finish() == ""
+    assert presenter.parts() == []
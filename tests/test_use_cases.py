@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 
 from src.entities.message import Message
 from src.entities.system_instructions import SystemInstructions
+from src.shared.metrics import MetricsRegistry
+from src.use_cases.coalesce_messages_use_case import CoalesceMessagesUseCase
 from src.use_cases.generate_agent_response_use_case import GenerateAgentResponseUseCase
 from src.use_cases.load_system_instructions import LoadSystemInstructionsUseCase
 
@@ -194,3 +198,118 @@ def test_load_system_instructions_use_case_empty_string():
     result = use_case.execute()
     # "" es falsy, así que debe devolver None
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_generate_agent_response_use_case_execute_stream():
+    "Test execute_stream entrega los fragmentos del servicio."
+
+    class DummyStreamingService:
+        async def get_response(self, prompt):
+            return "no usado"
+
+        async def stream_response(self, prompt):
+            yield "Hola "
+            yield prompt
+
+    use_case = GenerateAgentResponseUseCase(agent_bot_service=DummyStreamingService())
+    user_message = Message(to="user7", body="mundo")
+    chunks = [chunk async for chunk in use_case.execute_stream("conv7", user_message)]
+    assert chunks == ["Hola ", "mundo"]
+
+
+@pytest.mark.asyncio
+async def test_generate_agent_response_use_case_execute_stream_without_streaming():
+    "Test execute_stream usa execute si el servicio no soporta streaming."
+
+    class DummyAgentBotService:
+        async def get_response(self, prompt):
+            return "Error al comunicarse con Rasa: timeout"
+
+    use_case = GenerateAgentResponseUseCase(agent_bot_service=DummyAgentBotService())
+    user_message = Message(to="user8", body="hola")
+    chunks = [chunk async for chunk in use_case.execute_stream("conv8", user_message)]
+    assert len(chunks) == 1
+    assert "servidor no está disponible" in chunks[0]
+
+
+@pytest.mark.asyncio
+async def test_generate_agent_response_use_case_superseded_response():
+    "Test execute devuelve None si el servicio descartó la respuesta."
+
+    class SupersedingService:
+        async def get_response(self, prompt):
+            return None
+
+    use_case = GenerateAgentResponseUseCase(agent_bot_service=SupersedingService())
+    assert await use_case.execute("conv9", Message(to="user9", body="hola")) is None
+    message = Message(to="user9", body="hola")
+    assert [chunk async for chunk in use_case.execute_stream("conv9", message)] == []
+
+
+class RecordingUseCase:
+    "Caso de uso falso que registra los mensajes que recibe."
+
+    def __init__(self):
+        self.bodies = []
+
+    async def execute(self, conversation_id, user_message, prompt=None):
+        self.bodies.append(prompt or user_message.body)
+        return Message(to=user_message.to, body=f"Echo: {user_message.body}")
+
+
+@pytest.mark.asyncio
+async def test_coalesce_messages_merges_a_burst_into_one_turn():
+    "Los mensajes seguidos se contestan una sola vez, con el texto unido."
+    inner = RecordingUseCase()
+    metrics = MetricsRegistry()
+    use_case = CoalesceMessagesUseCase(inner, window=0.05, metrics=metrics)
+
+    async def send(body, delay):
+        await asyncio.sleep(delay)
+        return await use_case.execute("chat1", Message(to="chat1", body=body))
+
+    results = await asyncio.gather(
+        send("hola", 0), send("quería saber", 0.01), send("precio de bolsas blancas", 0.02)
+    )
+    assert inner.bodies == ["hola\nquería saber\nprecio de bolsas blancas"]
+    assert results[0].body.startswith("Echo: hola")
+    assert results[1:] == [None, None]
+    assert use_case.stats() == {"messages": 3, "turns": 1, "reduction": pytest.approx(2 / 3)}
+    assert metrics.gauge("coalesce.reduction") == pytest.approx(2 / 3)
+
+
+@pytest.mark.asyncio
+async def test_coalesce_messages_keeps_conversations_apart():
+    inner = RecordingUseCase()
+    use_case = CoalesceMessagesUseCase(inner, window=0.02, metrics=MetricsRegistry())
+    await asyncio.gather(
+        use_case.execute("a", Message(to="a", body="uno")),
+        use_case.execute("b", Message(to="b", body="dos")),
+    )
+    assert sorted(inner.bodies) == ["dos", "uno"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_messages_passes_through_when_disabled_or_transcribed():
+    inner = RecordingUseCase()
+    use_case = CoalesceMessagesUseCase(inner, window=0, metrics=MetricsRegistry())
+    assert (await use_case.execute("c", Message(to="c", body="hola"))).body == "Echo: hola"
+    use_case.window = 10
+    await use_case.execute("c", Message(to="c", body="audio"), prompt="texto transcripto")
+    assert inner.bodies == ["hola", "texto transcripto"]
+
+
+def test_coalesce_messages_window_adapts_to_typing_cadence():
+    use_case = CoalesceMessagesUseCase(
+        RecordingUseCase(), window=1.0, max_window=3.0, metrics=MetricsRegistry()
+    )
+    assert use_case.window_for("d") == 1.0
+    use_case._observe_pause("d", 1.2)
+    assert use_case.window_for("d") == pytest.approx(1.8)
+    for _ in range(20):
+        use_case._observe_pause("d", 0.1)
+    assert use_case.window_for("d") == 0.5  # no baja de la mitad de la ventana base
+    for _ in range(20):
+        use_case._observe_pause("d", 5.0)
+    assert use_case.window_for("d") == 3.0
@@ -0,0 +1,57 @@
+"""
+Tests for WarmUp (src/shared/warmup.py)
+"""
+
+import asyncio
+
+import pytest
+
+from src.shared.metrics import MetricsRegistry
+from src.shared.warmup import WarmUp
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_steps_concurrently():
+    started = []
+
+    async def step(name):
+        started.append(name)
+        await asyncio.sleep(0.05)
+
+    warmup = WarmUp(
+        {"a": lambda: step("a"), "b": lambda: step("b")}, timeout=1.0, metrics=MetricsRegistry()
+    )
+    assert not warmup.ready
+    warmup.start()
+    status = await asyncio.wait_for(warmup.wait(), timeout=0.09)
+    assert status["ready"] is True
+    assert status["steps"] == {"a": "ok", "b": "ok"}
+    assert sorted(started) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_warmup_records_errors_and_deadline():
+    async def fails():
+        raise OSError("sin red")
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    warmup = WarmUp({"falla": fails, "lento": slow}, timeout=0.05, metrics=MetricsRegistry())
+    warmup.start()
+    status = await warmup.wait()
+    assert status["ready"] is True
+    assert status["steps"]["falla"] == "error: sin red"
+    assert status["steps"]["lento"] == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_warmup_cancel_before_completion():
+    async def slow():
+        await asyncio.sleep(5)
+
+    warmup = WarmUp({"lento": slow}, timeout=10, metrics=MetricsRegistry())
+    warmup.start()
+    await asyncio.sleep(0)
+    await warmup.cancel()
+    assert warmup.ready